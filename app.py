@@ -1,13 +1,77 @@
-from flask import Flask, request, jsonify, render_template_string
-import joblib
+from flask import Flask, Response, g, redirect, request, jsonify, render_template_string, send_file, url_for
+import importlib
+import io
 import numpy as np
 import os
-import pandas as pd
 import random
+import time
+
+# Seuls Flask et NumPy sont importés d'office : pandas, joblib, sklearn et
+# xgboost ne le sont qu'à la première utilisation (démarrage rapide).
+from src.models.compiled import PREPROCESSOR_DIR, CompiledEnsemble, CompiledPipeline, CompiledPreprocessor
+from src.models.registry import COMPILED_DIR, REGISTRY_DIR, ModelRegistry
+from src.features.digest import file_digest
+from src.serving.batcher import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS, MicroBatcher
+from src.serving.cache import DEFAULT_MAX_ENTRIES, DEFAULT_SHARED_MAX_ROWS, DEFAULT_TTL, PredictionCache, SQLiteBackend
+from src.serving.jobs import DEFAULT_JOBS_DIR, JobQueue
+from src.serving.memory import memory_usage
+from src.serving.metrics import BATCH_ROWS_BUCKETS, CONTENT_TYPE, MetricsRegistry
+from src.serving.profiler import DEFAULT_INTERVAL as DEFAULT_PROFILER_INTERVAL, SamplingProfiler
+from src.serving.reload import DEFAULT_INTERVAL, RegistryWatcher, ServedModel, ShadowScorer
+from src.serving.results import (
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_RESULTS_DIR,
+    DEFAULT_TTL as DEFAULT_RESULTS_TTL,
+    MAX_PAGE_SIZE,
+    ResultStore,
+)
+from src.serving.schema import FeatureSchema
 
 app = Flask(__name__)
 
 MODEL_PATH = 'models/best_model.pkl'
+PIPELINE_PATH = 'models/inference_pipeline.joblib'
+COMPILED_MODEL_DIR = 'models/compiled'
+COLUMN_TYPES_PATH = 'data/processed/column_types.json'
+# Démarrage rapide : moteur compilé, pipeline sklearn chargé à la première
+# requête de lignes brutes seulement (si aucun prétraitement compilé).
+FAST_START = os.environ.get('FAST_START', '0') == '1'
+# "xgboost" ou "compiled" : modèle et prétraitement en tableaux NumPy projetés
+# en mémoire, dont les pages sont partagées par tous les workers de la machine
+INFERENCE_ENGINE = os.environ.get('INFERENCE_ENGINE', 'compiled' if FAST_START else 'xgboost')
+# Regroupement des petites requêtes /predict concurrentes (désactivé par défaut)
+MICROBATCH_ENABLED = os.environ.get('MICROBATCH_ENABLED', '0') == '1'
+MICROBATCH_MAX_BATCH_SIZE = int(os.environ.get('MICROBATCH_MAX_BATCH_SIZE', DEFAULT_MAX_BATCH_SIZE))
+MICROBATCH_MAX_WAIT_MS = float(os.environ.get('MICROBATCH_MAX_WAIT_MS', DEFAULT_MAX_WAIT_MS))
+# Cache des prédictions /predict (0 entrée = désactivé) ; PREDICTION_CACHE_PATH
+# active un second niveau SQLite partagé par les workers de la machine,
+# limité à PREDICTION_CACHE_SHARED_ROWS entrées.
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', DEFAULT_MAX_ENTRIES))
+PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', DEFAULT_TTL))
+PREDICTION_CACHE_PATH = os.environ.get('PREDICTION_CACHE_PATH')
+PREDICTION_CACHE_SHARED_ROWS = int(os.environ.get('PREDICTION_CACHE_SHARED_ROWS', DEFAULT_SHARED_MAX_ROWS))
+# Registre versionné : la version active (CURRENT) est rechargée à chaud ;
+# SHADOW_MODEL_VERSION est évaluée en parallèle sans être servie.
+MODEL_REGISTRY_DIR = os.environ.get('MODEL_REGISTRY_DIR', str(REGISTRY_DIR))
+MODEL_RELOAD_INTERVAL = float(os.environ.get('MODEL_RELOAD_INTERVAL', DEFAULT_INTERVAL))
+SHADOW_MODEL_VERSION = os.environ.get('SHADOW_MODEL_VERSION')
+# Métriques de /metrics : propres à chaque worker, ou additionnées sur tous
+# les workers via les instantanés écrits dans METRICS_DIR (vidé au démarrage).
+METRICS_DIR = os.environ.get('METRICS_DIR')
+# Profileur par échantillonnage des piles, lu sur /debug/profile (désactivé par défaut)
+PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', '0') == '1'
+PROFILER_INTERVAL_MS = float(os.environ.get('PROFILER_INTERVAL_MS', DEFAULT_PROFILER_INTERVAL * 1000))
+# Résultats des CSV importés dans l'interface : conservés côté serveur (répertoire
+# partagé par les workers) et affichés page par page.
+RESULTS_DIR = os.environ.get('RESULTS_DIR', str(DEFAULT_RESULTS_DIR))
+RESULTS_TTL = float(os.environ.get('RESULTS_TTL', DEFAULT_RESULTS_TTL))
+RESULTS_PAGE_SIZE = int(os.environ.get('RESULTS_PAGE_SIZE', DEFAULT_PAGE_SIZE))
+# Erreurs de validation affichées dans la page (toutes sont comptées dans le résumé)
+MAX_DISPLAYED_ERRORS = 50
+UNSCORABLE_FILE = "Le fichier n'a ni les colonnes du modèle ni les colonnes brutes attendues."
+# File des tâches de scoring en arrière-plan (python -m src.serving.jobs)
+JOBS_DIR = os.environ.get('JOBS_DIR', str(DEFAULT_JOBS_DIR))
+ID_COLUMN = 'Id'
 
 FEATURE_NAMES = [
     "num__Fireplaces","num__GarageArea","num__LotFrontage","num__OverallQual",
@@ -35,7 +99,230 @@ FEATURE_NAMES = [
     "cat__Neighborhood_Veenker"
 ]
 
-model = joblib.load(MODEL_PATH) if os.path.exists(MODEL_PATH) else None
+registry = ModelRegistry(MODEL_REGISTRY_DIR)
+
+metrics = MetricsRegistry(METRICS_DIR)
+request_seconds = metrics.histogram(
+    'house_prices_request_duration_seconds', "Durée des requêtes HTTP.", ('route', 'method', 'status')
+)
+stage_seconds = metrics.histogram(
+    'house_prices_stage_duration_seconds', "Durée de chaque étape du traitement d'une requête.", ('route', 'stage')
+)
+batch_rows = metrics.histogram(
+    'house_prices_batch_rows', "Nombre de lignes reçues par requête de prédiction.", ('route',), BATCH_ROWS_BUCKETS
+)
+rows_scored = metrics.counter(
+    'house_prices_rows_scored_total', "Lignes scorées, par version du modèle.", ('route', 'model_version')
+)
+rows_rejected = metrics.counter(
+    'house_prices_rows_rejected_total',
+    "Lignes rejetées par la validation, par version du modèle.",
+    ('route', 'model_version'),
+)
+profiler = SamplingProfiler(PROFILER_INTERVAL_MS / 1000) if PROFILER_ENABLED else None
+results = ResultStore(RESULTS_DIR, RESULTS_TTL)
+jobs = JobQueue(JOBS_DIR)
+
+
+def record_batch(route, version, scored, rejected=0):
+    """Compter les lignes reçues, scorées et rejetées d'une requête de prédiction."""
+    batch_rows.observe(scored + rejected, route=route)
+    rows_scored.inc(scored, route=route, model_version=version)
+    if rejected:
+        rows_rejected.inc(rejected, route=route, model_version=version)
+
+
+def load_schema(compiled_dir):
+    """Construire le schéma de validation de /predict pour un modèle.
+
+    Les colonnes et les plages des numériques viennent du prétraitement
+    compilé du modèle (one-hot ou codes des catégoriques, bornes IQR
+    standardisées) ; sans lui, les colonnes sont FEATURE_NAMES et seuls le
+    type, la finitude et l'encodage one-hot des catégoriques sont contrôlés.
+    """
+    preprocessor_dir = os.path.join(compiled_dir, PREPROCESSOR_DIR)
+    preprocessor = CompiledPreprocessor.load(preprocessor_dir, mmap=True) if os.path.exists(preprocessor_dir) else None
+    feature_names = list(preprocessor.get_feature_names_out()) if preprocessor is not None else FEATURE_NAMES
+    if not os.path.exists(COLUMN_TYPES_PATH):
+        return FeatureSchema(feature_names)
+    return FeatureSchema.from_column_types(feature_names, COLUMN_TYPES_PATH, preprocessor)
+
+
+def load_served(version=None):
+    """Charger une version du registre (ou models/ s'il est vide) prête à servir.
+
+    Le modèle est préchauffé et le micro-batcher et le cache sont créés pour
+    cette version ; l'objet renvoyé est substitué d'un bloc à l'ancien.
+
+    Args:
+        version (str): Version du registre ; None pour les artefacts de models/.
+
+    Returns:
+        ServedModel: Modèle et objets associés.
+    """
+    if version is not None:
+        loaded = registry.load(version, INFERENCE_ENGINE, mmap=True, lazy=True)
+        model, pipeline, pipeline_path = loaded.model, loaded.pipeline, loaded.pipeline_path
+        compiled_dir = registry.path(version) / COMPILED_DIR
+    else:
+        pipeline = None
+        if INFERENCE_ENGINE == 'compiled' and os.path.exists(os.path.join(COMPILED_MODEL_DIR, PREPROCESSOR_DIR)):
+            pipeline = CompiledPipeline.load(COMPILED_MODEL_DIR, mmap=True)
+            model = pipeline.model
+        elif INFERENCE_ENGINE == 'compiled' and os.path.exists(COMPILED_MODEL_DIR):
+            model = CompiledEnsemble.load(COMPILED_MODEL_DIR, mmap=True)
+        elif os.path.exists(MODEL_PATH):
+            import joblib
+
+            model = joblib.load(MODEL_PATH)
+        else:
+            model = None
+        # Pipeline complet (feature engineering + encodage + modèle) pour les lignes brutes
+        pipeline_path = PIPELINE_PATH
+        # Hors registre, la version est l'empreinte du fichier du modèle
+        version = file_digest(MODEL_PATH)[:16] if model is not None else None
+        compiled_dir = COMPILED_MODEL_DIR
+
+    batcher = (
+        MicroBatcher(model.predict, MICROBATCH_MAX_BATCH_SIZE, MICROBATCH_MAX_WAIT_MS)
+        if model is not None and MICROBATCH_ENABLED
+        else None
+    )
+    schema = load_schema(compiled_dir)
+    served = ServedModel(version, model, pipeline, batcher, pipeline_path=pipeline_path, schema=schema)
+    # Les clés du cache incluent la version : une nouvelle version part d'un cache vide
+    if model is not None and PREDICTION_CACHE_SIZE > 0:
+        served.cache = PredictionCache(
+            served.score,
+            f"{INFERENCE_ENGINE}:{version}",
+            PREDICTION_CACHE_SIZE,
+            PREDICTION_CACHE_TTL,
+            SQLiteBackend(PREDICTION_CACHE_PATH, PREDICTION_CACHE_TTL, PREDICTION_CACHE_SHARED_ROWS)
+            if PREDICTION_CACHE_PATH else None,
+        )
+    served.warm_up(len(schema.feature_names), pipeline=not FAST_START)
+    return served
+
+
+def swap_served(new):
+    """Mettre new en service ; les requêtes en cours terminent sur l'ancienne version."""
+    global served, model
+    old, served = served, new
+    model = new.model
+    old.close()
+    # Le fantôme rejoue la matrice du schéma servi : revérifier ses colonnes
+    if shadow is not None:
+        shadow.check(new.schema)
+
+
+# Modules des chemins lignes brutes et CSV : hors démarrage rapide, ils sont
+# importés dans le maître pour que leurs pages soient partagées par les
+# workers au lieu d'être importées une fois par worker à la première requête.
+PRELOAD_MODULES = ('pandas', 'src.features.build_features', 'src.models.predict_model')
+if not FAST_START:
+    for module in PRELOAD_MODULES:
+        importlib.import_module(module)
+
+# Chargé et préchauffé à l'import : avec gunicorn --preload, une seule fois
+# dans le processus maître avant le fork des workers.
+served = load_served(registry.current())
+model = served.model
+ready = model is not None
+
+# Seconde version évaluée en fantôme sur le même trafic (comparaison hors ligne)
+shadow = (
+    ShadowScorer(load_served(SHADOW_MODEL_VERSION), schema=served.schema)
+    if SHADOW_MODEL_VERSION and ready
+    else None
+)
+
+watcher = (
+    RegistryWatcher(
+        registry, load_served, swap_served, served.version if registry.current() else None, MODEL_RELOAD_INTERVAL
+    )
+    if MODEL_RELOAD_INTERVAL > 0
+    else None
+)
+
+
+@app.before_request
+def start_watcher():
+    # Threads démarrés dans chaque worker, après le fork
+    if watcher is not None:
+        watcher.ensure_started()
+    if profiler is not None:
+        profiler.ensure_started()
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def observe_request(response):
+    # Pour une réponse en flux, seule la préparation (avant le premier bloc) est mesurée
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        request_seconds.observe(
+            time.perf_counter() - start, route=route, method=request.method, status=response.status_code
+        )
+    return response
+
+
+def process_gauges(current):
+    """Jauges calculées à la lecture de /metrics, pour le processus courant.
+
+    Args:
+        current (ServedModel): Modèle servi par le processus.
+
+    Returns:
+        list: Métriques (nom, aide, type, échantillons) pour MetricsRegistry.render.
+    """
+    pid = (('pid', os.getpid()),)
+    gauges = [(
+        'house_prices_model_info', "Version et moteur du modèle servi.", 'gauge',
+        [('', pid + (('model_version', current.version), ('engine', INFERENCE_ENGINE)), 1)],
+    )]
+    try:
+        memory = memory_usage("self")
+    except OSError:
+        memory = None
+    if memory is not None:
+        gauges.append((
+            'house_prices_process_memory_bytes', "Mémoire du processus (rss, pss, uss, shared).", 'gauge',
+            [('', pid + (('kind', key[:-3]),), value * 1024) for key, value in memory.items()],
+        ))
+    if current.cache is not None:
+        stats = current.cache.stats()
+        gauges.append((
+            'house_prices_prediction_cache', "Compteurs du cache des prédictions.", 'gauge',
+            [('', pid + (('stat', key),), value) for key, value in stats.items()],
+        ))
+    return gauges
+
+
+def parse_raw_batch(payload):
+    """Convertir un payload JSON de lignes brutes (schéma Kaggle) en DataFrame.
+
+    Args:
+        payload (dict): {"rows": [{...}, ...]} ou {"columns": {nom: [valeurs]}}.
+
+    Returns:
+        pd.DataFrame: Lignes brutes à passer au pipeline d'inférence.
+
+    Raises:
+        ValueError: Si le payload ne respecte pas le format attendu.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("Le corps de la requête doit être un objet JSON.")
+    import pandas as pd
+
+    try:
+        if "rows" in payload:
+            return pd.DataFrame.from_records(payload["rows"])
+        if "columns" in payload:
+            return pd.DataFrame(payload["columns"])
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Lignes brutes invalides : {exc}") from exc
+    raise ValueError("Le payload doit contenir 'rows' ou 'columns'.")
 
 def friendly_name(col):
     mapping = {
@@ -181,6 +468,7 @@ HTML_TEMPLATE = """
         <div class="button-group">
             <button type="submit" name="action" value="generate">🎲 Générer aléatoirement</button>
             <button type="submit" name="action" value="predict">📊 Prédire</button>
+            <button type="submit" name="action" value="job">⏳ Prédire en arrière-plan</button>
         </div>
     </form>
     {% if inputs %}
@@ -199,10 +487,67 @@ HTML_TEMPLATE = """
         </table>
     </div>
     {% endif %}
+    {% if job %}
+    <div class="result">
+        {% if job.status in ("queued", "running") %}<meta http-equiv="refresh" content="2">{% endif %}
+        <h3>⏳ Tâche {{ job.id }} : {{ job.status }}</h3>
+        {% if job.rows_total %}<p>{{ job.rows_done }} / {{ job.rows_total }} lignes scorées</p>{% endif %}
+        {% if job.error %}<p>{{ job.error }}</p>{% endif %}
+    </div>
+    {% endif %}
+    {% if summary %}
+    <div class="result">
+        <h3>📈 Résumé des {{ summary.rows }} lignes :</h3>
+        <table>
+            <tbody>
+                <tr><td>Lignes scorées</td><td>{{ summary.scored }}</td></tr>
+                <tr><td>Lignes rejetées</td><td>{{ summary.rejected }}</td></tr>
+                {% for key, label in [("mean", "Moyenne"), ("std", "Écart-type"), ("min", "Minimum"),
+                                      ("p25", "1er quartile"), ("median", "Médiane"), ("p75", "3e quartile"),
+                                      ("max", "Maximum")] %}
+                    {% if summary[key] is not none %}
+                    <tr><td>{{ label }}</td><td>{{ summary[key] | round(4) }}</td></tr>
+                    {% endif %}
+                {% endfor %}
+            </tbody>
+        </table>
+        <p><a href="{{ url_for('results_download', token=result.token) }}">
+            ⬇️ Télécharger toutes les prédictions (CSV compressé)
+        </a></p>
+    </div>
+    {% endif %}
     {% if predictions %}
     <div class="result">
         <h3>💰 Résultat de la prédiction :</h3>
-        {% for p in predictions %}<p>➡️ {{ p }}</p>{% endfor %}
+        {% for p in predictions %}
+        <p>➡️ {% if ids %}{{ ids[loop.index0] }} : {% endif %}{{ p if p is not none else "ligne rejetée" }}</p>
+        {% endfor %}
+        {% if pages and pages > 1 %}
+        <p>
+            {% if page > 1 %}
+            <a href="{{ url_for('results_page', token=result.token, page=page - 1) }}">◀ Précédente</a>
+            {% endif %}
+            Page {{ page }} / {{ pages }}
+            {% if page < pages %}
+            <a href="{{ url_for('results_page', token=result.token, page=page + 1) }}">Suivante ▶</a>
+            {% endif %}
+        </p>
+        {% endif %}
+    </div>
+    {% endif %}
+    {% if upload_error %}
+    <div class="result">
+        <h3>⚠️ Fichier rejeté :</h3>
+        <p>{{ upload_error }}</p>
+    </div>
+    {% endif %}
+    {% if errors %}
+    <div class="result">
+        <h3>⚠️ Lignes rejetées :</h3>
+        {% for e in errors %}<p>Ligne {{ e.row + 1 }}, {{ friendly_name(e.column) }} : {{ e.error }}</p>{% endfor %}
+        {% if summary and summary.rejected > errors | length %}
+        <p>… seules les premières erreurs sont affichées.</p>
+        {% endif %}
     </div>
     {% endif %}
 </div>
@@ -210,29 +555,371 @@ HTML_TEMPLATE = """
 </html>
 """
 
+def has_raw_columns(pipeline, df):
+    """Indiquer si df contient les colonnes brutes attendues par le pipeline."""
+    from src.models.pipeline import pipeline_raw_columns
+
+    return set(pipeline_raw_columns(pipeline)).issubset(df.columns)
+
+
+def score_frame(current, df, route='/'):
+    """Scorer un CSV importé (ou un bloc de CSV).
+
+    Un fichier aux colonnes du modèle est validé ligne par ligne (les lignes
+    invalides sont rejetées et signalées) ; un fichier brut passe par le
+    pipeline d'inférence.
+
+    Args:
+        current (ServedModel): Modèle servi.
+        df (pd.DataFrame): Lignes importées.
+        route (str): Label des métriques ("/" ou "job").
+
+    Returns:
+        tuple: (prédictions, NaN pour une ligne rejetée ; première ligne de
+        features ou None ; erreurs), ou None si le fichier n'a ni les
+        colonnes du modèle ni les colonnes brutes du pipeline.
+
+    Raises:
+        KeyError, TypeError, ValueError: Si une valeur brute n'est pas
+            convertible par le pipeline.
+    """
+    if set(current.schema.feature_names).issubset(df.columns):
+        with stage_seconds.time(route=route, stage='decode'):
+            decoded = current.schema.decode_frame(df)
+        predictions = np.full(decoded.n_rows, np.nan)
+        if current.model and len(decoded.X):
+            with stage_seconds.time(route=route, stage='predict'):
+                predictions[decoded.rows] = current.model.predict(decoded.X)
+            record_batch(route, current.version, len(decoded.X), decoded.n_rows - len(decoded.X))
+        first_input, errors = decoded.X[:1].tolist(), list(decoded.errors)
+    elif current.pipeline is not None and has_raw_columns(current.pipeline, df):
+        # Fichier brut : une seule transformation vectorisée du lot
+        with stage_seconds.time(route=route, stage='transform'):
+            X = current.pipeline[:-1].transform(df)
+        with stage_seconds.time(route=route, stage='predict'):
+            predictions = current.pipeline[-1].predict(X)
+        record_batch(route, current.version, len(X))
+        first_input, errors = np.asarray(X[:1]).tolist(), []
+    else:
+        return None
+    return predictions, first_input[0] if first_input else None, errors
+
+
+def score_upload(current, df):
+    """Scorer un CSV importé et conserver ses résultats dans une session.
+
+    Returns:
+        ResultSession: Session des résultats ; None si le fichier n'est pas
+        scorable (voir score_frame).
+    """
+    scored = score_frame(current, df)
+    if scored is None:
+        return None
+    ids = df[ID_COLUMN].to_numpy() if ID_COLUMN in df.columns else None
+    predictions, first_input, errors = scored
+    with stage_seconds.time(route='/', stage='store'):
+        return results.create(predictions, ids, first_input, errors, current.version)
+
+
+def read_upload(current, file):
+    """Lire et scorer un CSV importé par le formulaire.
+
+    Returns:
+        tuple: (ResultSession ou None, message d'erreur ou None) ; un fichier
+        illisible ou non scorable est signalé dans la page, pas par une 500.
+    """
+    import pandas as pd
+
+    try:
+        with stage_seconds.time(route='/', stage='parse_csv'):
+            df = pd.read_csv(file)
+        result = score_upload(current, df)
+    # pd.errors.ParserError et EmptyDataError dérivent de ValueError
+    except (KeyError, TypeError, ValueError) as exc:
+        return None, f"Fichier illisible : {exc}"
+    if result is None:
+        return None, UNSCORABLE_FILE
+    return result, None
+
+
+def job_scorer():
+    """Modèle servi à cet instant, figé pour toute une tâche (voir JobWorker)."""
+    current = served
+
+    def store(predictions, ids, first_input, errors, version):
+        return results.create(predictions, ids, first_input, errors, version).token
+
+    return current.version, lambda df: score_frame(current, df, route='job'), store
+
+
+def job_status(job):
+    """Représentation JSON d'une tâche, avec les liens vers ses résultats une fois terminée."""
+    status = {key: job[key] for key in ("id", "status", "rows_done", "rows_total", "model_version", "error")}
+    status["progress"] = round(job["rows_done"] / job["rows_total"], 4) if job["rows_total"] else None
+    if job["result_token"] is not None:
+        status["results"] = {
+            "page": f"/results/{job['result_token']}",
+            "predictions": f"/results/{job['result_token']}/predictions",
+            "download": f"/results/{job['result_token']}/predictions.csv.gz",
+        }
+    return status
+
+
+def result_context(result, page=1):
+    """Variables du gabarit pour une page d'une session de résultats.
+
+    Raises:
+        ValueError: Si la page est hors limites.
+    """
+    ids, predictions = result.page(page, RESULTS_PAGE_SIZE)
+    return {
+        "result": result,
+        "summary": result.summary,
+        "page": page,
+        "pages": result.pages(RESULTS_PAGE_SIZE),
+        "ids": ids,
+        "predictions": predictions,
+        "inputs": [result.meta["first_input"]] if result.meta["first_input"] else [],
+        "errors": result.meta["errors"][:MAX_DISPLAYED_ERRORS],
+    }
+
+
+def find_result_page(token, page, page_size):
+    """Session demandée ; None si inconnue ou expirée.
+
+    Raises:
+        ValueError: Si la page est hors limites.
+    """
+    result = results.get(token)
+    if result is not None and not 1 <= page <= result.pages(page_size):
+        raise ValueError(f"Page hors limites : {page} (1 à {result.pages(page_size)}).")
+    return result
+
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
-    predictions = []
-    inputs = []
+    current = served
+    model = current.model
+    feature_names = current.schema.feature_names
+    context = {"predictions": [], "inputs": [], "errors": []}
     if request.method == 'POST':
         action = request.form.get("action")
 
         if action == "generate":
-            row = [round(random.uniform(-2, 3), 4) for _ in FEATURE_NAMES]
-            inputs.append(row)
+            row = [round(random.uniform(-2, 3), 4) for _ in feature_names]
+            context["inputs"] = [row]
             if model:
-                predictions = model.predict(np.array(inputs))
+                context["predictions"] = model.predict(np.array([row]))
 
         elif action == "predict" and 'csv_file' in request.files:
             file = request.files['csv_file']
             if file:
-                df = pd.read_csv(file)
-                if set(FEATURE_NAMES).issubset(df.columns):
-                    inputs = df[FEATURE_NAMES].values.tolist()
-                    if model:
-                        predictions = model.predict(df[FEATURE_NAMES])
+                result, error = read_upload(current, file)
+                if result is not None:
+                    # Seule la première page est rendue, quelle que soit la taille du fichier
+                    context = result_context(result)
+                context["upload_error"] = error
+
+        elif action == "job" and request.files.get('csv_file'):
+            # Le fichier est seulement enregistré : un worker de tâches le scorera
+            job_id = jobs.submit(request.files['csv_file'].save)
+            return redirect(url_for('job_page', job_id=job_id), code=303)
+
+    with stage_seconds.time(route='/', stage='render'):
+        return render_template_string(
+            HTML_TEMPLATE, feature_names=feature_names, friendly_name=friendly_name, **context
+        )
+
+@app.route('/results/<token>')
+def results_page(token):
+    """Page d'une session de résultats (?page=N)."""
+    page = request.args.get('page', 1, type=int)
+    try:
+        result = find_result_page(token, page, RESULTS_PAGE_SIZE)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    if result is None:
+        return jsonify({"error": "Résultats inconnus ou expirés."}), 404
+    return render_template_string(
+        HTML_TEMPLATE,
+        feature_names=served.schema.feature_names,
+        friendly_name=friendly_name,
+        **result_context(result, page),
+    )
+
+@app.route('/results/<token>/predictions')
+def results_predictions(token):
+    """Une page de prédictions au format JSON (?page=N&page_size=M)."""
+    page = request.args.get('page', 1, type=int)
+    page_size = min(max(request.args.get('page_size', RESULTS_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    try:
+        result = find_result_page(token, page, page_size)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    if result is None:
+        return jsonify({"error": "Résultats inconnus ou expirés."}), 404
+    ids, predictions = result.page(page, page_size)
+    return jsonify({
+        "page": page,
+        "pages": result.pages(page_size),
+        "ids": ids,
+        "predictions": predictions,
+        "summary": result.summary,
+    })
+
+@app.route('/results/<token>/predictions.csv.gz')
+def results_download(token):
+    """Toutes les prédictions de la session en CSV compressé (gzip)."""
+    result = results.get(token)
+    if result is None:
+        return jsonify({"error": "Résultats inconnus ou expirés."}), 404
+    return send_file(
+        result.csv_path(), mimetype='application/gzip', as_attachment=True, download_name='predictions.csv.gz'
+    )
+
+@app.route('/healthz')
+def healthz():
+    """Liveness : le processus répond."""
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz')
+def readyz():
+    """Readiness : le modèle est chargé et préchauffé."""
+    current = served
+    status = {
+        "model": current.model is not None,
+        "pipeline": current.has_pipeline,
+        "engine": INFERENCE_ENGINE,
+        "version": current.version,
+    }
+    if current.cache is not None:
+        status["cache"] = current.cache.stats()
+    if shadow is not None:
+        status["shadow"] = shadow.stats()
+    return jsonify({"ready": ready, **status}), 200 if ready else 503
+
+@app.route('/predict', methods=['POST'])
+def predict():
+    """Prédire un lot de maisons au format JSON, sans rendu HTML.
+
+    Réponse : {"predictions": [...], "errors": [...]} ; une ligne rejetée a
+    une prédiction null et ses erreurs sont listées avec leur ligne et colonne.
+    """
+    current = served
+    if current.model is None:
+        return jsonify({"error": "Modèle indisponible."}), 503
+    try:
+        with stage_seconds.time(route='/predict', stage='decode'):
+            decoded = current.schema.decode(request.get_json(silent=True))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    # Les lignes invalides sont écartées sans faire échouer le lot
+    X = decoded.X
+    with stage_seconds.time(route='/predict', stage='predict'):
+        predictions = current.predict(X) if len(X) else np.empty(0)
+    record_batch('/predict', current.version, len(X), decoded.n_rows - len(X))
+    if shadow is not None and len(X):
+        shadow.submit(X, predictions)
+    with stage_seconds.time(route='/predict', stage='serialize'):
+        return jsonify({"predictions": decoded.scatter(predictions), "errors": decoded.errors})
+
+@app.route('/predict/raw', methods=['POST'])
+def predict_raw():
+    """Prédire un lot de lignes brutes (YrSold, YearBuilt, Neighborhood, ...)."""
+    current = served
+    pipeline = current.pipeline
+    if pipeline is None:
+        return jsonify({"error": "Pipeline d'inférence indisponible."}), 503
+    try:
+        with stage_seconds.time(route='/predict/raw', stage='decode'):
+            df = parse_raw_batch(request.get_json(silent=True))
+        with stage_seconds.time(route='/predict/raw', stage='predict'):
+            predictions = pipeline.predict(df) if len(df) else np.empty(0)
+    except (KeyError, ValueError) as exc:
+        return jsonify({"error": f"Lignes brutes invalides : {exc}"}), 400
+    record_batch('/predict/raw', current.version, len(df))
+    return jsonify({"predictions": predictions.tolist()})
+
+@app.route('/predict/stream', methods=['POST'])
+def predict_stream():
+    """Scorer un CSV volumineux par blocs et renvoyer les prédictions en flux CSV."""
+    from src.models.predict_model import DEFAULT_CHUNKSIZE, format_predictions, iter_predictions
+
+    current = served
+    model = current.model
+    if model is None:
+        return jsonify({"error": "Modèle indisponible."}), 503
+    file = request.files.get('csv_file')
+    if not file:
+        return jsonify({"error": "Fichier 'csv_file' manquant."}), 400
+    chunksize = request.args.get('chunksize', DEFAULT_CHUNKSIZE, type=int)
+
+    # Flask ferme les fichiers reçus à la fin de la vue : on garde le flux
+    # ouvert jusqu'à la fin de la génération de la réponse.
+    stream, file.stream = file.stream, io.BytesIO()
+    chunks = iter_predictions(model, stream, current.schema.feature_names, chunksize)
+    try:
+        # Valider le premier bloc avant d'envoyer l'en-tête de la réponse
+        first = next(chunks, None)
+    except ValueError as exc:
+        stream.close()
+        return jsonify({"error": str(exc)}), 400
+
+    def generate():
+        try:
+            if first is None:
+                return
+            yield format_predictions(*first, header=True)
+            rows_scored.inc(len(first[1]), route='/predict/stream', model_version=current.version)
+            for ids, predictions in chunks:
+                yield format_predictions(ids, predictions)
+                rows_scored.inc(len(predictions), route='/predict/stream', model_version=current.version)
+        finally:
+            stream.close()
+
+    return Response(generate(), mimetype='text/csv')
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Mettre un CSV en file pour un scoring en arrière-plan ; répond 202 avec l'identifiant."""
+    file = request.files.get('csv_file')
+    if not file:
+        return jsonify({"error": "Fichier 'csv_file' manquant."}), 400
+    job_id = jobs.submit(file.save)
+    return jsonify(job_status(jobs.get(job_id))), 202, {"Location": url_for('job_detail', job_id=job_id)}
+
+@app.route('/jobs/<job_id>', methods=['GET', 'DELETE'])
+def job_detail(job_id):
+    """État et avancement d'une tâche (GET) ou demande d'annulation (DELETE)."""
+    job = jobs.cancel(job_id) if request.method == 'DELETE' else jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Tâche inconnue."}), 404
+    return jsonify(job_status(job))
+
+@app.route('/jobs/<job_id>/page')
+def job_page(job_id):
+    """Page d'attente d'une tâche, rafraîchie jusqu'à la page de ses résultats."""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Tâche inconnue."}), 404
+    if job["result_token"] is not None:
+        return redirect(url_for('results_page', token=job["result_token"]), code=303)
+    return render_template_string(
+        HTML_TEMPLATE, job=job_status(job), feature_names=served.schema.feature_names, friendly_name=friendly_name
+    )
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Métriques au format texte Prometheus (durées, lignes scorées, lots)."""
+    return Response(metrics.render(process_gauges(served)), content_type=CONTENT_TYPE)
 
-    return render_template_string(HTML_TEMPLATE, predictions=predictions, inputs=inputs, feature_names=FEATURE_NAMES, friendly_name=friendly_name)
+@app.route('/debug/profile')
+def debug_profile():
+    """Piles échantillonnées du worker (format folded) ; ?reset=1 repart de zéro."""
+    if profiler is None:
+        return jsonify({"error": "Profileur désactivé (PROFILER_ENABLED=1)."}), 404
+    return Response(profiler.folded(reset=request.args.get('reset') == '1'), mimetype='text/plain')
 
 if __name__ == '__main__':
+    # Serveur de développement ; en production : gunicorn -c gunicorn.conf.py app:app
     app.run(debug=True, host='0.0.0.0', port=5000)
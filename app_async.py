@@ -0,0 +1,334 @@
+"""Variante asynchrone (ASGI) de app.py, avec les mêmes routes.
+
+Les entrées/sorties des requêtes (envoi lent des fichiers, réponses en flux)
+sont gérées sur la boucle d'événements ; le parsing CSV et model.predict
+s'exécutent dans un pool de threads borné. Au-delà de ASYNC_MAX_PENDING
+tâches en attente, les nouvelles requêtes reçoivent immédiatement un 503.
+
+Lancement : hypercorn app_async:app --bind 0.0.0.0:5000
+"""
+import asyncio
+import io
+import os
+import random
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from quart import Quart, Response, g, jsonify, redirect, render_template_string, request, send_file, url_for
+
+import app as base
+from src.models.predict_model import DEFAULT_CHUNKSIZE, format_predictions, iter_predictions
+from src.serving.metrics import CONTENT_TYPE
+
+app = Quart(__name__)
+
+EXECUTOR_WORKERS = int(os.environ.get('ASYNC_EXECUTOR_WORKERS', os.cpu_count() or 1))
+MAX_PENDING = int(os.environ.get('ASYNC_MAX_PENDING', 64))
+
+executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix='predict')
+_pending = 0
+
+
+class Overloaded(Exception):
+    """Trop de tâches en attente dans le pool de calcul."""
+
+
+async def run_blocking(fn, *args):
+    """Exécuter fn(*args) dans le pool borné sans bloquer la boucle d'événements.
+
+    Raises:
+        Overloaded: Si ASYNC_MAX_PENDING tâches sont déjà en attente.
+    """
+    global _pending
+    if _pending >= MAX_PENDING:
+        raise Overloaded()
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+    finally:
+        _pending -= 1
+
+
+@app.errorhandler(Overloaded)
+async def overloaded(_):
+    return jsonify({"error": "Serveur saturé, réessayez plus tard."}), 503, {"Retry-After": "1"}
+
+
+def _submit_job(stream):
+    """Enregistrer un CSV reçu et le mettre en file (exécuté dans le pool)."""
+    def save(path):
+        with open(path, 'wb') as f:
+            shutil.copyfileobj(stream, f)
+
+    return base.jobs.submit(save)
+
+
+@app.before_request
+async def start_watcher():
+    if base.watcher is not None:
+        base.watcher.ensure_started()
+    if base.profiler is not None:
+        base.profiler.ensure_started()
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+async def observe_request(response):
+    # Mêmes métriques que app.py, déclarées dans son registre
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        base.request_seconds.observe(
+            time.perf_counter() - start, route=route, method=request.method, status=response.status_code
+        )
+    return response
+
+
+@app.route('/', methods=['GET', 'POST'])
+async def index():
+    current = base.served
+    context = {"predictions": [], "inputs": [], "errors": []}
+    if request.method == 'POST':
+        form = await request.form
+        action = form.get("action")
+
+        if action == "generate":
+            context["inputs"] = [[round(random.uniform(-2, 3), 4) for _ in current.schema.feature_names]]
+            if current.model:
+                context["predictions"] = await run_blocking(current.model.predict, np.array(context["inputs"]))
+
+        elif action == "predict":
+            files = await request.files
+            file = files.get('csv_file')
+            if file:
+                result, error = await run_blocking(base.read_upload, current, file.stream)
+                if result is not None:
+                    context = base.result_context(result)
+                context["upload_error"] = error
+
+        elif action == "job":
+            files = await request.files
+            file = files.get('csv_file')
+            if file:
+                job_id = await run_blocking(_submit_job, file.stream)
+                return redirect(url_for('job_page', job_id=job_id), code=303)
+
+    return await render_template_string(
+        base.HTML_TEMPLATE,
+        feature_names=current.schema.feature_names,
+        friendly_name=base.friendly_name,
+        **context,
+    )
+
+
+@app.route('/results/<token>')
+async def results_page(token):
+    """Page d'une session de résultats (?page=N)."""
+    page = request.args.get('page', 1, type=int)
+    try:
+        result = base.find_result_page(token, page, base.RESULTS_PAGE_SIZE)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    if result is None:
+        return jsonify({"error": "Résultats inconnus ou expirés."}), 404
+    return await render_template_string(
+        base.HTML_TEMPLATE,
+        feature_names=base.served.schema.feature_names,
+        friendly_name=base.friendly_name,
+        **base.result_context(result, page),
+    )
+
+
+@app.route('/results/<token>/predictions')
+async def results_predictions(token):
+    """Une page de prédictions au format JSON (?page=N&page_size=M)."""
+    page = request.args.get('page', 1, type=int)
+    page_size = min(max(request.args.get('page_size', base.RESULTS_PAGE_SIZE, type=int), 1), base.MAX_PAGE_SIZE)
+    try:
+        result = base.find_result_page(token, page, page_size)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    if result is None:
+        return jsonify({"error": "Résultats inconnus ou expirés."}), 404
+    ids, predictions = result.page(page, page_size)
+    return jsonify({
+        "page": page,
+        "pages": result.pages(page_size),
+        "ids": ids,
+        "predictions": predictions,
+        "summary": result.summary,
+    })
+
+
+@app.route('/results/<token>/predictions.csv.gz')
+async def results_download(token):
+    """Toutes les prédictions de la session en CSV compressé (gzip)."""
+    result = base.results.get(token)
+    if result is None:
+        return jsonify({"error": "Résultats inconnus ou expirés."}), 404
+    # Le CSV est écrit au premier téléchargement : dans le pool, hors de la boucle
+    path = await run_blocking(result.csv_path)
+    return await send_file(
+        path, mimetype='application/gzip', as_attachment=True, attachment_filename='predictions.csv.gz'
+    )
+
+
+@app.route('/healthz')
+async def healthz():
+    """Liveness : la boucle d'événements répond."""
+    return jsonify({"status": "ok"})
+
+
+@app.route('/readyz')
+async def readyz():
+    """Readiness : le modèle est chargé ; expose aussi la file du pool."""
+    current = base.served
+    status = {
+        "model": current.model is not None,
+        "pipeline": current.pipeline is not None,
+        "version": current.version,
+        "pending": _pending,
+    }
+    return jsonify({"ready": base.ready, **status}), 200 if base.ready else 503
+
+
+@app.route('/predict', methods=['POST'])
+async def predict():
+    """Prédire un lot de maisons au format JSON, sans rendu HTML."""
+    current = base.served
+    if current.model is None:
+        return jsonify({"error": "Modèle indisponible."}), 503
+    payload = await request.get_json(silent=True)
+    try:
+        with base.stage_seconds.time(route='/predict', stage='decode'):
+            decoded = current.schema.decode(payload)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    X = decoded.X
+    # Inclut l'attente d'un thread libre dans le pool
+    with base.stage_seconds.time(route='/predict', stage='predict'):
+        predictions = await run_blocking(current.predict, X) if len(X) else np.empty(0)
+    base.record_batch('/predict', current.version, len(X), decoded.n_rows - len(X))
+    if base.shadow is not None and len(X):
+        base.shadow.submit(X, predictions)
+    return jsonify({"predictions": decoded.scatter(predictions), "errors": decoded.errors})
+
+
+@app.route('/predict/raw', methods=['POST'])
+async def predict_raw():
+    """Prédire un lot de lignes brutes (YrSold, YearBuilt, Neighborhood, ...)."""
+    current = base.served
+    pipeline = current.pipeline
+    if pipeline is None:
+        return jsonify({"error": "Pipeline d'inférence indisponible."}), 503
+    try:
+        df = base.parse_raw_batch(await request.get_json(silent=True))
+        with base.stage_seconds.time(route='/predict/raw', stage='predict'):
+            predictions = await run_blocking(pipeline.predict, df) if len(df) else np.empty(0)
+    except (KeyError, ValueError) as exc:
+        return jsonify({"error": f"Lignes brutes invalides : {exc}"}), 400
+    base.record_batch('/predict/raw', current.version, len(df))
+    return jsonify({"predictions": predictions.tolist()})
+
+
+@app.route('/predict/stream', methods=['POST'])
+async def predict_stream():
+    """Scorer un CSV envoyé en multipart et renvoyer les prédictions en flux."""
+    current = base.served
+    model = current.model
+    if model is None:
+        return jsonify({"error": "Modèle indisponible."}), 503
+    files = await request.files
+    file = files.get('csv_file')
+    if not file:
+        return jsonify({"error": "Fichier 'csv_file' manquant."}), 400
+    chunksize = request.args.get('chunksize', DEFAULT_CHUNKSIZE, type=int)
+
+    # Comme dans app.py : le fichier reçu est fermé à la fin de la requête,
+    # on le détache pour que le générateur puisse le lire pendant le flux.
+    stream, file.stream = file.stream, io.BytesIO()
+    chunks = iter_predictions(model, stream, current.schema.feature_names, chunksize)
+    try:
+        first = await run_blocking(next, chunks, None)
+    except (Overloaded, ValueError) as exc:
+        stream.close()
+        if isinstance(exc, Overloaded):
+            raise
+        return jsonify({"error": str(exc)}), 400
+
+    async def generate():
+        try:
+            chunk = first
+            header = True
+            while chunk is not None:
+                yield format_predictions(*chunk, header=header)
+                header = False
+                chunk = await run_blocking(next, chunks, None)
+        finally:
+            stream.close()
+
+    return Response(generate(), mimetype='text/csv')
+
+
+@app.route('/jobs', methods=['POST'])
+async def submit_job():
+    """Mettre un CSV en file pour un scoring en arrière-plan ; répond 202 avec l'identifiant."""
+    files = await request.files
+    file = files.get('csv_file')
+    if not file:
+        return jsonify({"error": "Fichier 'csv_file' manquant."}), 400
+    job_id = await run_blocking(_submit_job, file.stream)
+    return jsonify(base.job_status(base.jobs.get(job_id))), 202, {"Location": url_for('job_detail', job_id=job_id)}
+
+
+@app.route('/jobs/<job_id>', methods=['GET', 'DELETE'])
+async def job_detail(job_id):
+    """État et avancement d'une tâche (GET) ou demande d'annulation (DELETE)."""
+    job = base.jobs.cancel(job_id) if request.method == 'DELETE' else base.jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Tâche inconnue."}), 404
+    return jsonify(base.job_status(job))
+
+
+@app.route('/jobs/<job_id>/page')
+async def job_page(job_id):
+    """Page d'attente d'une tâche, rafraîchie jusqu'à la page de ses résultats."""
+    job = base.jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Tâche inconnue."}), 404
+    if job["result_token"] is not None:
+        return redirect(url_for('results_page', token=job["result_token"]), code=303)
+    return await render_template_string(
+        base.HTML_TEMPLATE,
+        job=base.job_status(job),
+        feature_names=base.served.schema.feature_names,
+        friendly_name=base.friendly_name,
+    )
+
+
+@app.route('/metrics')
+async def metrics_endpoint():
+    """Métriques au format texte Prometheus, avec la file du pool de calcul."""
+    gauges = base.process_gauges(base.served) + [
+        (
+            'house_prices_executor_pending',
+            "Tâches en attente ou en cours dans le pool de calcul.",
+            'gauge',
+            [('', (), _pending)],
+        ),
+    ]
+    return Response(base.metrics.render(gauges), content_type=CONTENT_TYPE)
+
+
+@app.route('/debug/profile')
+async def debug_profile():
+    """Piles échantillonnées du processus (format folded) ; ?reset=1 repart de zéro."""
+    if base.profiler is None:
+        return jsonify({"error": "Profileur désactivé (PROFILER_ENABLED=1)."}), 404
+    return Response(base.profiler.folded(reset=request.args.get('reset') == '1'), mimetype='text/plain')
+
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=5000)
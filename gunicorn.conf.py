@@ -0,0 +1,70 @@
+"""Configuration gunicorn du serving de production.
+
+Lancement : gunicorn -c gunicorn.conf.py app:app
+
+L'application (et donc le modèle) est chargée une seule fois dans le
+processus maître avant le fork : les workers partagent ses pages mémoire en
+copy-on-write au lieu de désérialiser chacun leur copie.
+
+Les workers des tâches en arrière-plan (POST /jobs) sont lancés avec le
+serveur et arrêtés avec lui ; JOB_WORKERS=0 les désactive, par exemple
+quand ils tournent dans un conteneur séparé (python -m src.serving.jobs).
+"""
+import gc
+import multiprocessing
+import os
+import subprocess
+import sys
+
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+# Plusieurs threads par worker pour que le micro-batching regroupe des requêtes
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+preload_app = True
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+graceful_timeout = 30
+keepalive = 5
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 0))
+max_requests_jitter = max_requests // 10
+accesslog = "-"
+job_workers = int(os.environ.get("JOB_WORKERS", 1))
+_job_pool = None
+
+
+def on_starting(server):
+    # Instantanés de métriques d'un lancement précédent : les compteurs repartent de zéro
+    metrics_dir = os.environ.get("METRICS_DIR")
+    if metrics_dir and os.path.isdir(metrics_dir):
+        for name in os.listdir(metrics_dir):
+            if name.endswith(".json"):
+                os.remove(os.path.join(metrics_dir, name))
+
+
+def when_ready(server):
+    # Geler les objets déjà chargés (modèle, pipeline) : le ramasse-miettes ne
+    # les parcourt plus, ce qui évite de dupliquer leurs pages dans chaque worker.
+    gc.freeze()
+    global _job_pool
+    if job_workers > 0:
+        # Processus séparé (pas un fork du maître) qui relance ses workers
+        _job_pool = subprocess.Popen(
+            [sys.executable, "-m", "src.serving.jobs", "--workers", str(job_workers)]
+        )
+        server.log.info("Workers des tâches démarrés (pid %s)", _job_pool.pid)
+
+
+def on_exit(server):
+    if _job_pool is not None and _job_pool.poll() is None:
+        _job_pool.terminate()
+        _job_pool.wait(timeout=graceful_timeout)
+
+
+def post_fork(server, worker):
+    # Surveillance du registre démarrée dès le fork plutôt qu'à la première requête
+    import app
+
+    if app.watcher is not None:
+        app.watcher.ensure_started()
+    if app.profiler is not None:
+        app.profiler.ensure_started()
@@ -0,0 +1,362 @@
+"""Benchmark de latence, de débit et de mémoire des étapes du serving.
+
+Chaque étape (features, prétraitement, prédiction, décodage, routes HTTP)
+est mesurée sur des données synthétiques de plusieurs tailles : médiane et
+p99 de la durée sur plusieurs exécutions, débit (lignes/s à la médiane) et
+pic d'allocations Python/NumPy (tracemalloc, sur une exécution à part). Les
+routes HTTP passent par le client de test Flask : toute la pile WSGI de
+l'application, sans le réseau ; le cache des prédictions est désactivé pour
+mesurer le calcul et non le cache.
+
+Les résultats sont comparés à une référence enregistrée : une étape plus
+lente ou plus gourmande que la référence au-delà de la tolérance est une
+régression, et la commande se termine en erreur.
+
+Lancement :
+    python -m src.benchmarks.suite                      # comparer à la référence
+    python -m src.benchmarks.suite --sizes 1 1000 --stages "predict (compiled)"
+    python -m src.benchmarks.suite --save-baseline      # remplacer la référence
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from functools import cached_property
+
+import numpy as np
+
+from src.benchmarks.synthetic import DEFAULT_SEED, RAW_TRAIN_PATH, make_raw
+from src.models.compiled import PROJECT_DIR
+
+BASELINE_PATH = PROJECT_DIR / "reports" / "benchmarks" / "baseline.json"
+DEFAULT_SIZES = (1, 1_000, 100_000, 1_000_000)
+DEFAULT_TOLERANCE = 0.25
+# En deçà de ces écarts absolus, une différence est du bruit de mesure
+MIN_DELTA_MS = 1.0
+MIN_DELTA_MB = 1.0
+# Nombre d'exécutions chronométrées : beaucoup pour les petits lots, au moins 3
+TARGET_ROWS_PER_SIZE = 100_000
+MIN_REPEAT = 3
+MAX_REPEAT = 100
+
+
+class Context:
+    """Données synthétiques et artefacts partagés par les étapes.
+
+    Les données d'une taille sont générées une fois et libérées par reset
+    avant de passer à la taille suivante.
+
+    Args:
+        seed (int): Graine des données synthétiques.
+    """
+
+    def __init__(self, seed=DEFAULT_SEED):
+        self.seed = seed
+        self._data = {}
+
+    def reset(self):
+        self._data.clear()
+        gc.collect()
+
+    def _cached(self, key, compute):
+        if key not in self._data:
+            self._data[key] = compute()
+        return self._data[key]
+
+    @cached_property
+    def source(self):
+        import pandas as pd
+
+        return pd.read_csv(RAW_TRAIN_PATH)
+
+    @cached_property
+    def app(self):
+        # Mesurer le calcul et non le cache ; pas de thread de rechargement
+        os.environ.setdefault("PREDICTION_CACHE_SIZE", "0")
+        os.environ.setdefault("MODEL_RELOAD_INTERVAL", "0")
+        import app
+
+        return app
+
+    @property
+    def served(self):
+        return self.app.served
+
+    @cached_property
+    def client(self):
+        return self.app.app.test_client()
+
+    @cached_property
+    def compiled_pipeline(self):
+        from src.models.compiled import CompiledPipeline
+
+        return CompiledPipeline.load(os.path.join(PROJECT_DIR, self.app.COMPILED_MODEL_DIR), mmap=True)
+
+    def raw(self, n_rows):
+        return self._cached(("raw", n_rows), lambda: make_raw(n_rows, self.source, self.seed))
+
+    def matrix(self, n_rows):
+        """Matrice du modèle (float32) des lignes brutes synthétiques."""
+        return self._cached(
+            ("matrix", n_rows),
+            lambda: self.compiled_pipeline[:-1].transform(self.raw(n_rows)).astype(np.float32),
+        )
+
+
+def _check(response):
+    if response.status_code != 200:
+        raise RuntimeError(f"Réponse HTTP {response.status_code} : {response.get_data(as_text=True)[:200]}")
+    return response
+
+
+def _features(ctx, n_rows):
+    from src.features.build_features import build_features
+
+    raw = ctx.raw(n_rows)
+    return lambda: build_features(raw)
+
+
+def _preprocess_sklearn(ctx, n_rows):
+    raw, preprocessor = ctx.raw(n_rows), ctx.served.pipeline[:-1]
+    return lambda: preprocessor.transform(raw)
+
+
+def _preprocess_compiled(ctx, n_rows):
+    raw, preprocessor = ctx.raw(n_rows), ctx.compiled_pipeline[:-1]
+    return lambda: preprocessor.transform(raw)
+
+
+def _predict_xgboost(ctx, n_rows):
+    import joblib
+
+    X, model = ctx.matrix(n_rows), joblib.load(os.path.join(PROJECT_DIR, ctx.app.MODEL_PATH))
+    return lambda: model.predict(X)
+
+
+def _predict_compiled(ctx, n_rows):
+    X, model = ctx.matrix(n_rows), ctx.compiled_pipeline[-1]
+    return lambda: model.predict(X)
+
+
+def _decode(ctx, n_rows):
+    payload, schema = {"instances": ctx.matrix(n_rows).tolist()}, ctx.served.schema
+    return lambda: schema.decode(payload)
+
+
+def _http_predict(ctx, n_rows):
+    body, client = json.dumps({"instances": ctx.matrix(n_rows).tolist()}), ctx.client
+    return lambda: _check(client.post("/predict", data=body, content_type="application/json"))
+
+
+def _http_predict_raw(ctx, n_rows):
+    body, client = '{"rows": ' + ctx.raw(n_rows).to_json(orient="records") + "}", ctx.client
+    return lambda: _check(client.post("/predict/raw", data=body, content_type="application/json"))
+
+
+def _http_predict_stream(ctx, n_rows):
+    import pandas as pd
+
+    frame = pd.DataFrame(ctx.matrix(n_rows), columns=ctx.served.schema.feature_names)
+    frame.insert(0, "Id", np.arange(1, n_rows + 1))
+    content, client = frame.to_csv(index=False).encode(), ctx.client
+
+    def run():
+        data = {"csv_file": (io.BytesIO(content), "houses.csv")}
+        return _check(client.post("/predict/stream", data=data, content_type="multipart/form-data")).get_data()
+
+    return run
+
+
+# nom -> (préparation renvoyant l'appel à mesurer, nombre maximal de lignes)
+STAGES = {
+    "features": (_features, None),
+    "preprocess (sklearn)": (_preprocess_sklearn, None),
+    "preprocess (compiled)": (_preprocess_compiled, None),
+    "predict (xgboost)": (_predict_xgboost, None),
+    "predict (compiled)": (_predict_compiled, None),
+    # Au-delà, le corps de la requête seul occupe plusieurs Go en mémoire
+    "decode (schema)": (_decode, 100_000),
+    "http /predict": (_http_predict, 100_000),
+    "http /predict/raw": (_http_predict_raw, 100_000),
+    "http /predict/stream": (_http_predict_stream, 100_000),
+}
+
+
+def repeat_for(n_rows):
+    """Nombre d'exécutions chronométrées pour un lot de n_rows lignes."""
+    return int(np.clip(TARGET_ROWS_PER_SIZE // max(n_rows, 1), MIN_REPEAT, MAX_REPEAT))
+
+
+def measure(fn, n_rows, repeat):
+    """Chronométrer fn et mesurer son pic d'allocations.
+
+    Une exécution de chauffe précède les mesures ; le pic mémoire est pris
+    sur une exécution supplémentaire, tracemalloc ralentissant le code suivi.
+
+    Returns:
+        dict: rows, repeat, p50_ms, p99_ms, rows_per_s, peak_mb.
+    """
+    fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    p50, p99 = np.percentile(timings, [50, 99])
+    return {
+        "rows": n_rows,
+        "repeat": repeat,
+        "p50_ms": p50 * 1000,
+        "p99_ms": p99 * 1000,
+        "rows_per_s": n_rows / p50 if p50 > 0 else float("inf"),
+        "peak_mb": peak / 2**20,
+    }
+
+
+def run_suite(sizes=DEFAULT_SIZES, stages=None, seed=DEFAULT_SEED, context=None, log=print):
+    """Mesurer chaque étape à chaque taille.
+
+    Args:
+        sizes (list): Nombres de lignes des lots.
+        stages (list): Étapes à mesurer (clés de STAGES) ; toutes par défaut.
+        seed (int): Graine des données synthétiques.
+        context (Context): Contexte partagé ; créé si None.
+        log (callable): Affichage de la progression (None pour aucun).
+
+    Returns:
+        list: Un dictionnaire par mesure (stage, rows, p50_ms, ...).
+    """
+    context = context or Context(seed)
+    results = []
+    for n_rows in sizes:
+        for name in stages or STAGES:
+            prepare, max_rows = STAGES[name]
+            if max_rows is not None and n_rows > max_rows:
+                continue
+            result = {"stage": name, **measure(prepare(context, n_rows), n_rows, repeat_for(n_rows))}
+            results.append(result)
+            if log:
+                log(format_result(result))
+        context.reset()
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Lister les régressions par rapport à une référence.
+
+    Une mesure régresse si sa médiane ou son pic mémoire dépasse celui de la
+    référence de plus de tolerance (en relatif) et de plus de MIN_DELTA_MS /
+    MIN_DELTA_MB (en absolu). Les mesures absentes de la référence sont ignorées.
+
+    Args:
+        results (list): Mesures de run_suite.
+        baseline (list): Mesures de référence.
+        tolerance (float): Dégradation relative tolérée.
+
+    Returns:
+        list: Dictionnaires {stage, rows, metric, baseline, value}.
+    """
+    reference = {(entry["stage"], entry["rows"]): entry for entry in baseline}
+    regressions = []
+    for result in results:
+        base = reference.get((result["stage"], result["rows"]))
+        if base is None:
+            continue
+        for metric, min_delta in (("p50_ms", MIN_DELTA_MS), ("peak_mb", MIN_DELTA_MB)):
+            value, expected = result[metric], base[metric]
+            if value > expected * (1 + tolerance) and value - expected > min_delta:
+                regressions.append(
+                    {
+                        "stage": result["stage"],
+                        "rows": result["rows"],
+                        "metric": metric,
+                        "baseline": expected,
+                        "value": value,
+                    }
+                )
+    return regressions
+
+
+def environment():
+    """Description de la machine et des versions, enregistrée avec les mesures."""
+    import sklearn
+    import xgboost
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "xgboost": xgboost.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_results(path, results):
+    path = os.fspath(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+
+
+def format_result(result):
+    return (
+        f"{result['stage']:<24}{result['rows']:>10}{result['p50_ms']:>12.2f}{result['p99_ms']:>12.2f}"
+        f"{result['rows_per_s']:>14.0f}{result['peak_mb']:>10.1f}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesurer latence, débit et mémoire du serving.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=None)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--output", default=None, help="Fichier JSON des mesures.")
+    parser.add_argument("--save-baseline", action="store_true", help="Enregistrer les mesures comme référence.")
+    args = parser.parse_args(argv)
+
+    print(f"{'étape':<24}{'lignes':>10}{'p50 (ms)':>12}{'p99 (ms)':>12}{'lignes/s':>14}{'pic (Mo)':>10}")
+    results = run_suite(args.sizes, args.stages, args.seed)
+    if args.output:
+        save_results(args.output, results)
+    if args.save_baseline:
+        save_results(args.baseline, results)
+        print(f"✅ Référence enregistrée -> {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"Aucune référence ({args.baseline}) : comparaison ignorée.")
+        return 0
+
+    regressions = compare(results, load_baseline(args.baseline)["results"], args.tolerance)
+    for regression in regressions:
+        print(
+            f"❌ {regression['stage']} ({regression['rows']} lignes) : {regression['metric']} "
+            f"{regression['value']:.2f} contre {regression['baseline']:.2f} en référence"
+        )
+    if not regressions:
+        print(f"✅ Aucune régression au-delà de {args.tolerance:.0%} par rapport à la référence.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""Données synthétiques au schéma de data/raw/train.csv, à n'importe quelle échelle.
+
+Chaque colonne est tirée indépendamment (avec remise, graine fixe) dans les
+valeurs observées du train : types, vocabulaires des catégoriques et taux
+de valeurs manquantes sont ceux des données réelles, ce qui suffit à
+mesurer les coûts de calcul sans dépendre de la taille du jeu Kaggle.
+"""
+import numpy as np
+import pandas as pd
+
+from src.models.compiled import PROJECT_DIR
+
+RAW_TRAIN_PATH = PROJECT_DIR / "data" / "raw" / "train.csv"
+DEFAULT_SEED = 0
+
+
+def make_raw(n_rows, source=RAW_TRAIN_PATH, seed=DEFAULT_SEED):
+    """Générer n_rows lignes brutes au schéma Kaggle.
+
+    Args:
+        n_rows (int): Nombre de lignes.
+        source (str | Path | pd.DataFrame): Données réelles échantillonnées.
+        seed (int): Graine du générateur.
+
+    Returns:
+        pd.DataFrame: Lignes brutes, colonne Id renumérotée à partir de 1.
+    """
+    df = source if isinstance(source, pd.DataFrame) else pd.read_csv(source)
+    rng = np.random.default_rng(seed)
+    columns = {
+        col: df[col].iloc[rng.integers(0, len(df), n_rows)].reset_index(drop=True)
+        for col in df.columns
+    }
+    if "Id" in columns:
+        columns["Id"] = pd.Series(np.arange(1, n_rows + 1))
+    return pd.DataFrame(columns)
@@ -2,25 +2,13 @@ import pandas as pd
 import numpy as np
 from sklearn.preprocessing import StandardScaler
 
-def impute_missing_values(df, categorical_cols, numeric_cols):
-    """Imputer les valeurs manquantes : 'None' pour les catégoriques, médiane pour les numériques."""
-    df = df.copy()
-    for col in categorical_cols:
-        if col in df.columns:
-            df[col] = df[col].fillna("None")
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = df[col].fillna(df[col].median())
-    return df
+# Features et imputation partagées avec le moteur unique de src.features
+from src.features.build_features import LEGACY_FEATURES, build_features
+from src.features.build_features import impute_missing_values  # noqa: F401
 
 def create_features(df):
     """Créer des features : HouseAge, TotalSF, TotalBathrooms, OverallQualityCond."""
-    df = df.copy()
-    df['HouseAge'] = df['YrSold'] - df['YearBuilt']
-    df['TotalSF'] = df['1stFlrSF'] + df['2ndFlrSF'] + df['TotalBsmtSF']
-    df['TotalBathrooms'] = df['FullBath'] + 0.5 * df['HalfBath'] + df['BsmtFullBath'] + 0.5 * df['BsmtHalfBath']
-    df['OverallQualityCond'] = df['OverallQual'] * df['OverallCond']
-    return df
+    return build_features(df, LEGACY_FEATURES)
 
 def remove_non_pertinent_cols(df, cols_to_drop):
     """Supprimer les colonnes non pertinentes (valeurs manquantes élevées, faible corrélation, redondantes)."""
@@ -0,0 +1,358 @@
+"""Moteur de features unique, partagé par l'entraînement et le serving.
+
+Les colonnes dérivées sont déclarées dans DERIVED_FEATURES sous forme
+d'expressions NumPy sur les colonnes brutes ; elles sont toutes calculées en
+une passe et ajoutées au DataFrame en une seule copie.
+"""
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
+
+# Features dérivées utilisées par le modèle : nom -> expression sur les colonnes
+# brutes (tableaux float64). Les manquants de GarageYrBlt et TotalBsmtSF valent 0.
+DERIVED_FEATURES = {
+    "building_age": lambda c: c["YrSold"] - c["YearBuilt"],
+    "remodel_age": lambda c: c["YrSold"] - c["YearRemodAdd"],
+    "garage_age": lambda c: c["YrSold"] - np.nan_to_num(c["GarageYrBlt"]),
+    "total_sf": lambda c: c["1stFlrSF"] + c["2ndFlrSF"] + np.nan_to_num(c["TotalBsmtSF"]),
+    "total_bathrooms": lambda c: (
+        c["FullBath"] + 0.5 * c["HalfBath"] + c["BsmtFullBath"] + 0.5 * c["BsmtHalfBath"]
+    ),
+}
+
+# Jeu historique de src/data/data_proccessing.py, exprimé avec le même moteur
+LEGACY_FEATURES = {
+    "HouseAge": lambda c: c["YrSold"] - c["YearBuilt"],
+    "TotalSF": lambda c: c["1stFlrSF"] + c["2ndFlrSF"] + c["TotalBsmtSF"],
+    "TotalBathrooms": DERIVED_FEATURES["total_bathrooms"],
+    "OverallQualityCond": lambda c: c["OverallQual"] * c["OverallCond"],
+}
+
+FEATURE_SETS = {"default": DERIVED_FEATURES, "legacy": LEGACY_FEATURES}
+
+# Encodage des catégoriques : "onehot" (une colonne 0/1 par modalité) ou
+# "ordinal" (une colonne cat__<col> par catégorique, contenant le code de la
+# modalité dans le vocabulaire trié, NaN si inconnue), pour les splits
+# catégoriels natifs de XGBoost.
+CATEGORICAL_ENCODINGS = ("onehot", "ordinal")
+
+
+class _Columns(dict):
+    """Convertir paresseusement chaque colonne brute en float64, une seule fois."""
+
+    def __init__(self, df):
+        super().__init__()
+        self.df = df
+
+    def __missing__(self, name):
+        values = self[name] = self.df[name].to_numpy(dtype=float)
+        return values
+
+
+class _Recorder(dict):
+    """Relever les colonnes brutes lues par des expressions de features."""
+
+    def __missing__(self, name):
+        values = self[name] = np.zeros(1)
+        return values
+
+
+def raw_columns(numeric_cols, categorical_cols, feature_set="default"):
+    """Colonnes brutes nécessaires à la chaîne de features.
+
+    Args:
+        numeric_cols (list): Colonnes numériques retenues, dérivées comprises.
+        categorical_cols (list): Colonnes catégoriques retenues.
+        feature_set (str): Clé de FEATURE_SETS.
+
+    Returns:
+        list: Colonnes brutes, les entrées des features dérivées à la place
+        de celles-ci.
+    """
+    derived = FEATURE_SETS[feature_set]
+    inputs = _Recorder()
+    for col in numeric_cols:
+        if col in derived:
+            derived[col](inputs)
+    columns = [col for col in numeric_cols if col not in derived] + list(inputs) + list(categorical_cols)
+    return list(dict.fromkeys(columns))
+
+
+def build_features(df, features=None):
+    """Calculer les features dérivées en une passe.
+
+    Args:
+        df (pd.DataFrame): DataFrame contenant les données brutes.
+        features (dict): Spécification nom -> expression ; DERIVED_FEATURES
+            par défaut.
+
+    Returns:
+        pd.DataFrame: DataFrame avec les nouvelles features.
+    """
+    features = DERIVED_FEATURES if features is None else features
+    columns = _Columns(df)
+    return df.assign(**{name: expr(columns) for name, expr in features.items()})
+
+
+def create_features(df):
+    """Créer de nouvelles features à partir des données existantes.
+
+    Args:
+        df (pd.DataFrame): DataFrame contenant les données brutes.
+
+    Returns:
+        pd.DataFrame: DataFrame avec les nouvelles features.
+    """
+    return build_features(df)
+
+
+class FeatureBuilder(BaseEstimator, TransformerMixin):
+    """Étape de pipeline ajoutant les features dérivées d'un jeu déclaré.
+
+    Args:
+        feature_set (str): Clé de FEATURE_SETS ("default" ou "legacy").
+    """
+
+    def __init__(self, feature_set="default"):
+        self.feature_set = feature_set
+
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        return build_features(X, FEATURE_SETS[self.feature_set])
+
+
+def _with_numeric_block(df, cols, values):
+    """Renvoyer une copie de df dont les colonnes cols sont remplacées par values.
+
+    La copie est superficielle : seules les colonnes remplacées sont neuves,
+    les autres restent partagées avec df, qui n'est pas modifié. Le bloc
+    numérique (values) est ainsi la seule copie faite par l'imputation et
+    par le capage.
+    """
+    df = df.copy(deep=False)
+    df[cols] = values
+    return df
+
+
+class MedianImputer(BaseEstimator, TransformerMixin):
+    """Imputer les numériques par les médianes du train et les catégoriques par 'None'.
+
+    Les médianes apprises sont stockées dans un tableau NumPy (medians_) et
+    sérialisées avec le pipeline, de sorte qu'une requête d'une seule ligne est
+    imputée avec les statistiques d'entraînement et non avec les siennes.
+
+    Args:
+        numeric_cols (list): Liste des colonnes numériques.
+        categorical_cols (list): Liste des colonnes catégoriques.
+    """
+
+    def __init__(self, numeric_cols, categorical_cols=()):
+        self.numeric_cols = numeric_cols
+        self.categorical_cols = categorical_cols
+
+    def fit(self, X, y=None):
+        self.numeric_cols_ = [col for col in self.numeric_cols if col in X.columns]
+        self.categorical_cols_ = [col for col in self.categorical_cols if col in X.columns]
+        self.medians_ = np.nanmedian(X[self.numeric_cols_].to_numpy(dtype=float), axis=0)
+        return self
+
+    def transform(self, X):
+        values = np.array(X[self.numeric_cols_], dtype=float)
+        rows, cols = np.nonzero(np.isnan(values))
+        values[rows, cols] = self.medians_[cols]
+        X = _with_numeric_block(X, self.numeric_cols_, values)
+        if self.categorical_cols_:
+            X[self.categorical_cols_] = X[self.categorical_cols_].fillna("None")
+        return X
+
+
+class IQRClipper(BaseEstimator, TransformerMixin):
+    """Caper les colonnes numériques aux bornes IQR apprises sur le train.
+
+    Les bornes sont stockées dans deux tableaux NumPy (lower_, upper_) et
+    appliquées d'un seul np.clip sur le bloc numérique.
+
+    Args:
+        numeric_cols (list): Liste des colonnes numériques.
+        factor (float): Multiplicateur de l'IQR.
+    """
+
+    def __init__(self, numeric_cols, factor=1.5):
+        self.numeric_cols = numeric_cols
+        self.factor = factor
+
+    def fit(self, X, y=None):
+        self.numeric_cols_ = [col for col in self.numeric_cols if col in X.columns]
+        values = X[self.numeric_cols_].to_numpy(dtype=float)
+        q1, q3 = np.nanquantile(values, [0.25, 0.75], axis=0)
+        iqr = q3 - q1
+        self.lower_ = q1 - self.factor * iqr
+        self.upper_ = q3 + self.factor * iqr
+        return self
+
+    def transform(self, X):
+        values = np.clip(X[self.numeric_cols_].to_numpy(dtype=float), self.lower_, self.upper_)
+        return _with_numeric_block(X, self.numeric_cols_, values)
+
+
+def fit_imputation_values(df, numeric_cols):
+    """Calculer en une passe les médianes des colonnes numériques.
+
+    Args:
+        df (pd.DataFrame): DataFrame d'entraînement.
+        numeric_cols (list): Liste des colonnes numériques.
+
+    Returns:
+        pd.Series: Médiane de chaque colonne numérique présente.
+    """
+    imputer = MedianImputer(numeric_cols).fit(df)
+    return pd.Series(imputer.medians_, index=imputer.numeric_cols_)
+
+
+def impute_missing_values(df, categorical_cols, numeric_cols, medians=None):
+    """Imputer les valeurs manquantes dans les colonnes spécifiées.
+
+    Args:
+        df (pd.DataFrame): DataFrame à traiter.
+        categorical_cols (list): Liste des colonnes catégoriques.
+        numeric_cols (list): Liste des colonnes numériques.
+        medians (pd.Series): Médianes apprises sur le train ; calculées sur
+            df si None.
+
+    Returns:
+        pd.DataFrame: DataFrame avec valeurs manquantes imputées.
+    """
+    if medians is None:
+        return MedianImputer(numeric_cols, categorical_cols).fit_transform(df)
+    imputer = MedianImputer(numeric_cols, categorical_cols)
+    imputer.numeric_cols_ = [col for col in numeric_cols if col in df.columns]
+    imputer.categorical_cols_ = [col for col in categorical_cols if col in df.columns]
+    imputer.medians_ = medians[imputer.numeric_cols_].to_numpy(dtype=float)
+    return imputer.transform(df)
+
+
+def fit_outlier_bounds(df, numeric_cols, factor=1.5):
+    """Calculer en une passe les bornes IQR des colonnes numériques.
+
+    Args:
+        df (pd.DataFrame): DataFrame d'entraînement.
+        numeric_cols (list): Liste des colonnes numériques.
+        factor (float): Multiplicateur de l'IQR.
+
+    Returns:
+        tuple: (lower_bounds, upper_bounds) sous forme de pd.Series.
+    """
+    clipper = IQRClipper(numeric_cols, factor).fit(df)
+    return (
+        pd.Series(clipper.lower_, index=clipper.numeric_cols_),
+        pd.Series(clipper.upper_, index=clipper.numeric_cols_),
+    )
+
+
+def remove_outliers(df, numeric_cols, bounds=None):
+    """Corriger les outliers dans les colonnes numériques avec la méthode IQR.
+
+    Args:
+        df (pd.DataFrame): DataFrame à traiter.
+        numeric_cols (list): Liste des colonnes numériques.
+        bounds (tuple): Bornes (lower, upper) apprises sur le train ;
+            calculées sur df si None.
+
+    Returns:
+        pd.DataFrame: DataFrame avec outliers capés.
+    """
+    if bounds is None:
+        return IQRClipper(numeric_cols).fit_transform(df)
+    lower, upper = bounds
+    clipper = IQRClipper(numeric_cols)
+    clipper.numeric_cols_ = [col for col in lower.index if col in df.columns]
+    clipper.lower_ = lower[clipper.numeric_cols_].to_numpy(dtype=float)
+    clipper.upper_ = upper[clipper.numeric_cols_].to_numpy(dtype=float)
+    return clipper.transform(df)
+
+
+def make_preprocessor(numeric_cols, categorical_cols, encoding="onehot"):
+    """Construire l'encodeur : standardisation des numériques, encodage des catégoriques.
+
+    Args:
+        numeric_cols (list): Colonnes numériques.
+        categorical_cols (list): Colonnes catégoriques.
+        encoding (str): "onehot" ou "ordinal" (voir CATEGORICAL_ENCODINGS).
+
+    Returns:
+        ColumnTransformer: Preprocessor non ajusté.
+
+    Raises:
+        ValueError: Si l'encodage est inconnu.
+    """
+    if encoding == "onehot":
+        encoder = OneHotEncoder(handle_unknown="ignore", sparse_output=False)
+    elif encoding == "ordinal":
+        encoder = OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=np.nan)
+    else:
+        raise ValueError(f"Encodage inconnu : {encoding} (attendu : {CATEGORICAL_ENCODINGS})")
+    return ColumnTransformer(
+        transformers=[
+            ("num", StandardScaler(), numeric_cols),
+            ("cat", encoder, categorical_cols),
+        ]
+    )
+
+
+def feature_types(feature_names, categorical_cols):
+    """Types XGBoost des colonnes du modèle : "c" pour un code catégoriel, "q" sinon.
+
+    Args:
+        feature_names (list): Colonnes en sortie du preprocessor.
+        categorical_cols (list): Colonnes catégoriques.
+
+    Returns:
+        list: Un type par colonne.
+    """
+    coded = {f"cat__{col}" for col in categorical_cols}
+    return ["c" if name in coded else "q" for name in feature_names]
+
+
+def build_feature_pipeline(numeric_cols, categorical_cols, encoding="onehot"):
+    """Construire la chaîne complète lignes brutes -> matrice du modèle.
+
+    Args:
+        numeric_cols (list): Colonnes numériques retenues.
+        categorical_cols (list): Colonnes catégoriques retenues.
+        encoding (str): Encodage des catégoriques ("onehot" ou "ordinal").
+
+    Returns:
+        Pipeline: Features dérivées, imputation, capage IQR puis encodage.
+    """
+    return Pipeline(
+        [
+            ("features", FeatureBuilder()),
+            ("impute", MedianImputer(numeric_cols, categorical_cols)),
+            ("clip", IQRClipper(numeric_cols)),
+            ("preprocessor", make_preprocessor(numeric_cols, categorical_cols, encoding)),
+        ]
+    )
+
+
+def preprocess_data(train, test, categorical_cols, numeric_cols, encoding="onehot"):
+    """Prétraiter les données avec encodage et standardisation.
+
+    Args:
+        train (pd.DataFrame): DataFrame d'entraînement.
+        test (pd.DataFrame): DataFrame de test.
+        categorical_cols (list): Colonnes catégoriques.
+        numeric_cols (list): Colonnes numériques.
+        encoding (str): Encodage des catégoriques ("onehot" ou "ordinal").
+
+    Returns:
+        tuple: (X_train_processed, X_test_processed, preprocessor)
+    """
+    preprocessor = make_preprocessor(numeric_cols, categorical_cols, encoding)
+    X_train_processed = preprocessor.fit_transform(train[numeric_cols + categorical_cols])
+    X_test_processed = preprocessor.transform(test[numeric_cols + categorical_cols])
+    return X_train_processed, X_test_processed, preprocessor
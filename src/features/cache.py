@@ -0,0 +1,185 @@
+"""Cache adressé par contenu des étapes de prétraitement.
+
+Les étapes sont celles de build_feature_pipeline (features, impute, clip,
+preprocessor), ajustées sur le train et appliquées au test comme pour le
+feature store et le serving. Chaque étape est identifiée par l'empreinte de
+ses entrées : fichiers bruts, listes de colonnes, version du code et clé de
+l'étape précédente.
+Un résultat déjà calculé pour la même empreinte est relu au lieu d'être
+recalculé ; les entrées les moins récemment utilisées sont évincées dès que
+le cache dépasse sa taille maximale.
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import os
+from pathlib import Path
+
+import joblib
+import pandas as pd
+from sklearn.base import clone
+from sklearn.pipeline import Pipeline
+
+from src.features.build_features import CATEGORICAL_ENCODINGS, build_feature_pipeline
+from src.features.store import COLUMN_TYPES_PATH, PROJECT_DIR, RAW_DIR, TARGET_NAME, file_digest, fingerprint
+
+CACHE_DIR = PROJECT_DIR / "data" / "interim" / "cache"
+DEFAULT_MAX_BYTES = 2 * 1024**3
+
+
+def function_version(fn):
+    """Version d'une fonction : empreinte du source de son module.
+
+    Toute modification du module invalide les résultats des étapes qui en
+    dépendent, y compris celles de ses fonctions utilitaires.
+
+    Args:
+        fn (callable): Fonction d'une étape.
+
+    Returns:
+        str: Empreinte hexadécimale.
+    """
+    source = inspect.getsource(inspect.getmodule(fn))
+    return hashlib.sha256(f"{fn.__qualname__}\n{source}".encode()).hexdigest()
+
+
+class StageCache:
+    """Cache disque de résultats d'étapes, avec éviction LRU par taille.
+
+    Args:
+        root (str | Path): Répertoire du cache.
+        max_bytes (int): Taille maximale du cache sur disque.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key):
+        return self.root / key[:2] / f"{key}.joblib"
+
+    def run(self, stage, fn, *args, inputs=(), **kwargs):
+        """Exécuter fn(*args, **kwargs) ou relire son résultat depuis le cache.
+
+        Args:
+            stage (str): Nom de l'étape.
+            fn (callable): Fonction de l'étape.
+            *args: Arguments positionnels de fn.
+            inputs (tuple): Empreintes identifiant les données passées à fn
+                (fichiers bruts, clés des étapes précédentes, colonnes, ...).
+            **kwargs: Arguments nommés de fn.
+
+        Returns:
+            tuple: (résultat, clé) ; la clé sert d'entrée aux étapes suivantes.
+        """
+        key = fingerprint(stage, function_version(fn), list(inputs))
+        path = self.path(key)
+        if path.exists():
+            self.hits += 1
+            os.utime(path)
+            return joblib.load(path), key
+
+        self.misses += 1
+        result = fn(*args, **kwargs)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        joblib.dump(result, tmp_path)
+        os.replace(tmp_path, path)
+        self.evict()
+        return result, key
+
+    def evict(self):
+        """Supprimer les entrées les moins récemment utilisées au-delà de max_bytes.
+
+        Returns:
+            int: Nombre d'entrées supprimées.
+        """
+        entries = sorted(
+            (path.stat().st_mtime, path.stat().st_size, path) for path in self.root.glob("*/*.joblib")
+        )
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def size(self):
+        """Taille totale du cache sur disque, en octets."""
+        return sum(path.stat().st_size for path in self.root.glob("*/*.joblib"))
+
+
+def fit_stage(step, train, test):
+    """Ajuster une étape sur le train puis l'appliquer au train et au test.
+
+    Returns:
+        tuple: (train transformé, test transformé, étape ajustée)
+    """
+    step = clone(step).fit(train)
+    return step.transform(train), step.transform(test), step
+
+
+def run_preprocessing(
+    cache=None,
+    train_path=RAW_DIR / "train.csv",
+    test_path=RAW_DIR / "test.csv",
+    column_types_path=COLUMN_TYPES_PATH,
+    encoding="onehot",
+):
+    """Rejouer la chaîne de features du feature store en réutilisant le cache.
+
+    Args:
+        cache (StageCache): Cache à utiliser ; CACHE_DIR par défaut.
+        train_path (str | Path): Données brutes d'entraînement.
+        test_path (str | Path): Données brutes de test.
+        column_types_path (str | Path): Chemin de column_types.json.
+        encoding (str): Encodage des catégoriques ("onehot" ou "ordinal").
+
+    Returns:
+        tuple: (X_train_processed, X_test_processed, y_train, pipeline) ;
+        pipeline est la chaîne de features ajustée sur le train.
+    """
+    cache = cache or StageCache()
+    with open(column_types_path) as f:
+        column_types = json.load(f)
+    columns_key = fingerprint(column_types, encoding)
+
+    train, train_key = cache.run("read", pd.read_csv, train_path, inputs=(file_digest(train_path),))
+    test, test_key = cache.run("read", pd.read_csv, test_path, inputs=(file_digest(test_path),))
+    y_train = train[TARGET_NAME].reset_index(drop=True)
+
+    pipeline = build_feature_pipeline(column_types["numeric_cols"], column_types["categorical_cols"], encoding)
+    steps = []
+    for name, step in pipeline.steps:
+        (train, test, fitted), key = cache.run(
+            name, fit_stage, step, train, test,
+            inputs=(train_key, test_key, columns_key, function_version(type(step))),
+        )
+        train_key = test_key = key
+        steps.append((name, fitted))
+    return train, test, y_train, Pipeline(steps)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prétraitement mis en cache par empreinte des entrées.")
+    parser.add_argument("--cache-dir", default=str(CACHE_DIR))
+    parser.add_argument("--max-gb", type=float, default=DEFAULT_MAX_BYTES / 1024**3)
+    parser.add_argument("--encoding", choices=CATEGORICAL_ENCODINGS, default="onehot")
+    args = parser.parse_args(argv)
+
+    cache = StageCache(args.cache_dir, int(args.max_gb * 1024**3))
+    X_train, X_test, _, _ = run_preprocessing(cache, encoding=args.encoding)
+    print(
+        f"✅ X_train {X_train.shape}, X_test {X_test.shape} "
+        f"({cache.hits} étapes relues, {cache.misses} recalculées, {cache.size() / 1024**2:.1f} Mo)"
+    )
+
+
+if __name__ == "__main__":
+    main()
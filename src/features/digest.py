@@ -0,0 +1,37 @@
+"""Empreintes de fichiers et de configurations.
+
+Module sans dépendance lourde, utilisable au démarrage du serving comme par
+le feature store et les caches.
+"""
+import hashlib
+import json
+
+
+def file_digest(path, block_size=1 << 20):
+    """Calculer le SHA-256 d'un fichier par blocs.
+
+    Args:
+        path (str | Path): Fichier à hacher.
+        block_size (int): Taille des blocs lus.
+
+    Returns:
+        str: Empreinte hexadécimale.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint(*parts):
+    """Combiner des éléments sérialisables en JSON en une empreinte unique.
+
+    Args:
+        *parts: Empreintes de fichiers, listes de colonnes, versions, ...
+
+    Returns:
+        str: Empreinte hexadécimale.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str).encode()
+    return hashlib.sha256(payload).hexdigest()
@@ -0,0 +1,253 @@
+"""Stockage binaire colonnaire des matrices de features.
+
+Chaque matrice est écrite dans un seul fichier : un en-tête JSON (colonnes,
+dtype, forme, empreinte des entrées) suivi des données en ordre colonne
+(Fortran), alignées pour être projetées en mémoire avec np.memmap sans copie.
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import struct
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.features import build_features
+from src.features.digest import file_digest, fingerprint
+
+PROJECT_DIR = Path(__file__).resolve().parents[2]
+STORE_DIR = PROJECT_DIR / "data" / "processed" / "store"
+RAW_DIR = PROJECT_DIR / "data" / "raw"
+COLUMN_TYPES_PATH = PROJECT_DIR / "data" / "processed" / "column_types.json"
+TARGET_NAME = "SalePrice"
+FEATURE_PIPELINE_NAME = "feature_pipeline.joblib"
+
+MAGIC = b"HPFSTORE"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+EXTENSION = ".hpf"
+
+
+def pipeline_fingerprint(raw_paths, column_types_path=COLUMN_TYPES_PATH, encoding="onehot"):
+    """Empreinte des données brutes et de la configuration du pipeline.
+
+    Args:
+        raw_paths (list): Fichiers bruts en entrée.
+        column_types_path (str | Path): Chemin de column_types.json.
+        encoding (str): Encodage des catégoriques.
+
+    Returns:
+        str: Empreinte hexadécimale.
+    """
+    with open(column_types_path) as f:
+        column_types = json.load(f)
+    return fingerprint(
+        [file_digest(path) for path in raw_paths],
+        column_types,
+        hashlib.sha256(inspect.getsource(build_features).encode()).hexdigest(),
+        FORMAT_VERSION,
+        encoding,
+    )
+
+
+def write_matrix(path, X, columns, metadata=None):
+    """Écrire une matrice 2D avec son schéma dans un fichier unique.
+
+    L'écriture passe par un fichier temporaire renommé à la fin, de sorte
+    qu'un lecteur ne voit jamais de fichier partiel.
+
+    Args:
+        path (str | Path): Fichier de destination.
+        X (np.ndarray): Matrice (n_lignes, n_colonnes).
+        columns (list): Noms des colonnes.
+        metadata (dict): Informations complémentaires (empreinte, ...).
+    """
+    X = np.asarray(X)
+    if X.ndim != 2 or X.shape[1] != len(columns):
+        raise ValueError(f"Forme {X.shape} incompatible avec {len(columns)} colonnes.")
+    header = json.dumps(
+        {
+            "version": FORMAT_VERSION,
+            "columns": [str(col) for col in columns],
+            "dtype": X.dtype.str,
+            "shape": list(X.shape),
+            "order": "F",
+            "metadata": metadata or {},
+        }
+    ).encode()
+    prefix = len(MAGIC) + 8
+    padding = -(prefix + len(header)) % ALIGNMENT
+    header += b" " * padding
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        f.write(np.asfortranarray(X).tobytes(order="F"))
+    os.replace(tmp_path, path)
+
+
+def read_header(path):
+    """Lire l'en-tête d'un fichier de features.
+
+    Args:
+        path (str | Path): Fichier de features.
+
+    Returns:
+        tuple: (header, offset) où offset est la position des données.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} n'est pas un fichier de features.")
+        (length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(length))
+    return header, len(MAGIC) + 8 + length
+
+
+def read_matrix(path, mmap=True):
+    """Charger une matrice écrite par write_matrix.
+
+    Args:
+        path (str | Path): Fichier de features.
+        mmap (bool): Projeter le fichier en mémoire (lecture seule, sans copie).
+
+    Returns:
+        tuple: (X, header)
+    """
+    header, offset = read_header(path)
+    shape = tuple(header["shape"])
+    dtype = np.dtype(header["dtype"])
+    if mmap and shape[0] > 0:
+        X = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape, order="F")
+    else:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            X = np.fromfile(f, dtype=dtype, count=shape[0] * shape[1]).reshape(shape, order="F")
+    return X, header
+
+
+class FeatureStore:
+    """Répertoire de matrices de features nommées (X_train, X_test, y_train, ...).
+
+    Args:
+        root (str | Path): Répertoire du store.
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = Path(root)
+
+    def path(self, name):
+        return self.root / f"{name}{EXTENSION}"
+
+    def save(self, name, X, columns, fingerprint=None):
+        write_matrix(self.path(name), X, columns, {"fingerprint": fingerprint})
+
+    def load(self, name, mmap=True):
+        """Charger une matrice et ses colonnes.
+
+        Returns:
+            tuple: (X, columns)
+        """
+        X, header = read_matrix(self.path(name), mmap=mmap)
+        return X, header["columns"]
+
+    def load_frame(self, name):
+        """Charger une matrice sous forme de DataFrame (sans copie si possible)."""
+        X, columns = self.load(name)
+        return pd.DataFrame(X, columns=columns, copy=False)
+
+    def save_pipeline(self, pipeline):
+        """Sauvegarder la chaîne de features ajustée qui a produit les matrices."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        joblib.dump(pipeline, self.root / FEATURE_PIPELINE_NAME)
+
+    def load_pipeline(self):
+        """Charger la chaîne de features ajustée (lignes brutes -> matrice)."""
+        return joblib.load(self.root / FEATURE_PIPELINE_NAME)
+
+    def is_fresh(self, name, fingerprint):
+        """Indiquer si la matrice existe et a été produite avec cette empreinte."""
+        path = self.path(name)
+        if not path.exists():
+            return False
+        header, _ = read_header(path)
+        return header["metadata"].get("fingerprint") == fingerprint
+
+
+def materialize_features(
+    store=None,
+    train_path=RAW_DIR / "train.csv",
+    test_path=RAW_DIR / "test.csv",
+    column_types_path=COLUMN_TYPES_PATH,
+    force=False,
+    encoding="onehot",
+):
+    """Calculer X_train, X_test et y_train dans le store si les entrées ont changé.
+
+    La chaîne de features ajustée est sauvegardée à côté des matrices pour
+    transformer de nouvelles lignes brutes exactement de la même façon.
+
+    Args:
+        store (FeatureStore): Store cible ; STORE_DIR par défaut.
+        train_path (str | Path): Données brutes d'entraînement.
+        test_path (str | Path): Données brutes de test.
+        column_types_path (str | Path): Chemin de column_types.json.
+        force (bool): Recalculer même si le store est à jour.
+        encoding (str): Encodage des catégoriques ("onehot" ou "ordinal").
+
+    Returns:
+        bool: True si les features ont été recalculées.
+    """
+    store = store or FeatureStore()
+    names = ("X_train", "X_test", "y_train")
+    fp = pipeline_fingerprint([train_path, test_path], column_types_path, encoding)
+    if (
+        not force
+        and (store.root / FEATURE_PIPELINE_NAME).exists()
+        and all(store.is_fresh(name, fp) for name in names)
+    ):
+        return False
+
+    with open(column_types_path) as f:
+        column_types = json.load(f)
+    train = pd.read_csv(train_path)
+    test = pd.read_csv(test_path)
+    pipeline = build_features.build_feature_pipeline(
+        column_types["numeric_cols"], column_types["categorical_cols"], encoding
+    )
+    X_train = pipeline.fit_transform(train)
+    X_test = pipeline.transform(test)
+    columns = pipeline[-1].get_feature_names_out()
+
+    store.save("X_train", X_train.astype(np.float32), columns, fp)
+    store.save("X_test", X_test.astype(np.float32), columns, fp)
+    store.save("y_train", train[[TARGET_NAME]].to_numpy(dtype=np.float64), [TARGET_NAME], fp)
+    store.save_pipeline(pipeline)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Matérialiser les features dans le store binaire.")
+    parser.add_argument("--store", default=str(STORE_DIR))
+    parser.add_argument("--train", default=str(RAW_DIR / "train.csv"))
+    parser.add_argument("--test", default=str(RAW_DIR / "test.csv"))
+    parser.add_argument("--column-types", default=str(COLUMN_TYPES_PATH))
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--encoding", choices=build_features.CATEGORICAL_ENCODINGS, default="onehot")
+    args = parser.parse_args(argv)
+
+    rebuilt = materialize_features(
+        FeatureStore(args.store), args.train, args.test, args.column_types, args.force, args.encoding
+    )
+    print("✅ Features recalculées." if rebuilt else "✅ Store à jour, rien à recalculer.")
+
+
+if __name__ == "__main__":
+    main()
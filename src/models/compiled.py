@@ -0,0 +1,475 @@
+"""Moteur d'inférence NumPy pour les ensembles d'arbres XGBoost.
+
+Les arbres du booster sont aplatis en quelques tableaux (feature, seuil,
+enfants, direction des manquants, valeur des feuilles) concaténés. La
+prédiction fait descendre toutes les lignes dans tous les arbres à la fois,
+un niveau par itération, sans pandas ni wrapper sklearn/XGBoost.
+
+Le prétraitement du pipeline d'inférence (médianes, bornes IQR, paramètres
+du StandardScaler, vocabulaires des catégoriques) est réduit de la même façon à
+des tableaux .npy : chargés avec mmap=True, ils sont projetés en lecture
+seule et leurs pages sont partagées par tous les workers d'une machine.
+
+Le module ne dépend que de NumPy : charger un ensemble sauvegardé (en
+mémoire projetée si besoin) ne coûte ni l'import de xgboost ni celui de
+sklearn, ce qui compte pour le démarrage à froid des workers.
+"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_DIR = Path(__file__).resolve().parents[2]
+COMPILED_DIR = PROJECT_DIR / "models" / "compiled"
+DEFAULT_BATCH_ROWS = 65_536
+SUPPORTED_OBJECTIVES = ("reg:squarederror", "reg:absoluteerror", "reg:pseudohubererror")
+ARRAYS = ("feature", "threshold", "left", "right", "missing", "value", "roots")
+# Splits catégoriels (feature_types "c") : présents seulement si le modèle en a
+CATEGORICAL_ARRAYS = ("categorical", "category_mask")
+MAX_CATEGORY_CODE = 63
+PREPROCESSOR_DIR = "preprocessor"
+PREPROCESSOR_ARRAYS = ("medians", "lower", "upper", "mean", "scale", "categories", "category_offsets")
+
+
+def _parse_base_score(value):
+    """Lire base_score, sérialisé "0.5" ou "[5E-1]" selon la version de XGBoost."""
+    return float(str(value).strip("[]"))
+
+
+class CompiledEnsemble:
+    """Ensemble d'arbres aplati, évalué par lots avec NumPy.
+
+    Les feuilles bouclent sur elles-mêmes, de sorte que max_depth itérations
+    suffisent à amener chaque ligne sur sa feuille dans chaque arbre. Un split
+    catégoriel envoie à droite les codes de son ensemble de modalités (bit du
+    masque à 1), à gauche les autres, comme XGBoost.
+
+    Args:
+        feature (np.ndarray): Indice de la feature testée par noeud (int32).
+        threshold (np.ndarray): Seuil du test x < seuil (float32).
+        left (np.ndarray): Enfant si le test est vrai (int32, global).
+        right (np.ndarray): Enfant si le test est faux (int32, global).
+        missing (np.ndarray): Enfant suivi quand la valeur est manquante.
+        value (np.ndarray): Valeur des feuilles (0 pour les noeuds internes).
+        roots (np.ndarray): Indice global de la racine de chaque arbre.
+        base_score (float): Score initial ajouté à la somme des feuilles.
+        max_depth (int): Profondeur maximale des arbres.
+        feature_names (list): Colonnes attendues, dans l'ordre.
+        categorical (np.ndarray): Noeuds dont le split est catégoriel (bool),
+            ou None si le modèle n'en a aucun.
+        category_mask (np.ndarray): Modalités envoyées à droite par chaque
+            noeud catégoriel, un bit par code (uint64).
+    """
+
+    def __init__(
+        self,
+        feature,
+        threshold,
+        left,
+        right,
+        missing,
+        value,
+        roots,
+        base_score,
+        max_depth,
+        feature_names,
+        categorical=None,
+        category_mask=None,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing = missing
+        self.value = value
+        self.roots = roots
+        self.base_score = base_score
+        self.max_depth = max_depth
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.categorical = categorical
+        self.category_mask = category_mask
+
+    @classmethod
+    def from_xgboost(cls, model):
+        """Compiler un XGBRegressor (ou un Booster) entraîné.
+
+        Args:
+            model (XGBRegressor | Booster): Modèle à compiler.
+
+        Returns:
+            CompiledEnsemble: Ensemble équivalent.
+
+        Raises:
+            ValueError: Si l'objectif ou le type de booster n'est pas supporté,
+                ou si un split catégoriel porte sur un code > MAX_CATEGORY_CODE.
+        """
+        booster = model.get_booster() if hasattr(model, "get_booster") else model
+        learner = json.loads(booster.save_raw("json"))["learner"]
+        objective = learner["objective"]["name"]
+        if objective not in SUPPORTED_OBJECTIVES:
+            raise ValueError(f"Objectif non supporté : {objective}")
+        gradient_booster = learner["gradient_booster"]
+        if gradient_booster["name"] != "gbtree":
+            raise ValueError(f"Booster non supporté : {gradient_booster['name']}")
+
+        feature, threshold, left, right, missing, value, roots, categorical, category_mask = ([] for _ in range(9))
+        max_depth = 0
+        offset = 0
+        for tree in gradient_booster["model"]["trees"]:
+            tree_left = np.asarray(tree["left_children"], dtype=np.int32)
+            tree_right = np.asarray(tree["right_children"], dtype=np.int32)
+            n_nodes = len(tree_left)
+            nodes = np.arange(n_nodes, dtype=np.int32)
+            is_leaf = tree_left == -1
+            conditions = np.asarray(tree["split_conditions"], dtype=np.float32)
+            default_left = np.asarray(tree["default_left"], dtype=bool)
+
+            tree_left = np.where(is_leaf, nodes, tree_left)
+            tree_right = np.where(is_leaf, nodes, tree_right)
+            feature.append(np.where(is_leaf, 0, tree["split_indices"]).astype(np.int32))
+            threshold.append(np.where(is_leaf, np.inf, conditions).astype(np.float32))
+            left.append(tree_left + offset)
+            right.append(tree_right + offset)
+            missing.append(np.where(default_left, tree_left, tree_right) + offset)
+            value.append(np.where(is_leaf, conditions, 0).astype(np.float32))
+            categorical.append(np.asarray(tree.get("split_type") or np.zeros(n_nodes), dtype=bool) & ~is_leaf)
+            category_mask.append(_category_masks(tree, n_nodes))
+            roots.append(offset)
+            max_depth = max(max_depth, _tree_depth(tree_left, tree_right, is_leaf))
+            offset += n_nodes
+
+        categorical = np.concatenate(categorical)
+        return cls(
+            feature=np.concatenate(feature),
+            threshold=np.concatenate(threshold),
+            left=np.concatenate(left).astype(np.int32),
+            right=np.concatenate(right).astype(np.int32),
+            missing=np.concatenate(missing).astype(np.int32),
+            value=np.concatenate(value),
+            roots=np.asarray(roots, dtype=np.int32),
+            base_score=_parse_base_score(learner["learner_model_param"]["base_score"]),
+            max_depth=max_depth,
+            feature_names=learner.get("feature_names") or [],
+            categorical=categorical if categorical.any() else None,
+            category_mask=np.concatenate(category_mask) if categorical.any() else None,
+        )
+
+    def predict(self, X, batch_rows=DEFAULT_BATCH_ROWS):
+        """Prédire un lot de lignes.
+
+        Args:
+            X (array-like): Matrice (n_lignes, n_features), dans l'ordre de
+                feature_names_in_.
+            batch_rows (int): Lignes évaluées à la fois, pour borner la mémoire
+                des indices (n_lignes x n_arbres).
+
+        Returns:
+            np.ndarray: Prédictions float32.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        predictions = np.empty(X.shape[0], dtype=np.float32)
+        for start in range(0, X.shape[0], batch_rows):
+            predictions[start:start + batch_rows] = self._predict_batch(X[start:start + batch_rows])
+        return predictions
+
+    def _predict_batch(self, X):
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[nodes]]
+            go_left = x < self.threshold[nodes]
+            if self.categorical is not None:
+                cat = np.nonzero(self.categorical[nodes])
+                codes = x[cat]
+                # Code hors [0, MAX_CATEGORY_CODE] : absent de tout ensemble, à gauche
+                valid = (codes >= 0) & (codes <= MAX_CATEGORY_CODE)
+                bits = np.left_shift(np.uint64(1), np.where(valid, codes, 0).astype(np.uint64))
+                go_left[cat] = ~(valid & ((self.category_mask[nodes[cat]] & bits) != 0))
+            nodes = np.where(
+                np.isnan(x),
+                self.missing[nodes],
+                np.where(go_left, self.left[nodes], self.right[nodes]),
+            )
+        return self.value[nodes].sum(axis=1, dtype=np.float32) + np.float32(self.base_score)
+
+    def save(self, path=COMPILED_DIR):
+        """Sauvegarder les tableaux (.npy) et les métadonnées dans un répertoire."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        names = ARRAYS + (CATEGORICAL_ARRAYS if self.categorical is not None else ())
+        for name in names:
+            np.save(path / f"{name}.npy", getattr(self, name))
+        meta = {
+            "base_score": self.base_score,
+            "max_depth": self.max_depth,
+            "feature_names": [str(name) for name in self.feature_names_in_],
+        }
+        (path / "meta.json").write_text(json.dumps(meta, indent=2))
+
+    @classmethod
+    def load(cls, path=COMPILED_DIR, mmap=False):
+        """Charger un ensemble sauvegardé par save.
+
+        Args:
+            path (str | Path): Répertoire de l'ensemble.
+            mmap (bool): Projeter les tableaux en mémoire (lecture seule) au
+                lieu de les lire : chargement quasi instantané, pages lues à
+                la demande et partagées entre processus.
+
+        Returns:
+            CompiledEnsemble: Ensemble chargé.
+        """
+        path = Path(path)
+        meta = json.loads((path / "meta.json").read_text())
+        mmap_mode = "r" if mmap else None
+        names = ARRAYS + tuple(name for name in CATEGORICAL_ARRAYS if (path / f"{name}.npy").exists())
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode) for name in names}
+        return cls(**arrays, **meta)
+
+
+class CompiledPreprocessor:
+    """Chaîne features -> imputation -> capage -> encodage, réduite à des tableaux.
+
+    Reproduit pipeline[:-1].transform d'un pipeline d'inférence ajusté :
+    colonnes numériques (brutes ou dérivées) imputées par les médianes,
+    capées aux bornes IQR puis standardisées, suivies du one-hot des
+    catégoriques (valeurs inconnues ignorées, manquants -> "None") ou, avec
+    l'encodage "ordinal", d'une colonne de codes par catégorique (NaN si
+    modalité inconnue).
+
+    Args:
+        numeric_cols (list): Colonnes numériques, dans l'ordre de sortie.
+        categorical_cols (list): Colonnes catégoriques, dans l'ordre de sortie.
+        medians (np.ndarray): Médianes d'imputation des numériques.
+        lower (np.ndarray): Bornes IQR basses.
+        upper (np.ndarray): Bornes IQR hautes.
+        mean (np.ndarray): Moyennes du StandardScaler.
+        scale (np.ndarray): Écarts-types du StandardScaler.
+        categories (np.ndarray): Vocabulaires triés, concaténés (unicode).
+        category_offsets (np.ndarray): Début du vocabulaire de chaque
+            catégorique dans categories (len(categorical_cols) + 1 valeurs).
+        feature_set (str): Jeu de features dérivées (clé de FEATURE_SETS).
+        encoding (str): "onehot" ou "ordinal".
+    """
+
+    def __init__(
+        self,
+        numeric_cols,
+        categorical_cols,
+        medians,
+        lower,
+        upper,
+        mean,
+        scale,
+        categories,
+        category_offsets,
+        feature_set="default",
+        encoding="onehot",
+    ):
+        self.numeric_cols = list(numeric_cols)
+        self.categorical_cols = list(categorical_cols)
+        self.medians = medians
+        self.lower = lower
+        self.upper = upper
+        self.mean = mean
+        self.scale = scale
+        self.categories = categories
+        self.category_offsets = category_offsets
+        self.feature_set = feature_set
+        self.encoding = encoding
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """Compiler les étapes features/impute/clip/preprocessor d'un pipeline ajusté.
+
+        Raises:
+            ValueError: Si les étapes ne suivent pas build_feature_pipeline.
+        """
+        steps = pipeline.named_steps
+        impute, clip, encoder = steps["impute"], steps["clip"], steps["preprocessor"]
+        transformers = {name: (transformer, cols) for name, transformer, cols in encoder.transformers_}
+        scaler, numeric_cols = transformers["num"]
+        categorical, categorical_cols = transformers["cat"]
+        if not list(numeric_cols) == list(impute.numeric_cols_) == list(clip.numeric_cols_):
+            raise ValueError("Les colonnes numériques diffèrent entre imputation, capage et encodage.")
+        if type(categorical).__name__ == "OrdinalEncoder":
+            encoding = "ordinal"
+            if categorical.handle_unknown != "use_encoded_value" or not np.isnan(categorical.unknown_value):
+                raise ValueError("Seul un OrdinalEncoder(unknown_value=np.nan) est supporté.")
+        else:
+            encoding = "onehot"
+            if categorical.handle_unknown != "ignore" or categorical.drop is not None:
+                raise ValueError("Seul un OneHotEncoder(handle_unknown='ignore') sans drop est supporté.")
+
+        vocabularies = [np.asarray(values, dtype=str) for values in categorical.categories_]
+        return cls(
+            numeric_cols=numeric_cols,
+            categorical_cols=categorical_cols,
+            medians=np.asarray(impute.medians_, dtype=np.float64),
+            lower=np.asarray(clip.lower_, dtype=np.float64),
+            upper=np.asarray(clip.upper_, dtype=np.float64),
+            mean=np.asarray(scaler.mean_, dtype=np.float64),
+            scale=np.asarray(scaler.scale_, dtype=np.float64),
+            categories=np.concatenate(vocabularies),
+            category_offsets=np.cumsum([0] + [len(v) for v in vocabularies]).astype(np.int64),
+            feature_set=steps["features"].feature_set,
+            encoding=encoding,
+        )
+
+    def get_feature_names_out(self):
+        names = [f"num__{col}" for col in self.numeric_cols]
+        if self.encoding == "ordinal":
+            return np.asarray(names + [f"cat__{col}" for col in self.categorical_cols], dtype=object)
+        for j, col in enumerate(self.categorical_cols):
+            vocabulary = self.categories[self.category_offsets[j]:self.category_offsets[j + 1]]
+            names += [f"cat__{col}_{value}" for value in vocabulary]
+        return np.asarray(names, dtype=object)
+
+    def raw_columns(self):
+        """Colonnes brutes lues par transform."""
+        from src.features.build_features import raw_columns
+
+        return raw_columns(self.numeric_cols, self.categorical_cols, self.feature_set)
+
+    def transform(self, X):
+        """Transformer des lignes brutes (DataFrame au schéma Kaggle) en matrice du modèle.
+
+        Returns:
+            np.ndarray: Matrice float64 (n_lignes, n_features).
+        """
+        # Les expressions des features dérivées vivent avec le moteur de features
+        from src.features.build_features import FEATURE_SETS, _Columns
+
+        derived = FEATURE_SETS[self.feature_set]
+        columns = _Columns(X)
+        n_rows = len(X)
+        n_numeric = len(self.numeric_cols)
+        n_encoded = len(self.categorical_cols) if self.encoding == "ordinal" else len(self.categories)
+        output = np.zeros((n_rows, n_numeric + n_encoded))
+
+        numeric = np.empty((n_rows, n_numeric))
+        for j, col in enumerate(self.numeric_cols):
+            numeric[:, j] = derived[col](columns) if col in derived else columns[col]
+        rows, cols = np.nonzero(np.isnan(numeric))
+        numeric[rows, cols] = self.medians[cols]
+        np.clip(numeric, self.lower, self.upper, out=numeric)
+        output[:, :n_numeric] = (numeric - self.mean) / self.scale
+
+        for j, col in enumerate(self.categorical_cols):
+            start, end = self.category_offsets[j], self.category_offsets[j + 1]
+            vocabulary = self.categories[start:end]
+            values = X[col].fillna("None").to_numpy(dtype=str)
+            index = np.minimum(np.searchsorted(vocabulary, values), len(vocabulary) - 1)
+            known = vocabulary[index] == values
+            if self.encoding == "ordinal":
+                output[:, n_numeric + j] = np.where(known, index, np.nan)
+            else:
+                output[np.nonzero(known)[0], n_numeric + start + index[known]] = 1.0
+        return output
+
+    def save(self, path):
+        """Sauvegarder les tableaux (.npy) et les métadonnées dans un répertoire."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in PREPROCESSOR_ARRAYS:
+            np.save(path / f"{name}.npy", getattr(self, name))
+        meta = {
+            "numeric_cols": self.numeric_cols,
+            "categorical_cols": self.categorical_cols,
+            "feature_set": self.feature_set,
+            "encoding": self.encoding,
+        }
+        (path / "meta.json").write_text(json.dumps(meta, indent=2))
+
+    @classmethod
+    def load(cls, path, mmap=False):
+        """Charger un prétraitement sauvegardé par save (projeté en mémoire si mmap)."""
+        path = Path(path)
+        meta = json.loads((path / "meta.json").read_text())
+        mmap_mode = "r" if mmap else None
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode) for name in PREPROCESSOR_ARRAYS}
+        return cls(**arrays, **meta)
+
+
+class CompiledPipeline:
+    """Prétraitement et ensemble compilés, substituables au pipeline sklearn.
+
+    Args:
+        preprocessor (CompiledPreprocessor): Lignes brutes -> matrice.
+        model (CompiledEnsemble): Matrice -> prédictions.
+    """
+
+    def __init__(self, preprocessor, model):
+        self.preprocessor = preprocessor
+        self.model = model
+
+    def __getitem__(self, index):
+        """Indexation à la sklearn : [:-1] pour le prétraitement, [-1] pour le modèle."""
+        steps = [self.preprocessor, self.model]
+        if isinstance(index, slice):
+            selected = steps[index]
+            return selected[0] if len(selected) == 1 else CompiledPipeline(*selected)
+        return steps[index]
+
+    def transform(self, X):
+        return self.preprocessor.transform(X)
+
+    def predict(self, X):
+        return self.model.predict(self.preprocessor.transform(X))
+
+    @classmethod
+    def load(cls, path=COMPILED_DIR, mmap=False):
+        """Charger l'ensemble de path et le prétraitement de path/preprocessor."""
+        path = Path(path)
+        return cls(CompiledPreprocessor.load(path / PREPROCESSOR_DIR, mmap), CompiledEnsemble.load(path, mmap))
+
+
+def _category_masks(tree, n_nodes):
+    """Masque de bits des modalités de chaque noeud catégoriel d'un arbre JSON."""
+    masks = np.zeros(n_nodes, dtype=np.uint64)
+    categories = tree.get("categories") or []
+    for node, start, size in zip(
+        tree.get("categories_nodes") or [], tree.get("categories_segments") or [], tree.get("categories_sizes") or []
+    ):
+        codes = categories[start:start + size]
+        if codes and max(codes) > MAX_CATEGORY_CODE:
+            raise ValueError(f"Code de modalité supérieur à {MAX_CATEGORY_CODE} non supporté.")
+        masks[node] = sum(1 << code for code in codes)
+    return masks
+
+
+def _tree_depth(left, right, is_leaf):
+    """Profondeur d'un arbre à partir de ses tableaux d'enfants (racine = 0)."""
+    depth = 0
+    level = np.array([0])
+    while not is_leaf[level].all():
+        level = level[~is_leaf[level]]
+        level = np.concatenate([left[level], right[level]])
+        depth += 1
+    return depth
+
+
+def main(argv=None):
+    from src.models.pipeline import load_pipeline
+    from src.models.predict_model import MODEL_PATH, PIPELINE_PATH, load_model
+
+    parser = argparse.ArgumentParser(description="Compiler le modèle XGBoost en tableaux NumPy.")
+    parser.add_argument("--model", default=str(MODEL_PATH))
+    parser.add_argument("--pipeline", default=str(PIPELINE_PATH))
+    parser.add_argument("--output", default=str(COMPILED_DIR))
+    args = parser.parse_args(argv)
+
+    compiled = CompiledEnsemble.from_xgboost(load_model(args.model))
+    compiled.save(args.output)
+    print(f"✅ {len(compiled.roots)} arbres compilés (profondeur {compiled.max_depth}) -> {args.output}")
+    pipeline = load_pipeline(args.pipeline)
+    if pipeline is not None:
+        CompiledPreprocessor.from_pipeline(pipeline).save(Path(args.output) / PREPROCESSOR_DIR)
+        print(f"✅ Prétraitement compilé -> {Path(args.output) / PREPROCESSOR_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""Réentraînement incrémental sur les ventes nouvellement arrivées.
+
+Plutôt que de tout réajuster sur data/raw/train.csv, une mise à jour :
+
+1. met à jour en ligne les statistiques du StandardScaler (partial_fit) et
+   agrandit les vocabulaires des catégoriques avec les modalités nouvelles ;
+   médianes d'imputation et bornes IQR restent celles de l'entraînement ;
+2. adapte le booster existant à ce nouvel encodage sans changer ses
+   prédictions : seuils des numériques ré-exprimés dans la nouvelle échelle,
+   indices des colonnes (et codes des modalités) renumérotés ;
+3. ajoute quelques tours de boosting ajustés sur les nouvelles ventes ;
+4. ne publie le modèle dans le registre que s'il fait au moins aussi bien
+   que le modèle précédent sur une partie réservée des nouvelles ventes.
+
+Lancement : python -m src.models.incremental data/raw/new_sales.csv
+"""
+import argparse
+import copy
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OrdinalEncoder
+
+from src.features.build_features import feature_types
+from src.features.store import TARGET_NAME
+from src.models.registry import REGISTRY_DIR, ModelRegistry
+
+DEFAULT_ROUNDS = 20
+# Plus faible que celui de la recherche d'hyperparamètres : quelques centaines
+# de ventes par jour ne doivent corriger le modèle qu'à la marge.
+DEFAULT_LEARNING_RATE = 0.05
+DEFAULT_VALIDATION_FRACTION = 0.2
+# Dégradation relative du RMSE tolérée par rapport au modèle précédent
+DEFAULT_TOLERANCE = 0.0
+# Pas des numériques brutes (comptes, surfaces, années ; demi-salles de bains)
+RAW_RESOLUTION = 0.5
+# Hyperparamètres des arbres repris de la configuration du booster existant
+TREE_PARAMS = {
+    "max_depth": ("max_depth", int),
+    "min_child_weight": ("min_child_weight", float),
+    "subsample": ("subsample", float),
+    "colsample_bytree": ("colsample_bytree", float),
+    "reg_lambda": ("lambda", float),
+    "reg_alpha": ("alpha", float),
+    "gamma": ("gamma", float),
+}
+
+
+def update_preprocessor(pipeline, rows):
+    """Mettre à jour le prétraitement d'un pipeline ajusté avec de nouvelles lignes.
+
+    Args:
+        pipeline (Pipeline): Étapes features/impute/clip/preprocessor ajustées
+            (un pipeline d'inférence complet convient, le modèle est ignoré).
+        rows (pd.DataFrame): Nouvelles lignes brutes.
+
+    Returns:
+        tuple: (pipeline de prétraitement mis à jour, ancien scaler, anciens
+        vocabulaires) ; les étapes précédant l'encodage sont partagées.
+    """
+    prefix = pipeline[:3]
+    old = pipeline.named_steps["preprocessor"]
+    transformers = {name: (transformer, cols) for name, transformer, cols in old.transformers_}
+    scaler, numeric_cols = transformers["num"]
+    encoder, categorical_cols = transformers["cat"]
+    frame = prefix.transform(rows)
+
+    updated_scaler = copy.deepcopy(scaler).partial_fit(frame[list(numeric_cols)])
+    vocabularies = [
+        sorted(set(categories) | set(frame[col].astype(str)))
+        for categories, col in zip(encoder.categories_, categorical_cols)
+    ]
+    # Structure (colonnes de sortie, indices) calculée par sklearn avec les
+    # vocabulaires imposés, puis statistiques du scaler mises à jour en ligne
+    preprocessor = clone(old).set_params(cat__categories=vocabularies)
+    preprocessor.fit(frame)
+    preprocessor.transformers_ = [
+        (name, updated_scaler if name == "num" else transformer, cols)
+        for name, transformer, cols in preprocessor.transformers_
+    ]
+    return Pipeline(prefix.steps + [("preprocessor", preprocessor)]), scaler, list(encoder.categories_)
+
+
+def adapt_thresholds(thresholds, old_mean, old_scale, mean, scale, resolution=RAW_RESOLUTION):
+    """Ré-exprimer des seuils sur numériques standardisées dans une nouvelle échelle.
+
+    Les seuils de XGBoost sont souvent des valeurs observées (x < seuil va à
+    gauche), et les valeurs standardisées sont comparées en float32 : un seuil
+    simplement transposé peut faire changer de branche la valeur brute qui
+    tombait dessus. Quand un seuil correspond à une valeur brute de la grille
+    (multiples de resolution), il est placé à mi-chemin de la valeur voisine,
+    du côté où cette valeur n'allait pas.
+
+    Args:
+        thresholds (np.ndarray): Seuils dans l'ancienne échelle.
+        old_mean, old_scale (np.ndarray): Statistiques de l'ancien scaler,
+            une par seuil.
+        mean, scale (np.ndarray): Statistiques du nouveau scaler.
+        resolution (float): Pas des valeurs brutes.
+
+    Returns:
+        np.ndarray: Seuils dans la nouvelle échelle.
+    """
+    thresholds32 = thresholds.astype(np.float32)
+    raw = old_mean + old_scale * thresholds
+    grid = np.round(raw / resolution) * resolution
+    # Écart attendu entre une valeur brute et le seuil float32 qui la représente
+    tolerance = 4 * np.spacing(np.abs(thresholds32)).astype(np.float64) * old_scale
+    on_grid = np.abs(raw - grid) <= tolerance
+    goes_left = ((grid - old_mean) / old_scale).astype(np.float32) < thresholds32
+    raw = np.where(on_grid, grid + np.where(goes_left, resolution, -resolution) / 2, raw)
+    return (raw - mean) / scale
+
+
+def adapt_booster(booster, old_names, preprocessor, old_scaler, old_vocabularies):
+    """Ré-exprimer un booster dans le nouvel encodage, à prédictions égales.
+
+    Un seuil t sur une numérique standardisée z = (x - m) / s devient
+    (m + t·s - m') / s' avec les nouvelles statistiques (m', s'), ajusté par
+    adapt_thresholds ; chaque colonne est renumérotée d'après son nom, et en
+    encodage ordinal les codes des modalités des splits catégoriels sont
+    traduits dans le vocabulaire agrandi.
+
+    Args:
+        booster (xgboost.Booster): Booster entraîné sur old_names.
+        old_names (list): Colonnes de l'ancien encodage, dans l'ordre.
+        preprocessor (ColumnTransformer): Encodeur mis à jour.
+        old_scaler (StandardScaler): Scaler avant mise à jour.
+        old_vocabularies (list): Vocabulaires avant mise à jour.
+
+    Returns:
+        xgboost.Booster: Booster adapté aux colonnes du nouvel encodage.
+
+    Raises:
+        ValueError: Si une ancienne colonne n'existe plus.
+    """
+    import xgboost as xgb
+
+    transformers = {name: (transformer, cols) for name, transformer, cols in preprocessor.transformers_}
+    scaler, numeric_cols = transformers["num"]
+    encoder, categorical_cols = transformers["cat"]
+    new_names = [str(name) for name in preprocessor.get_feature_names_out()]
+    position = {name: i for i, name in enumerate(new_names)}
+    missing = [name for name in old_names if name not in position]
+    if missing:
+        raise ValueError(f"Colonnes absentes du nouvel encodage : {missing}")
+    index_map = np.array([position[name] for name in old_names])
+
+    # Statistiques des numériques, indexées par l'ancienne colonne
+    standardized = np.zeros(len(old_names), dtype=bool)
+    old_mean, old_scale = np.zeros(len(old_names)), np.ones(len(old_names))
+    mean, scale = np.zeros(len(old_names)), np.ones(len(old_names))
+    old_position = {name: i for i, name in enumerate(old_names)}
+    for j, col in enumerate(numeric_cols):
+        i = old_position.get(f"num__{col}")
+        if i is not None:
+            standardized[i] = True
+            old_mean[i], old_scale[i] = old_scaler.mean_[j], old_scaler.scale_[j]
+            mean[i], scale[i] = scaler.mean_[j], scaler.scale_[j]
+    code_maps = {}
+    if isinstance(encoder, OrdinalEncoder):
+        for col, old_vocabulary, vocabulary in zip(categorical_cols, old_vocabularies, encoder.categories_):
+            i = old_position.get(f"cat__{col}")
+            if i is not None:
+                code_maps[i] = np.searchsorted(np.asarray(vocabulary, dtype=str), np.asarray(old_vocabulary, dtype=str))
+
+    model = json.loads(booster.save_raw("json"))
+    learner = model["learner"]
+    for tree in learner["gradient_booster"]["model"]["trees"]:
+        features = np.asarray(tree["split_indices"], dtype=np.int64)
+        internal = np.asarray(tree["left_children"]) != -1
+        numeric = internal & (np.asarray(tree["split_type"]) == 0) & standardized[features]
+        conditions = np.asarray(tree["split_conditions"], dtype=np.float64)
+        f = features[numeric]
+        conditions[numeric] = adapt_thresholds(conditions[numeric], old_mean[f], old_scale[f], mean[f], scale[f])
+        tree["split_conditions"] = conditions.tolist()
+        categories = list(tree["categories"])
+        for node, start, size in zip(tree["categories_nodes"], tree["categories_segments"], tree["categories_sizes"]):
+            codes = code_maps.get(int(features[node]))
+            if codes is not None:
+                categories[start:start + size] = sorted(codes[categories[start:start + size]].tolist())
+        tree["categories"] = categories
+        tree["split_indices"] = np.where(internal, index_map[features], 0).tolist()
+        tree["tree_param"]["num_feature"] = str(len(new_names))
+    learner["learner_model_param"]["num_feature"] = str(len(new_names))
+    learner["feature_names"] = new_names
+    learner["feature_types"] = feature_types(new_names, categorical_cols)
+    return xgb.Booster(model_file=bytearray(json.dumps(model).encode()))
+
+
+def booster_params(booster):
+    """Hyperparamètres des arbres d'un booster, pour les tours supplémentaires."""
+    config = json.loads(booster.save_config())["learner"]["gradient_booster"]
+    train_param = config.get("tree_train_param", {})
+    return {name: cast(train_param[key]) for name, (key, cast) in TREE_PARAMS.items() if key in train_param}
+
+
+def incremental_update(
+    rows,
+    model,
+    pipeline,
+    rounds=DEFAULT_ROUNDS,
+    learning_rate=DEFAULT_LEARNING_RATE,
+    validation_fraction=DEFAULT_VALIDATION_FRACTION,
+    tolerance=DEFAULT_TOLERANCE,
+    seed=None,
+):
+    """Mettre à jour un modèle XGBoost avec de nouvelles ventes.
+
+    Args:
+        rows (pd.DataFrame): Nouvelles lignes brutes, avec SalePrice.
+        model (XGBRegressor): Modèle en service.
+        pipeline (Pipeline): Pipeline d'inférence du modèle en service.
+        rounds (int): Tours de boosting ajoutés.
+        learning_rate (float): Taux d'apprentissage des tours ajoutés.
+        validation_fraction (float): Part des nouvelles ventes réservée à la
+            validation (jamais vue par le scaler ni par les nouveaux arbres).
+        tolerance (float): Dégradation relative du RMSE acceptée.
+        seed (int): Graine du découpage ; SEED de train_model par défaut.
+
+    Returns:
+        dict: accepted, model et pipeline mis à jour, metrics (du modèle mis
+        à jour et du précédent, sur la validation).
+
+    Raises:
+        ValueError: Si le modèle n'est pas un XGBoost (seul un booster peut
+            être prolongé) ou si les nouvelles ventes sont trop peu nombreuses.
+    """
+    from xgboost import XGBRegressor
+
+    from src.models.train_model import SEED, evaluate_model, model_kwargs
+
+    if not hasattr(model, "get_booster"):
+        raise ValueError(
+            f"Mise à jour incrémentale impossible pour {type(model).__name__} : seul un modèle "
+            "XGBoost peut être prolongé ; réentraîner avec make train."
+        )
+    if len(rows) < 2:
+        raise ValueError("Au moins deux nouvelles ventes sont nécessaires (entraînement et validation).")
+    train_rows, val_rows = train_test_split(
+        rows, test_size=validation_fraction, random_state=SEED if seed is None else seed
+    )
+    y_train = np.log1p(train_rows[TARGET_NAME].to_numpy(dtype=float))
+    y_val = np.log1p(val_rows[TARGET_NAME].to_numpy(dtype=float))
+
+    booster = model.get_booster()
+    old_names = [str(name) for name in pipeline.named_steps["preprocessor"].get_feature_names_out()]
+    preprocessing, old_scaler, old_vocabularies = update_preprocessor(pipeline, train_rows)
+    preprocessor = preprocessing.named_steps["preprocessor"]
+    adapted = adapt_booster(booster, old_names, preprocessor, old_scaler, old_vocabularies)
+
+    columns = [str(name) for name in preprocessor.get_feature_names_out()]
+    categorical_cols = {name: cols for name, _, cols in preprocessor.transformers_}["cat"]
+    types = feature_types(columns, categorical_cols)
+    updated = XGBRegressor(
+        n_estimators=rounds,
+        learning_rate=learning_rate,
+        **booster_params(booster),
+        **model_kwargs("XGBoost", types),
+    )
+    X_train = pd.DataFrame(np.asarray(preprocessing.transform(train_rows), dtype=float), columns=columns)
+    updated.fit(X_train, y_train, xgb_model=adapted)
+    updated_pipeline = Pipeline(preprocessing.steps + [("model", updated)])
+
+    metrics = evaluate_model(y_val, updated_pipeline.predict(val_rows))
+    X_val = pd.DataFrame(np.asarray(pipeline[:-1].transform(val_rows), dtype=float), columns=old_names)
+    previous = evaluate_model(y_val, model.predict(X_val))
+    accepted = metrics["rmse"] <= previous["rmse"] * (1 + tolerance)
+    return {
+        "accepted": bool(accepted),
+        "model": updated,
+        "pipeline": updated_pipeline,
+        "metrics": {
+            **metrics,
+            "previous_rmse": previous["rmse"],
+            "previous_mae": previous["mae"],
+            "previous_r": previous["r"],
+            "new_rows": len(rows),
+            "rounds": booster.num_boosted_rounds() + rounds,
+        },
+    }
+
+
+def load_base(registry, version=None):
+    """Modèle et pipeline à mettre à jour : la version active du registre, sinon models/.
+
+    Returns:
+        tuple: (modèle, pipeline, version ou None).
+    """
+    from src.models.pipeline import load_pipeline
+    from src.models.predict_model import MODEL_PATH, PIPELINE_PATH, load_model
+
+    version = version or registry.current()
+    if version is not None:
+        loaded = registry.load(version)
+        return loaded.model, loaded.pipeline, version
+    return load_model(MODEL_PATH), load_pipeline(PIPELINE_PATH), None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mettre à jour le modèle servi avec de nouvelles ventes.")
+    parser.add_argument("new_sales", help="CSV des nouvelles ventes (schéma de data/raw/train.csv).")
+    parser.add_argument("--registry", default=str(REGISTRY_DIR))
+    parser.add_argument("--base-version", default=None, help="Version de départ ; la version active par défaut.")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS)
+    parser.add_argument("--learning-rate", type=float, default=DEFAULT_LEARNING_RATE)
+    parser.add_argument("--validation-fraction", type=float, default=DEFAULT_VALIDATION_FRACTION)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--no-activate", action="store_true", help="Publier sans activer la version.")
+    parser.add_argument("--dry-run", action="store_true", help="Évaluer sans publier.")
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(args.registry)
+    model, pipeline, base_version = load_base(registry, args.base_version)
+    try:
+        result = incremental_update(
+            pd.read_csv(args.new_sales), model, pipeline, args.rounds, args.learning_rate,
+            args.validation_fraction, args.tolerance,
+        )
+    except ValueError as exc:
+        print(f"❌ {exc}")
+        sys.exit(1)
+    metrics = result["metrics"]
+    print(f"Base : {base_version or 'models/'} ; {metrics['new_rows']} nouvelles ventes")
+    print(f"  RMSE validation : {metrics['rmse']:.4f} (précédent : {metrics['previous_rmse']:.4f})")
+    if not result["accepted"]:
+        print("❌ Modèle mis à jour rejeté : il fait moins bien que le modèle précédent.")
+        sys.exit(1)
+    if args.dry_run:
+        print("✅ Modèle mis à jour accepté (non publié).")
+        return
+    version = registry.publish(result["model"], result["pipeline"], metrics, activate=not args.no_activate)
+    print(f"✅ Version publiée : {version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import argparse
+from pathlib import Path
+
+import joblib
+import pandas as pd
+from sklearn.pipeline import Pipeline
+
+from src.features.build_features import FeatureBuilder, IQRClipper, MedianImputer, raw_columns
+from src.models.predict_model import (
+    COLUMN_TYPES_PATH,
+    MODEL_PATH,
+    PIPELINE_PATH,
+    PREPROCESSOR_PATH,
+    PROJECT_DIR,
+    load_column_types,
+    load_model,
+)
+
+TRAIN_PATH = PROJECT_DIR / "data" / "raw" / "train.csv"
+
+
+def build_inference_pipeline(train, preprocessor, model, numeric_cols, categorical_cols):
+    """Assembler feature engineering, imputation, encodage et modèle.
+
+    Le pipeline obtenu prend en entrée des lignes brutes au schéma Kaggle
+    (YrSold, YearBuilt, Neighborhood, ...) et renvoie les prédictions. Les
+    médianes et bornes IQR sont apprises une fois sur le train et réappliquées
+    telles quelles à l'inférence, quel que soit le lot scoré.
+
+    Args:
+        train (pd.DataFrame): Lignes brutes d'entraînement.
+        preprocessor (ColumnTransformer): Preprocessor déjà ajusté.
+        model (object): Modèle déjà entraîné.
+        numeric_cols (list): Colonnes numériques retenues.
+        categorical_cols (list): Colonnes catégoriques retenues.
+
+    Returns:
+        Pipeline: Pipeline complet prêt pour predict.
+    """
+    features = FeatureBuilder()
+    impute = MedianImputer(numeric_cols, categorical_cols)
+    clip = IQRClipper(numeric_cols)
+    clip.fit(impute.fit_transform(features.fit_transform(train)))
+
+    return Pipeline(
+        [
+            ("features", features),
+            ("impute", impute),
+            ("clip", clip),
+            ("preprocessor", preprocessor),
+            ("model", model),
+        ]
+    )
+
+
+def pipeline_raw_columns(pipeline):
+    """Colonnes brutes attendues par un pipeline d'inférence (sklearn ou compilé).
+
+    Args:
+        pipeline (Pipeline | CompiledPipeline): Pipeline complet.
+
+    Returns:
+        list: Colonnes brutes à fournir à pipeline.predict.
+    """
+    preprocessing = pipeline[:-1]
+    if hasattr(preprocessing, "raw_columns"):
+        return preprocessing.raw_columns()
+    steps = preprocessing.named_steps
+    columns = {name: cols for name, _, cols in steps["preprocessor"].transformers_}
+    return raw_columns(columns["num"], columns["cat"], steps["features"].feature_set)
+
+
+def load_pipeline(path=PIPELINE_PATH):
+    """Charger le pipeline d'inférence sérialisé.
+
+    Args:
+        path (str | Path): Chemin du pipeline.
+
+    Returns:
+        Pipeline: Pipeline complet, ou None si l'artefact est absent.
+    """
+    return joblib.load(path) if Path(path).exists() else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporter le pipeline d'inférence complet.")
+    parser.add_argument("--train", default=str(TRAIN_PATH))
+    parser.add_argument("--model", default=str(MODEL_PATH))
+    parser.add_argument("--preprocessor", default=str(PREPROCESSOR_PATH))
+    parser.add_argument("--column-types", default=str(COLUMN_TYPES_PATH))
+    parser.add_argument("--output", default=str(PIPELINE_PATH))
+    args = parser.parse_args(argv)
+
+    numeric_cols, categorical_cols = load_column_types(args.column_types)
+    pipeline = build_inference_pipeline(
+        pd.read_csv(args.train),
+        joblib.load(args.preprocessor),
+        load_model(args.model),
+        numeric_cols,
+        categorical_cols,
+    )
+    joblib.dump(pipeline, args.output)
+    print(f"✅ Pipeline d'inférence sauvegardé -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+import argparse
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.features.store import EXTENSION, read_matrix
+
+PROJECT_DIR = Path(__file__).resolve().parents[2]
+MODEL_PATH = PROJECT_DIR / "models" / "best_model.pkl"
+PREPROCESSOR_PATH = PROJECT_DIR / "models" / "preprocessor.joblib"
+PIPELINE_PATH = PROJECT_DIR / "models" / "inference_pipeline.joblib"
+# Métriques de validation et hyperparamètres du modèle retenu (train_model)
+METRICS_PATH = PROJECT_DIR / "models" / "xgb_best_metrics.pkl"
+PARAMS_PATH = PROJECT_DIR / "models" / "xgb_best_params.pkl"
+COLUMN_TYPES_PATH = PROJECT_DIR / "data" / "processed" / "column_types.json"
+DEFAULT_CHUNKSIZE = 50_000
+DEFAULT_SHARD_BYTES = 32 * 1024 * 1024
+ID_COLUMN = "Id"
+
+# Artefacts chargés une seule fois par processus du pool
+_worker = {}
+
+
+def load_model(path=MODEL_PATH):
+    """Charger le modèle entraîné.
+
+    Args:
+        path (str | Path): Chemin du modèle sérialisé.
+
+    Returns:
+        object: Modèle exposant une méthode predict.
+    """
+    return joblib.load(path)
+
+
+def model_feature_names(model):
+    """Récupérer la liste ordonnée des colonnes attendues par le modèle.
+
+    Args:
+        model (object): Modèle entraîné sur un DataFrame.
+
+    Returns:
+        list: Noms des colonnes dans l'ordre d'entraînement.
+    """
+    return [str(name) for name in model.feature_names_in_]
+
+
+def iter_predictions(model, source, feature_names, chunksize=DEFAULT_CHUNKSIZE, id_column=ID_COLUMN):
+    """Lire un CSV par blocs de taille fixe et prédire chaque bloc.
+
+    Seules les colonnes utiles sont lues, directement en float32, de sorte
+    que la mémoire consommée dépend de chunksize et non de la taille du fichier.
+
+    Args:
+        model (object): Modèle exposant une méthode predict.
+        source (str | Path | file): Fichier CSV ou flux binaire/texte.
+        feature_names (list): Colonnes attendues par le modèle, dans l'ordre.
+        chunksize (int): Nombre de lignes lues par bloc.
+        id_column (str): Colonne identifiant recopiée en sortie si présente.
+
+    Yields:
+        tuple: (ids, predictions) pour chaque bloc, ids valant None si la
+        colonne identifiant est absente du fichier.
+    """
+    wanted = set(feature_names) | {id_column}
+    reader = pd.read_csv(
+        source,
+        usecols=lambda col: col in wanted,
+        dtype={name: np.float32 for name in feature_names},
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        missing = [name for name in feature_names if name not in chunk.columns]
+        if missing:
+            raise ValueError(f"Colonnes manquantes : {missing}")
+        X = chunk[feature_names].to_numpy(dtype=np.float32)
+        ids = chunk[id_column].to_numpy() if id_column in chunk.columns else None
+        yield ids, model.predict(X)
+
+
+def iter_matrix_predictions(model, path, feature_names, chunksize=DEFAULT_CHUNKSIZE):
+    """Prédire une matrice du feature store par blocs, sans la copier en entier.
+
+    Args:
+        model (object): Modèle exposant une méthode predict.
+        path (str | Path): Fichier de features (.hpf) projeté en mémoire.
+        feature_names (list): Colonnes attendues par le modèle, dans l'ordre.
+        chunksize (int): Nombre de lignes prédites par bloc.
+
+    Yields:
+        tuple: (None, predictions) pour chaque bloc.
+    """
+    X, header = read_matrix(path)
+    missing = [name for name in feature_names if name not in header["columns"]]
+    if missing:
+        raise ValueError(f"Colonnes manquantes : {missing}")
+    positions = [header["columns"].index(name) for name in feature_names]
+    for start in range(0, X.shape[0], chunksize):
+        block = np.ascontiguousarray(X[start:start + chunksize, positions], dtype=np.float32)
+        yield None, model.predict(block)
+
+
+def format_predictions(ids, predictions, header=False, id_column=ID_COLUMN):
+    """Formater un bloc de prédictions en lignes CSV.
+
+    Args:
+        ids (np.ndarray | None): Identifiants du bloc.
+        predictions (np.ndarray): Prédictions du bloc.
+        header (bool): Ajouter la ligne d'en-tête.
+        id_column (str): Nom de la colonne identifiant.
+
+    Returns:
+        str: Texte CSV du bloc.
+    """
+    frame = pd.DataFrame({"prediction": predictions})
+    if ids is not None:
+        frame.insert(0, id_column, ids)
+    return frame.to_csv(index=False, header=header)
+
+
+def stream_predictions(model, source, output, chunksize=DEFAULT_CHUNKSIZE, feature_names=None):
+    """Scorer un CSV bloc par bloc et écrire les prédictions au fil de l'eau.
+
+    Args:
+        model (object): Modèle exposant une méthode predict.
+        source (str | Path | file): Fichier CSV d'entrée, ou matrice du
+            feature store (.hpf).
+        output (str | Path): Fichier CSV de sortie.
+        chunksize (int): Nombre de lignes lues par bloc.
+        feature_names (list): Colonnes attendues ; déduites du modèle par défaut.
+
+    Returns:
+        int: Nombre de lignes scorées.
+    """
+    feature_names = feature_names or model_feature_names(model)
+    if str(source).endswith(EXTENSION):
+        chunks = iter_matrix_predictions(model, source, feature_names, chunksize)
+    else:
+        chunks = iter_predictions(model, source, feature_names, chunksize)
+    n_rows = 0
+    with open(output, "w", newline="") as f:
+        for ids, predictions in chunks:
+            f.write(format_predictions(ids, predictions, header=n_rows == 0))
+            n_rows += len(predictions)
+    return n_rows
+
+
+def load_column_types(path=COLUMN_TYPES_PATH):
+    """Charger les listes de colonnes numériques et catégoriques retenues.
+
+    Args:
+        path (str | Path): Chemin de column_types.json.
+
+    Returns:
+        tuple: (numeric_cols, categorical_cols)
+    """
+    with open(path) as f:
+        column_types = json.load(f)
+    return column_types["numeric_cols"], column_types["categorical_cols"]
+
+
+def shard_file(path, shard_bytes=DEFAULT_SHARD_BYTES):
+    """Découper un CSV en plages d'octets alignées sur les fins de ligne.
+
+    Les champs contenant des retours à la ligne ne sont pas supportés, ce qui
+    est le cas des fichiers au schéma Kaggle. L'en-tête est lu par pandas
+    (noms entre guillemets, BOM) et transmis à chaque shard.
+
+    Args:
+        path (str | Path): Fichier CSV avec une ligne d'en-tête.
+        shard_bytes (int): Taille cible d'un shard en octets.
+
+    Returns:
+        list: Tuples (path, start, end, header) dans l'ordre du fichier.
+    """
+    size = os.path.getsize(path)
+    header = list(pd.read_csv(path, nrows=0).columns)
+    shards = []
+    with open(path, "rb") as f:
+        f.readline()
+        start = f.tell()
+        while start < size:
+            f.seek(min(start + shard_bytes, size))
+            f.readline()
+            end = min(f.tell(), size)
+            shards.append((str(path), start, end, header))
+            start = end
+    return shards
+
+
+def _init_worker(pipeline_path):
+    _worker["pipeline"] = joblib.load(pipeline_path)
+
+
+def _score_shard(shard):
+    path, start, end, header = shard
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    df = pd.read_csv(io.BytesIO(data), header=None, names=header)
+    ids = df[ID_COLUMN].to_numpy() if ID_COLUMN in df.columns else None
+    return ids, _worker["pipeline"].predict(df)
+
+
+def batch_predict(
+    input_paths,
+    output,
+    n_jobs=None,
+    shard_bytes=DEFAULT_SHARD_BYTES,
+    pipeline_path=PIPELINE_PATH,
+):
+    """Scorer des CSV bruts en parallèle sur un pool de processus.
+
+    Chaque fichier est découpé en shards de plages d'octets répartis sur les
+    coeurs ; chaque processus charge le pipeline d'inférence une seule fois,
+    puis les résultats sont écrits dans l'ordre des fichiers d'entrée.
+
+    Args:
+        input_paths (list): Fichiers CSV au schéma Kaggle (train.csv/test.csv).
+        output (str | Path): Fichier CSV de sortie.
+        n_jobs (int): Nombre de processus ; tous les coeurs par défaut.
+        shard_bytes (int): Taille cible d'un shard en octets.
+        pipeline_path (str | Path): Chemin du pipeline d'inférence complet.
+
+    Returns:
+        int: Nombre de lignes scorées.
+    """
+    shards = [shard for path in input_paths for shard in shard_file(path, shard_bytes)]
+    n_rows = 0
+    with ProcessPoolExecutor(
+        max_workers=n_jobs,
+        initializer=_init_worker,
+        initargs=(str(pipeline_path),),
+    ) as executor, open(output, "w", newline="") as f:
+        for ids, predictions in executor.map(_score_shard, shards):
+            f.write(format_predictions(ids, predictions, header=n_rows == 0))
+            n_rows += len(predictions)
+    return n_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scoring de fichiers CSV avec le modèle entraîné.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    stream = subparsers.add_parser("stream", help="Scorer un CSV de features par blocs.")
+    stream.add_argument("input", help="CSV ou matrice .hpf contenant les colonnes du modèle.")
+    stream.add_argument("output", help="CSV de sortie des prédictions.")
+    stream.add_argument("--model", default=str(MODEL_PATH))
+    stream.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+
+    batch = subparsers.add_parser("batch", help="Scorer des CSV bruts sur tous les coeurs.")
+    batch.add_argument("inputs", nargs="+", help="CSV au schéma Kaggle (ex. data/raw/test.csv).")
+    batch.add_argument("--output", required=True, help="CSV de sortie des prédictions.")
+    batch.add_argument("--pipeline", default=str(PIPELINE_PATH))
+    batch.add_argument("--n-jobs", type=int, default=None)
+    batch.add_argument("--shard-mb", type=float, default=DEFAULT_SHARD_BYTES / 2**20)
+
+    args = parser.parse_args(argv)
+    if args.command == "stream":
+        n_rows = stream_predictions(load_model(args.model), args.input, args.output, args.chunksize)
+    else:
+        n_rows = batch_predict(
+            args.inputs,
+            args.output,
+            n_jobs=args.n_jobs,
+            shard_bytes=int(args.shard_mb * 2**20),
+            pipeline_path=args.pipeline,
+        )
+    print(f"✅ {n_rows} lignes scorées -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Registre versionné des modèles servis.
+
+Chaque version est un répertoire models/registry/<version>/ contenant le
+modèle, le pipeline d'inférence, le modèle compilé, les métriques et le
+schéma des features. Le fichier CURRENT désigne la version active ; il est
+réécrit par renommage atomique, de sorte qu'un lecteur voit toujours soit
+l'ancienne soit la nouvelle version, jamais un état intermédiaire.
+
+Seul NumPy est importé au chargement du module ; joblib, sklearn et xgboost
+ne le sont qu'à la première opération qui en a besoin, pour qu'un worker
+servant le modèle compilé démarre sans les importer.
+"""
+import argparse
+import json
+import os
+import pickle
+import shutil
+import time
+from pathlib import Path
+
+from src.features.digest import file_digest
+from src.models.compiled import PREPROCESSOR_DIR, PROJECT_DIR, CompiledEnsemble, CompiledPipeline, CompiledPreprocessor
+
+REGISTRY_DIR = PROJECT_DIR / "models" / "registry"
+CURRENT = "CURRENT"
+MODEL_FILE = "model.pkl"
+PIPELINE_FILE = "inference_pipeline.joblib"
+COMPILED_DIR = "compiled"
+METRICS_FILE = "metrics.json"
+SCHEMA_FILE = "schema.json"
+
+
+class ModelVersion:
+    """Artefacts chargés d'une version du registre.
+
+    Args:
+        version (str): Identifiant de la version.
+        model (object): Modèle exposant predict (XGBoost ou compilé).
+        pipeline (Pipeline): Pipeline lignes brutes -> prédictions, ou None.
+        metrics (dict): Métriques de validation enregistrées.
+        feature_names (list): Colonnes attendues par le modèle, dans l'ordre.
+        pipeline_path (Path): Fichier du pipeline, pour un chargement différé.
+    """
+
+    def __init__(self, version, model, pipeline=None, metrics=None, feature_names=None, pipeline_path=None):
+        self.version = version
+        self.model = model
+        self.pipeline = pipeline
+        self.metrics = metrics or {}
+        self.feature_names = feature_names or []
+        self.pipeline_path = pipeline_path
+
+
+class ModelRegistry:
+    """Répertoire de versions de modèles et pointeur vers la version active.
+
+    Args:
+        root (str | Path): Répertoire du registre.
+    """
+
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = Path(root)
+
+    def path(self, version):
+        return self.root / version
+
+    def versions(self):
+        """Lister les versions publiées, de la plus ancienne à la plus récente."""
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir() and not p.name.startswith("."))
+
+    def current(self):
+        """Version active, ou None si le registre est vide."""
+        try:
+            return (self.root / CURRENT).read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def activate(self, version):
+        """Désigner version comme active (remplacement atomique de CURRENT)."""
+        if not self.path(version).is_dir():
+            raise ValueError(f"Version inconnue : {version}")
+        tmp_path = self.root / f".{CURRENT}.{os.getpid()}"
+        tmp_path.write_text(version + "\n")
+        os.replace(tmp_path, self.root / CURRENT)
+
+    def publish(self, model, pipeline=None, metrics=None, version=None, activate=True):
+        """Enregistrer une nouvelle version et, par défaut, l'activer.
+
+        Les artefacts sont écrits dans un répertoire temporaire renommé à la
+        fin : une version visible dans le registre est toujours complète.
+
+        Args:
+            model (object): Modèle entraîné (XGBRegressor de préférence).
+            pipeline (Pipeline): Pipeline d'inférence complet, optionnel.
+            metrics (dict): Métriques de validation.
+            version (str): Identifiant ; horodatage + empreinte par défaut.
+            activate (bool): Faire pointer CURRENT sur la nouvelle version.
+
+        Returns:
+            str: Identifiant de la version publiée.
+        """
+        import joblib
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_dir = self.root / f".tmp-{os.getpid()}-{time.time_ns()}"
+        tmp_dir.mkdir()
+        try:
+            joblib.dump(model, tmp_dir / MODEL_FILE)
+            if pipeline is not None:
+                joblib.dump(pipeline, tmp_dir / PIPELINE_FILE)
+            if hasattr(model, "get_booster"):
+                CompiledEnsemble.from_xgboost(model).save(tmp_dir / COMPILED_DIR)
+                if pipeline is not None:
+                    CompiledPreprocessor.from_pipeline(pipeline).save(tmp_dir / COMPILED_DIR / PREPROCESSOR_DIR)
+            metrics = {key: float(value) for key, value in (metrics or {}).items()}
+            (tmp_dir / METRICS_FILE).write_text(json.dumps(metrics, indent=2))
+            schema = {"feature_names": [str(name) for name in getattr(model, "feature_names_in_", [])]}
+            (tmp_dir / SCHEMA_FILE).write_text(json.dumps(schema, indent=2))
+
+            version = version or f"{time.strftime('%Y%m%d-%H%M%S')}-{file_digest(tmp_dir / MODEL_FILE)[:8]}"
+            if self.path(version).exists():
+                raise ValueError(f"La version {version} existe déjà.")
+            os.replace(tmp_dir, self.path(version))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        if activate:
+            self.activate(version)
+        return version
+
+    def load(self, version=None, engine="xgboost", mmap=False, lazy=False):
+        """Charger une version (la version active par défaut).
+
+        Args:
+            version (str): Version à charger.
+            engine (str): "xgboost" ou "compiled" : modèle et prétraitement
+                compilés en tableaux NumPy, si disponibles.
+            mmap (bool): Projeter en mémoire les tableaux compilés.
+            lazy (bool): Ne pas charger le pipeline sklearn ; seul son chemin
+                est renvoyé.
+
+        Returns:
+            ModelVersion: Artefacts de la version, ou None si le registre est vide.
+        """
+        version = version or self.current()
+        if version is None:
+            return None
+        path = self.path(version)
+        pipeline = None
+        if engine == "compiled" and (path / COMPILED_DIR / PREPROCESSOR_DIR).is_dir():
+            pipeline = CompiledPipeline.load(path / COMPILED_DIR, mmap=mmap)
+            model = pipeline.model
+        elif engine == "compiled" and (path / COMPILED_DIR).is_dir():
+            model = CompiledEnsemble.load(path / COMPILED_DIR, mmap=mmap)
+        else:
+            from src.models.predict_model import load_model
+
+            model = load_model(path / MODEL_FILE)
+        metrics = json.loads((path / METRICS_FILE).read_text()) if (path / METRICS_FILE).exists() else {}
+        schema = json.loads((path / SCHEMA_FILE).read_text()) if (path / SCHEMA_FILE).exists() else {}
+        if pipeline is None and not lazy:
+            from src.models.pipeline import load_pipeline
+
+            pipeline = load_pipeline(path / PIPELINE_FILE)
+        return ModelVersion(version, model, pipeline, metrics, schema.get("feature_names"), path / PIPELINE_FILE)
+
+
+def main(argv=None):
+    from src.models.pipeline import load_pipeline
+    from src.models.predict_model import METRICS_PATH, MODEL_PATH, PIPELINE_PATH, load_model
+
+    parser = argparse.ArgumentParser(description="Gérer le registre des modèles servis.")
+    parser.add_argument("--registry", default=str(REGISTRY_DIR))
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    publish = subparsers.add_parser("publish", help="Publier les artefacts de models/ comme nouvelle version.")
+    publish.add_argument(
+        "--artifacts-dir", default=str(MODEL_PATH.parent), help="Sortie de train_model (--output-dir)."
+    )
+    publish.add_argument("--model", default=None, help=f"{MODEL_PATH.name} de --artifacts-dir par défaut.")
+    publish.add_argument("--pipeline", default=None, help=f"{PIPELINE_PATH.name} de --artifacts-dir par défaut.")
+    publish.add_argument("--metrics", default=None, help=f"{METRICS_PATH.name} de --artifacts-dir par défaut.")
+    publish.add_argument("--version", default=None)
+    publish.add_argument("--no-activate", action="store_true")
+
+    activate = subparsers.add_parser("activate", help="Activer une version publiée.")
+    activate.add_argument("version")
+
+    subparsers.add_parser("list", help="Lister les versions.")
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(args.registry)
+    if args.command == "publish":
+        artifacts = Path(args.artifacts_dir)
+        metrics_path = Path(args.metrics or artifacts / METRICS_PATH.name)
+        metrics = {}
+        if metrics_path.exists():
+            with open(metrics_path, "rb") as f:
+                metrics = pickle.load(f)
+        version = registry.publish(
+            load_model(args.model or artifacts / MODEL_PATH.name),
+            load_pipeline(args.pipeline or artifacts / PIPELINE_PATH.name),
+            metrics,
+            version=args.version,
+            activate=not args.no_activate,
+        )
+        print(f"✅ Version publiée : {version}")
+    elif args.command == "activate":
+        registry.activate(args.version)
+        print(f"✅ Version active : {args.version}")
+    else:
+        current = registry.current()
+        for version in registry.versions():
+            print(f"{'*' if version == current else ' '} {version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""Recherche d'hyperparamètres parallèle par successive halving.
+
+Toutes les configurations des modèles candidats (RandomForest, XGBoost, SVR,
+KNN) sont évaluées en même temps sur un pool de processus, d'abord sur une
+fraction des lignes ; seul le meilleur tiers passe au palier suivant, avec
+davantage de données, jusqu'au palier final sur le train complet. Les folds
+de validation croisée sont calculés une seule fois et partagés par tous les
+processus, qui lisent les features du store sans copie.
+
+Avec l'encodage "ordinal", chaque catégorique est une seule colonne de codes
+(NaN pour une modalité inconnue) : seul XGBoost est candidat, avec ses splits
+catégoriels natifs. Les autres modèles verraient les codes comme des
+distances numériques et refusent les NaN.
+"""
+import argparse
+import math
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold, ParameterGrid, train_test_split
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.svm import SVR
+from xgboost import XGBRegressor
+
+from src.features.build_features import CATEGORICAL_ENCODINGS, feature_types
+from src.features.store import STORE_DIR, FeatureStore, materialize_features
+from src.models.predict_model import METRICS_PATH, MODEL_PATH, PARAMS_PATH, PIPELINE_PATH, load_column_types
+
+SEED = 42
+
+# Modèles candidats et espaces de recherche (repris du notebook 02)
+CANDIDATES = {
+    "RandomForest": (
+        RandomForestRegressor,
+        {"n_estimators": [100, 200], "max_depth": [5, 10, None], "random_state": [SEED], "n_jobs": [1]},
+    ),
+    "XGBoost": (
+        XGBRegressor,
+        {
+            "n_estimators": [50, 100, 150],
+            "max_depth": [2, 3, 4, 5, 6],
+            "learning_rate": [0.01, 0.1, 0.3],
+            "subsample": [0.6, 0.8, 1.0],
+            "random_state": [SEED],
+            "n_jobs": [1],
+            "verbosity": [0],
+        },
+    ),
+    "SVR": (SVR, {"kernel": ["rbf"], "C": [1, 10, 100], "epsilon": [0.01, 0.1]}),
+    "KNN": (KNeighborsRegressor, {"n_neighbors": [3, 5, 10]}),
+}
+
+# Candidats capables d'utiliser des codes de modalités (encodage "ordinal")
+ORDINAL_CANDIDATES = ("XGBoost",)
+
+# Données et folds partagés par les processus du pool
+_worker = {}
+
+
+def evaluate_model(y_true, y_pred):
+    """Calculer RMSE, MAE et R² (sur la cible en log).
+
+    Returns:
+        dict: {"rmse": ..., "mae": ..., "r": ...}
+    """
+    return {
+        "rmse": float(np.sqrt(mean_squared_error(y_true, y_pred))),
+        "mae": float(mean_absolute_error(y_true, y_pred)),
+        "r": float(r2_score(y_true, y_pred)),
+    }
+
+
+def make_folds(n_rows, n_splits=3, seed=SEED):
+    """Calculer une fois les folds de validation croisée.
+
+    L'ordre des indices d'entraînement de chaque fold est mélangé, de sorte
+    que ses k premiers éléments forment un sous-échantillon aléatoire utilisé
+    par les premiers paliers.
+
+    Returns:
+        list: Tuples (train_idx, val_idx).
+    """
+    rng = np.random.default_rng(seed)
+    return [
+        (rng.permutation(train_idx), val_idx)
+        for train_idx, val_idx in KFold(n_splits, shuffle=True, random_state=seed).split(np.arange(n_rows))
+    ]
+
+
+def candidates(encoding="onehot"):
+    """Modèles candidats compatibles avec l'encodage des catégoriques.
+
+    Returns:
+        dict: Sous-ensemble de CANDIDATES.
+    """
+    if encoding == "ordinal":
+        return {name: CANDIDATES[name] for name in ORDINAL_CANDIDATES}
+    return dict(CANDIDATES)
+
+
+def model_kwargs(name, types):
+    """Paramètres fixes d'un candidat selon les types des colonnes.
+
+    Args:
+        name (str): Nom du candidat (clé de CANDIDATES).
+        types (list): Types XGBoost des colonnes ("q" ou "c").
+
+    Returns:
+        dict: Paramètres ajoutés à ceux de la grille.
+    """
+    if name == "XGBoost" and "c" in types:
+        return {"enable_categorical": True, "feature_types": types}
+    return {}
+
+
+def _init_worker(store_root, train_idx, y, folds, types):
+    X, _ = FeatureStore(store_root).load("X_train")
+    _worker["X"] = X
+    _worker["train_idx"] = train_idx
+    _worker["y"] = y
+    _worker["folds"] = folds
+    _worker["types"] = types
+
+
+def _score_config(task):
+    """Score CV moyen (RMSE) d'une configuration sur une fraction des lignes."""
+    name, params, fraction = task
+    model_class, _ = CANDIDATES[name]
+    X, y, train_idx = _worker["X"], _worker["y"], _worker["train_idx"]
+    scores = []
+    for fold_train, fold_val in _worker["folds"]:
+        subset = fold_train[: max(1, int(len(fold_train) * fraction))]
+        model = model_class(**params, **model_kwargs(name, _worker["types"]))
+        model.fit(np.asarray(X[train_idx[subset]]), y[subset])
+        predictions = model.predict(np.asarray(X[train_idx[fold_val]]))
+        scores.append(np.sqrt(mean_squared_error(y[fold_val], predictions)))
+    return float(np.mean(scores))
+
+
+def successive_halving(configs, executor, eta=3, min_fraction=1 / 9):
+    """Éliminer les mauvaises configurations palier par palier.
+
+    Args:
+        configs (list): Tuples (nom_du_modèle, paramètres).
+        executor (Executor): Pool évaluant les configurations en parallèle.
+        eta (int): Facteur de réduction entre deux paliers.
+        min_fraction (float): Fraction des lignes au premier palier.
+
+    Returns:
+        tuple: (nom, paramètres, rmse_cv) de la meilleure configuration, et
+        l'historique des paliers.
+    """
+    n_rungs = max(1, math.ceil(math.log(1 / min_fraction, eta)) + 1)
+    history = []
+    for rung in range(n_rungs):
+        fraction = min(1.0, min_fraction * eta**rung)
+        if rung == n_rungs - 1:
+            fraction = 1.0
+        tasks = [(name, params, fraction) for name, params in configs]
+        scores = list(executor.map(_score_config, tasks))
+        ranked = sorted(zip(scores, range(len(configs))))
+        history.append({"rung": rung, "fraction": fraction, "n_configs": len(configs), "best_rmse": ranked[0][0]})
+        print(
+            f"Palier {rung} : {len(configs)} configurations sur {fraction:.0%} des lignes, "
+            f"meilleur RMSE {ranked[0][0]:.4f}"
+        )
+        if rung == n_rungs - 1 or len(configs) == 1:
+            best_score, best = ranked[0]
+            return (*configs[best], best_score), history
+        keep = max(1, math.ceil(len(configs) / eta))
+        configs = [configs[i] for _, i in ranked[:keep]]
+
+
+def train(store_root=STORE_DIR, n_jobs=None, eta=3, min_fraction=1 / 9, cv=3, output_dir=None, encoding="onehot"):
+    """Sélectionner, réentraîner et sauvegarder le meilleur modèle.
+
+    Args:
+        store_root (str | Path): Répertoire du feature store.
+        n_jobs (int): Nombre de processus ; tous les coeurs par défaut.
+        eta (int): Facteur de réduction du successive halving.
+        min_fraction (float): Fraction des lignes au premier palier.
+        cv (int): Nombre de folds de validation croisée.
+        output_dir (str | Path): Répertoire des artefacts ; models/ par défaut.
+        encoding (str): Encodage des catégoriques ("onehot" ou "ordinal").
+
+    Returns:
+        dict: Modèle retenu, paramètres et métriques de validation.
+    """
+    store = FeatureStore(store_root)
+    materialize_features(store, encoding=encoding)
+    X, columns = store.load("X_train")
+    y = np.log1p(store.load("y_train")[0][:, 0])
+    types = feature_types(columns, load_column_types()[1])
+
+    train_idx, val_idx = train_test_split(np.arange(len(y)), test_size=0.2, random_state=SEED)
+    folds = make_folds(len(train_idx), cv)
+    configs = [(name, params) for name, (_, grid) in candidates(encoding).items() for params in ParameterGrid(grid)]
+
+    with ProcessPoolExecutor(
+        max_workers=n_jobs,
+        initializer=_init_worker,
+        initargs=(str(store_root), train_idx, y[train_idx], folds, types),
+    ) as executor:
+        (name, params, cv_rmse), history = successive_halving(configs, executor, eta, min_fraction)
+
+    model_class, _ = CANDIDATES[name]
+    model = model_class(**params, **model_kwargs(name, types))
+    model.fit(pd.DataFrame(np.asarray(X[train_idx]), columns=columns), y[train_idx])
+    metrics = evaluate_model(y[val_idx], model.predict(pd.DataFrame(np.asarray(X[val_idx]), columns=columns)))
+    metrics["cv_rmse"] = cv_rmse
+
+    output_dir = Path(output_dir) if output_dir else MODEL_PATH.parent
+    output_dir.mkdir(parents=True, exist_ok=True)
+    joblib.dump(model, output_dir / MODEL_PATH.name)
+    pipeline = Pipeline(store.load_pipeline().steps + [("model", model)])
+    joblib.dump(pipeline, output_dir / PIPELINE_PATH.name)
+    with open(output_dir / METRICS_PATH.name, "wb") as f:
+        pickle.dump(metrics, f)
+    with open(output_dir / PARAMS_PATH.name, "wb") as f:
+        pickle.dump({"model": name, **params, "halving": history}, f)
+    return {"model": name, "params": params, "metrics": metrics}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Recherche d'hyperparamètres parallèle et sauvegarde du meilleur modèle."
+    )
+    parser.add_argument("--store", default=str(STORE_DIR))
+    parser.add_argument("--n-jobs", type=int, default=None)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--min-fraction", type=float, default=1 / 9)
+    parser.add_argument("--cv", type=int, default=3)
+    parser.add_argument("--output-dir", default=None)
+    parser.add_argument("--encoding", choices=CATEGORICAL_ENCODINGS, default="onehot")
+    args = parser.parse_args(argv)
+
+    result = train(args.store, args.n_jobs, args.eta, args.min_fraction, args.cv, args.output_dir, args.encoding)
+    print(f"✅ Meilleur modèle : {result['model']} {result['params']}")
+    for metric, value in result["metrics"].items():
+        print(f"  {metric.upper()}: {value:.4f}")
+
+
+if __name__ == "__main__":
+    main()
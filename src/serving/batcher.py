@@ -0,0 +1,128 @@
+"""Regroupement des petites requêtes concurrentes en un seul appel au modèle.
+
+Les requêtes d'une ou quelques lignes sont déposées dans une file ; un thread
+les accumule pendant au plus max_wait_ms (ou jusqu'à max_batch_size lignes),
+appelle predict une seule fois sur la matrice empilée puis redistribue les
+résultats à chaque appelant.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 2.0
+
+
+class MicroBatcher:
+    """Planificateur de micro-lots devant une fonction de prédiction.
+
+    Le thread de regroupement est démarré à la première soumission dans
+    chaque processus, ce qui le rend compatible avec les serveurs pre-fork.
+
+    Args:
+        predict_fn (callable): Fonction matrice (n, d) -> prédictions (n,).
+        max_batch_size (int): Nombre maximal de lignes par appel.
+        max_wait_ms (float): Attente maximale pour compléter un lot.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        self.n_batches = 0
+        self.n_rows = 0
+
+    def submit(self, X):
+        """Déposer un bloc de lignes et obtenir un Future de ses prédictions.
+
+        Après close (par exemple un appelant qui tenait encore l'ancien
+        modèle pendant un rechargement), le bloc est prédit directement.
+
+        Args:
+            X (array-like): Une ligne (d,) ou un bloc (n, d).
+
+        Returns:
+            Future: Résolu avec un tableau de n prédictions.
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+        future = Future()
+        with self._lock:
+            # Déposé sous le verrou : jamais après la sentinelle de close
+            if not self._closed:
+                self._ensure_started()
+                self._queue.put((X, future))
+                return future
+        try:
+            future.set_result(np.asarray(self.predict_fn(X)))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    def predict(self, X, timeout=None):
+        """Prédire un bloc en passant par le regroupement (appel bloquant)."""
+        return self.submit(X).result(timeout)
+
+    def close(self):
+        """Arrêter le thread de regroupement après les lots en cours."""
+        with self._lock:
+            self._closed = True
+            if self._thread is not None and self._pid == os.getpid():
+                self._queue.put(None)
+                self._thread.join()
+            self._thread = None
+
+    def _ensure_started(self):
+        # Appelé sous self._lock
+        if self._thread is None or self._pid != os.getpid():
+            self._queue = queue.Queue()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._thread.start()
+
+    def _collect(self, first):
+        batch = [first]
+        n_rows = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while n_rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+            n_rows += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            blocks = [X for X, _ in batch]
+            self.n_batches += 1
+            self.n_rows += sum(len(X) for X in blocks)
+            try:
+                predictions = np.asarray(self.predict_fn(np.concatenate(blocks)))
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            start = 0
+            for X, future in batch:
+                future.set_result(predictions[start:start + len(X)])
+                start += len(X)
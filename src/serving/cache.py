@@ -0,0 +1,245 @@
+"""Cache des prédictions indexé par le vecteur de features.
+
+Chaque ligne est canonisée (float32, -0.0 ramené à 0.0, NaN unique) puis
+hachée avec la version du modèle : une même maison re-cotée par le même
+modèle ne repasse pas par predict. Le cache LRU en mémoire peut être doublé
+d'une base SQLite locale partagée par les workers d'une même machine.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_TTL = 3600.0
+DEFAULT_SHARED_MAX_ROWS = 1_000_000
+# Délai minimal entre deux purges de la base partagée, en secondes
+DEFAULT_PURGE_INTERVAL = 60.0
+
+logger = logging.getLogger(__name__)
+
+
+def row_keys(X, model_version):
+    """Calculer la clé de cache de chaque ligne d'une matrice.
+
+    Args:
+        X (array-like): Matrice (n_lignes, n_features).
+        model_version (str): Version du modèle, incluse dans chaque clé.
+
+    Returns:
+        list: Une empreinte hexadécimale par ligne.
+    """
+    X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+    X = np.ascontiguousarray(np.where(np.isnan(X), np.float32(np.nan), X) + np.float32(0))
+    prefix = hashlib.blake2b(str(model_version).encode(), digest_size=16)
+    keys = []
+    for row in X:
+        digest = prefix.copy()
+        digest.update(row.tobytes())
+        keys.append(digest.hexdigest())
+    return keys
+
+
+class SQLiteBackend:
+    """Stockage clé -> prédiction partagé entre processus via un fichier SQLite.
+
+    Une connexion est ouverte par thread et par processus, ce qui le rend
+    utilisable après un fork. Les entrées expirées, puis les plus anciennes
+    au-delà de max_rows, sont purgées au plus une fois par purge_interval.
+
+    Args:
+        path (str | Path): Fichier de la base.
+        ttl (float): Durée de vie des entrées, en secondes.
+        max_rows (int): Nombre maximal d'entrées conservées.
+        purge_interval (float): Délai minimal entre deux purges, en secondes.
+    """
+
+    def __init__(self, path, ttl=DEFAULT_TTL, max_rows=DEFAULT_SHARED_MAX_ROWS, purge_interval=DEFAULT_PURGE_INTERVAL):
+        self.path = str(path)
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.purge_interval = purge_interval
+        self._local = threading.local()
+        self._last_purge = time.monotonic()
+
+    def _connection(self):
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            local.connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            local.connection.execute("PRAGMA journal_mode=WAL")
+            local.connection.execute(
+                "CREATE TABLE IF NOT EXISTS predictions (key TEXT PRIMARY KEY, value REAL, expires REAL)"
+            )
+            local.connection.execute("CREATE INDEX IF NOT EXISTS predictions_expires ON predictions (expires)")
+            local.pid = os.getpid()
+        return local.connection
+
+    def get_many(self, keys):
+        """Lire les entrées encore valides parmi keys.
+
+        Returns:
+            dict: {clé: prédiction} pour les clés trouvées.
+        """
+        if not keys:
+            return {}
+        found = {}
+        connection = self._connection()
+        now = time.time()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = connection.execute(
+                f"SELECT key, value FROM predictions WHERE expires > ? AND key IN ({placeholders})",
+                [now, *chunk],
+            )
+            found.update(rows)
+        return found
+
+    def set_many(self, items):
+        """Écrire des paires (clé, prédiction), en purgeant la base si le délai est écoulé."""
+        now = time.time()
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN")
+            connection.executemany(
+                "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?)",
+                [(key, float(value), now + self.ttl) for key, value in items],
+            )
+        if time.monotonic() - self._last_purge >= self.purge_interval:
+            self.purge()
+
+    def purge(self):
+        """Supprimer les entrées expirées puis les plus anciennes au-delà de max_rows.
+
+        Returns:
+            int: Nombre d'entrées supprimées.
+        """
+        self._last_purge = time.monotonic()
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN")
+            removed = connection.execute("DELETE FROM predictions WHERE expires <= ?", (time.time(),)).rowcount
+            excess = connection.execute("SELECT COUNT(*) FROM predictions").fetchone()[0] - self.max_rows
+            if excess > 0:
+                # Durée de vie constante : les expirations les plus proches sont les écritures les plus anciennes
+                removed += connection.execute(
+                    "DELETE FROM predictions WHERE key IN "
+                    "(SELECT key FROM predictions ORDER BY expires, rowid LIMIT ?)",
+                    (excess,),
+                ).rowcount
+        return removed
+
+
+class PredictionCache:
+    """Cache LRU à durée de vie devant une fonction de prédiction.
+
+    Seules les lignes absentes du cache sont transmises à predict_fn, en un
+    seul appel par lot.
+
+    Args:
+        predict_fn (callable): Fonction matrice (n, d) -> prédictions (n,).
+        model_version (str): Version du modèle servie.
+        max_entries (int): Nombre maximal d'entrées en mémoire.
+        ttl (float): Durée de vie des entrées, en secondes.
+        backend (SQLiteBackend): Second niveau partagé, optionnel.
+    """
+
+    def __init__(self, predict_fn, model_version, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, backend=None):
+        self.predict_fn = predict_fn
+        self.model_version = model_version
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.backend = backend
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.shared_hits + self.misses
+        return (self.hits + self.shared_hits) / total if total else 0.0
+
+    def stats(self):
+        """Compteurs du cache, pour le monitoring."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+    def predict(self, X):
+        """Prédire un lot en ne calculant que les lignes absentes du cache.
+
+        Args:
+            X (np.ndarray): Matrice (n_lignes, n_features).
+
+        Returns:
+            np.ndarray: Prédictions float32, dans l'ordre des lignes.
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+        keys = row_keys(X, self.model_version)
+        predictions = np.empty(len(keys), dtype=np.float32)
+        missing = []
+        now = time.monotonic()
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(key)
+                    predictions[i] = entry[0]
+                    self.hits += 1
+                else:
+                    missing.append(i)
+
+        if missing and self.backend is not None:
+            shared = self._shared(self.backend.get_many, [keys[i] for i in missing]) or {}
+            if shared:
+                self._store((keys[i], shared[keys[i]]) for i in missing if keys[i] in shared)
+                for i in missing:
+                    if keys[i] in shared:
+                        predictions[i] = shared[keys[i]]
+                with self._lock:
+                    self.shared_hits += len(shared)
+                missing = [i for i in missing if keys[i] not in shared]
+
+        if missing:
+            computed = np.asarray(self.predict_fn(X[missing]), dtype=np.float32)
+            predictions[missing] = computed
+            items = [(keys[i], value) for i, value in zip(missing, computed)]
+            self._store(items)
+            if self.backend is not None:
+                self._shared(self.backend.set_many, items)
+            with self._lock:
+                self.misses += len(missing)
+        return predictions
+
+    def _shared(self, operation, argument):
+        # Le niveau partagé est optionnel : une base verrouillée ou illisible
+        # ne doit pas faire échouer la prédiction.
+        try:
+            return operation(argument)
+        except sqlite3.Error:
+            logger.exception("Cache partagé des prédictions indisponible")
+            return None
+
+    def _store(self, items):
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for key, value in items:
+                self._entries[key] = (float(value), expires)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,362 @@
+"""Tâches de scoring en arrière-plan pour les CSV volumineux.
+
+Le serveur web enregistre le fichier reçu et une ligne dans une file SQLite,
+puis répond immédiatement avec l'identifiant de la tâche. Des processus
+workers distincts des workers HTTP (et de priorité plus basse) réclament les
+tâches une à une, scorent le fichier par blocs en publiant leur avancement et
+déposent le résultat dans une session de résultats (voir results.py). Entre
+deux blocs, un worker vérifie si l'annulation de la tâche a été demandée.
+
+Lancement : python -m src.serving.jobs --workers 2 (démarré par gunicorn.conf.py
+avec le serveur ; JOB_WORKERS=0 pour le lancer à part). Le processus
+principal relance les workers qui s'arrêtent, et chaque worker inactif remet
+périodiquement en file les tâches d'un worker disparu.
+"""
+import argparse
+import logging
+import os
+import signal
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_JOBS_DIR = Path(tempfile.gettempdir()) / "house-prices-jobs"
+DEFAULT_CHUNKSIZE = 50_000
+DEFAULT_POLL_INTERVAL = 1.0
+# Délai entre deux recherches de tâches orphelines par un worker inactif
+DEFAULT_RECOVER_INTERVAL = 30.0
+DEFAULT_TTL = 24 * 3600.0
+# Priorité des workers de tâches : le CPU va d'abord aux requêtes interactives
+DEFAULT_NICE = 10
+FINAL_STATUSES = ("done", "failed", "cancelled")
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """L'annulation de la tâche a été demandée pendant son exécution."""
+
+
+def count_rows(path, block_size=1 << 20):
+    """Compter les lignes de données d'un CSV (sans l'en-tête), pour l'avancement."""
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    return max(lines + (last != b"\n") - 1, 0)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobQueue:
+    """File de tâches persistée dans SQLite, partagée par le web et les workers.
+
+    Une connexion est ouverte par thread et par processus, comme pour le
+    cache SQLite des prédictions.
+
+    Args:
+        directory (str | Path): Répertoire de la base et des fichiers reçus.
+        ttl (float): Durée de conservation des tâches terminées, en secondes.
+    """
+
+    def __init__(self, directory=DEFAULT_JOBS_DIR, ttl=DEFAULT_TTL):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self._local = threading.local()
+
+    def _connection(self):
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            self.directory.mkdir(parents=True, exist_ok=True)
+            local.connection = sqlite3.connect(self.directory / "jobs.sqlite", timeout=5, isolation_level=None)
+            local.connection.row_factory = sqlite3.Row
+            local.connection.execute("PRAGMA journal_mode=WAL")
+            local.connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT, input_path TEXT, created REAL, started REAL, finished REAL, "
+                "rows_done INTEGER DEFAULT 0, rows_total INTEGER, cancel_requested INTEGER DEFAULT 0, "
+                "worker_pid INTEGER, model_version TEXT, result_token TEXT, error TEXT)"
+            )
+            local.pid = os.getpid()
+        return local.connection
+
+    def submit(self, save_fn):
+        """Créer une tâche en attente.
+
+        Args:
+            save_fn (callable): Reçoit le chemin où écrire le CSV de la tâche.
+
+        Returns:
+            str: Identifiant de la tâche.
+        """
+        self.purge()
+        job_id = uuid.uuid4().hex
+        path = self.directory / f"{job_id}.csv"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        save_fn(str(path))
+        self._connection().execute(
+            "INSERT INTO jobs (id, status, input_path, created) VALUES (?, 'queued', ?, ?)",
+            (job_id, str(path), time.time()),
+        )
+        return job_id
+
+    def get(self, job_id):
+        """État d'une tâche ; None si inconnue."""
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def claim(self):
+        """Réserver la plus ancienne tâche en attente pour le processus courant.
+
+        Returns:
+            dict: La tâche passée à "running" ; None si la file est vide.
+        """
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                connection.execute(
+                    "UPDATE jobs SET status = 'running', started = ?, worker_pid = ? WHERE id = ?",
+                    (time.time(), os.getpid(), row["id"]),
+                )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return self.get(row["id"]) if row is not None else None
+
+    def progress(self, job_id, rows_done, rows_total=None):
+        """Publier l'avancement d'une tâche en cours.
+
+        Raises:
+            JobCancelled: Si l'annulation de la tâche a été demandée.
+        """
+        connection = self._connection()
+        connection.execute(
+            "UPDATE jobs SET rows_done = ?, rows_total = COALESCE(?, rows_total) WHERE id = ?",
+            (rows_done, rows_total, job_id),
+        )
+        cancelled = connection.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if cancelled is None or cancelled[0]:
+            raise JobCancelled(job_id)
+
+    def finish(self, job_id, status, result_token=None, model_version=None, error=None):
+        """Clore une tâche ("done", "failed" ou "cancelled") et supprimer son fichier."""
+        job = self.get(job_id)
+        self._connection().execute(
+            "UPDATE jobs SET status = ?, finished = ?, result_token = ?, model_version = ?, error = ? WHERE id = ?",
+            (status, time.time(), result_token, model_version, error, job_id),
+        )
+        if job is not None:
+            Path(job["input_path"]).unlink(missing_ok=True)
+
+    def cancel(self, job_id):
+        """Annuler une tâche : immédiatement si elle attend, au prochain bloc si elle tourne.
+
+        Returns:
+            dict: La tâche ; None si inconnue.
+        """
+        connection = self._connection()
+        connection.execute(
+            "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status IN ('queued', 'running')", (job_id,)
+        )
+        cursor = connection.execute(
+            "UPDATE jobs SET status = 'cancelled', finished = ? WHERE id = ? AND status = 'queued'",
+            (time.time(), job_id),
+        )
+        if cursor.rowcount:
+            self.finish(job_id, "cancelled")
+        return self.get(job_id)
+
+    def recover(self):
+        """Remettre en file les tâches d'un worker arrêté en cours de route.
+
+        Returns:
+            int: Nombre de tâches remises en file.
+        """
+        connection = self._connection()
+        running = connection.execute("SELECT id, worker_pid FROM jobs WHERE status = 'running'").fetchall()
+        lost = [row["id"] for row in running if row["worker_pid"] is None or not _alive(row["worker_pid"])]
+        for job_id in lost:
+            connection.execute(
+                "UPDATE jobs SET status = 'queued', rows_done = 0, worker_pid = NULL "
+                "WHERE id = ? AND status = 'running'",
+                (job_id,),
+            )
+        return len(lost)
+
+    def purge(self):
+        """Supprimer les tâches terminées depuis plus de ttl secondes."""
+        self._connection().execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed', 'cancelled') AND finished < ?",
+            (time.time() - self.ttl,),
+        )
+
+
+class JobWorker:
+    """Exécute les tâches de la file, une à la fois.
+
+    Args:
+        queue (JobQueue): File des tâches.
+        load_scorer (callable): Appelé au début de chaque tâche ; renvoie
+            (version, score_frame, store) pour le modèle servi à cet instant.
+            score_frame(df) renvoie (prédictions avec NaN pour les lignes
+            rejetées, première ligne d'entrée, erreurs) ou None si le fichier
+            n'est pas scorable ; store(prédictions, ids, première ligne,
+            erreurs, version) renvoie le jeton de la session de résultats.
+        chunksize (int): Lignes lues et scorées par bloc.
+        poll_interval (float): Attente quand la file est vide, en secondes.
+        recover_interval (float): Délai entre deux appels à queue.recover
+            quand la file est vide, en secondes.
+    """
+
+    def __init__(
+        self,
+        queue,
+        load_scorer,
+        chunksize=DEFAULT_CHUNKSIZE,
+        poll_interval=DEFAULT_POLL_INTERVAL,
+        recover_interval=DEFAULT_RECOVER_INTERVAL,
+    ):
+        self.queue = queue
+        self.load_scorer = load_scorer
+        self.chunksize = chunksize
+        self.poll_interval = poll_interval
+        self.recover_interval = recover_interval
+
+    def score(self, job, version, score_frame, store):
+        """Scorer le fichier d'une tâche bloc par bloc et enregistrer le résultat."""
+        import pandas as pd
+
+        from src.models.predict_model import ID_COLUMN
+
+        rows_total = count_rows(job["input_path"])
+        self.queue.progress(job["id"], 0, rows_total)
+        predictions, ids, errors = [], [], []
+        first_input = None
+        done = 0
+        for chunk in pd.read_csv(job["input_path"], chunksize=self.chunksize):
+            scored = score_frame(chunk)
+            if scored is None:
+                raise ValueError("Le fichier n'a ni les colonnes du modèle ni les colonnes brutes attendues.")
+            chunk_predictions, chunk_first, chunk_errors = scored
+            predictions.append(chunk_predictions)
+            ids.append(
+                chunk[ID_COLUMN].to_numpy()
+                if ID_COLUMN in chunk.columns
+                else np.arange(done + 1, done + len(chunk) + 1)
+            )
+            errors += [{**error, "row": error["row"] + done} for error in chunk_errors]
+            first_input = first_input if first_input is not None else chunk_first
+            done += len(chunk)
+            self.queue.progress(job["id"], done)
+        predictions = np.concatenate(predictions) if predictions else np.empty(0)
+        ids = np.concatenate(ids) if ids else np.empty(0, dtype=np.int64)
+        return store(predictions, ids, first_input, errors, version)
+
+    def run_once(self):
+        """Exécuter la prochaine tâche en attente.
+
+        Returns:
+            bool: True si une tâche a été traitée.
+        """
+        job = self.queue.claim()
+        if job is None:
+            return False
+        version, score_frame, store = self.load_scorer()
+        try:
+            token = self.score(job, version, score_frame, store)
+        except JobCancelled:
+            self.queue.finish(job["id"], "cancelled", model_version=version)
+        except Exception as exc:
+            logger.exception("Échec de la tâche %s", job["id"])
+            self.queue.finish(job["id"], "failed", model_version=version, error=str(exc))
+        else:
+            self.queue.finish(job["id"], "done", token, version)
+        return True
+
+    def run(self, stop=None):
+        """Traiter les tâches jusqu'à ce que stop soit positionné."""
+        stop = stop or threading.Event()
+        self.queue.recover()
+        last_recover = time.monotonic()
+        while not stop.is_set():
+            if self.run_once():
+                continue
+            if time.monotonic() - last_recover >= self.recover_interval:
+                if recovered := self.queue.recover():
+                    logger.warning("%d tâche(s) d'un worker arrêté remise(s) en file", recovered)
+                last_recover = time.monotonic()
+                continue
+            stop.wait(self.poll_interval)
+
+
+def _worker_process(directory, chunksize, nice):
+    os.nice(nice)
+    # Modèle, schéma et répertoire des résultats : ceux du serving
+    import app
+
+    if app.watcher is not None:
+        app.watcher.ensure_started()
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    JobWorker(JobQueue(directory), app.job_scorer, chunksize).run(stop)
+
+
+def _start_worker(args, index):
+    import multiprocessing
+
+    process = multiprocessing.Process(
+        target=_worker_process, args=(args.jobs_dir, args.chunksize, args.nice), name=f"job-worker-{index}"
+    )
+    process.start()
+    return process
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Workers des tâches de scoring en arrière-plan.")
+    parser.add_argument("--workers", type=int, default=1, help="Nombre de processus workers.")
+    parser.add_argument("--jobs-dir", default=os.environ.get("JOBS_DIR", str(DEFAULT_JOBS_DIR)))
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--nice", type=int, default=DEFAULT_NICE, help="Incrément de priorité (0 = aucun).")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    processes = [_start_worker(args, i) for i in range(args.workers)]
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    # Un worker arrêté (plantage, OOM) est remplacé ; sa tâche en cours est
+    # remise en file par queue.recover dans les workers restants.
+    while not stop.wait(DEFAULT_POLL_INTERVAL):
+        for i, process in enumerate(processes):
+            if not process.is_alive():
+                logger.warning("Worker %s arrêté (code %s), relancé", process.name, process.exitcode)
+                processes[i] = _start_worker(args, i)
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
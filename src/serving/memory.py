@@ -0,0 +1,78 @@
+"""Mémoire réellement consommée par chaque worker du serving.
+
+La RSS compte les pages partagées (modèle projeté en mémoire, pages héritées
+du maître en copy-on-write) dans chaque processus ; la mémoire unique (USS :
+pages privées) est ce que coûte réellement un worker supplémentaire. Les
+valeurs sont lues dans /proc/<pid>/smaps_rollup (Linux).
+
+Lancement : python -m src.serving.memory <pid du maître gunicorn>
+"""
+import argparse
+from pathlib import Path
+
+
+def memory_usage(pid="self"):
+    """Lire la mémoire d'un processus.
+
+    Args:
+        pid (int | str): Processus ("self" pour le processus courant).
+
+    Returns:
+        dict: rss_kb, pss_kb, uss_kb (pages privées) et shared_kb.
+
+    Raises:
+        OSError: Si /proc/<pid>/smaps_rollup n'est pas lisible.
+    """
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            parts = value.split()
+            if len(parts) == 2 and parts[1] == "kB":
+                fields[key] = int(parts[0])
+    return {
+        "rss_kb": fields.get("Rss", 0),
+        "pss_kb": fields.get("Pss", 0),
+        "uss_kb": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared_kb": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    }
+
+
+def child_pids(pid):
+    """Lister les processus enfants directs (les workers d'un maître gunicorn)."""
+    children = []
+    for task in Path(f"/proc/{pid}/task").iterdir():
+        children += [int(child) for child in (task / "children").read_text().split()]
+    return sorted(children)
+
+
+def worker_report(master_pid):
+    """Mémoire du maître et de chacun de ses workers.
+
+    Returns:
+        list: Tuples (rôle, pid, memory_usage).
+    """
+    report = [("master", master_pid, memory_usage(master_pid))]
+    report += [("worker", pid, memory_usage(pid)) for pid in child_pids(master_pid)]
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mémoire unique (USS) par worker du serving.")
+    parser.add_argument("pid", type=int, help="PID du processus maître.")
+    args = parser.parse_args(argv)
+
+    report = worker_report(args.pid)
+    print(f"{'rôle':<8}{'pid':>8}{'RSS (Mo)':>11}{'PSS (Mo)':>11}{'USS (Mo)':>11}")
+    for role, pid, usage in report:
+        print(
+            f"{role:<8}{pid:>8}{usage['rss_kb'] / 1024:>11.1f}"
+            f"{usage['pss_kb'] / 1024:>11.1f}{usage['uss_kb'] / 1024:>11.1f}"
+        )
+    workers = [usage for role, _, usage in report if role == "worker"]
+    if workers:
+        print(f"USS moyenne par worker : {sum(w['uss_kb'] for w in workers) / len(workers) / 1024:.1f} Mo")
+
+
+if __name__ == "__main__":
+    main()
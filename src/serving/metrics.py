@@ -0,0 +1,257 @@
+"""Compteurs et histogrammes du serving, exposés au format texte Prometheus.
+
+Chaque processus accumule ses mesures en mémoire (un verrou, quelques
+additions par requête). Avec gunicorn, chaque worker a les siennes : si un
+répertoire partagé est configuré, chaque processus y écrit périodiquement un
+instantané de ses valeurs et /metrics additionne ceux de tous les workers,
+y compris ceux qui ont été redémarrés, pour que les compteurs restent
+croissants quel que soit le worker interrogé.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BATCH_ROWS_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1_000, 5_000, 10_000, 100_000, 1_000_000)
+DEFAULT_FLUSH_INTERVAL = 1.0
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+logger = logging.getLogger(__name__)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def format_metric(name, documentation, kind, samples):
+    """Formater une métrique et ses échantillons au format texte.
+
+    Args:
+        name (str): Nom de la métrique.
+        documentation (str): Ligne HELP.
+        kind (str): "counter", "gauge" ou "histogram".
+        samples (list): Tuples (suffixe, labels, valeur) ; labels est une
+            liste de paires (nom, valeur).
+
+    Returns:
+        str: Bloc HELP/TYPE suivi des échantillons.
+    """
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    lines += [f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}" for suffix, labels, value in samples]
+    return "\n".join(lines) + "\n"
+
+
+class Counter:
+    """Compteur croissant, une valeur par combinaison de labels."""
+
+    kind = "counter"
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def _key(self, labels):
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        self.registry.maybe_flush()
+
+    def snapshot(self):
+        return [[list(map(list, key)), value] for key, value in self.values.items()]
+
+    @staticmethod
+    def merge(values, other):
+        for key, value in other:
+            key = tuple(map(tuple, key))
+            values[key] = values.get(key, 0) + value
+
+    def samples(self, values):
+        return [("", key, value) for key, value in sorted(values.items())]
+
+
+class Histogram(Counter):
+    """Histogramme à seuils fixes : compte par seuil, somme et nombre d'observations."""
+
+    kind = "histogram"
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        with self.registry.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+        self.registry.maybe_flush()
+
+    @contextmanager
+    def time(self, **labels):
+        """Observer la durée (en secondes) du bloc with."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        return [[list(map(list, key)), [list(state[0]), state[1], state[2]]] for key, state in self.values.items()]
+
+    @staticmethod
+    def merge(values, other):
+        for key, (counts, total, count) in other:
+            key = tuple(map(tuple, key))
+            state = values.setdefault(key, [[0] * len(counts), 0.0, 0])
+            state[0] = [a + b for a, b in zip(state[0], counts)]
+            state[1] += total
+            state[2] += count
+
+    def samples(self, values):
+        samples = []
+        for key, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                samples.append(("_bucket", key + (("le", _format_value(float(bound))),), cumulative))
+            samples += [("_sum", key, total), ("_count", key, count)]
+        return samples
+
+
+class MetricsRegistry:
+    """Ensemble des métriques d'une application.
+
+    Args:
+        directory (str | Path): Répertoire partagé des instantanés des
+            workers ; None pour des métriques propres au processus.
+        flush_interval (float): Délai minimal entre deux instantanés.
+    """
+
+    def __init__(self, directory=None, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.directory = Path(directory) if directory else None
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self._flush_lock = threading.Lock()
+        self._last_flush = 0.0
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Métrique déjà déclarée : {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def snapshot(self):
+        """Valeurs de toutes les métriques, sérialisables en JSON."""
+        with self.lock:
+            return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def maybe_flush(self):
+        """Écrire l'instantané du processus si le dernier date de plus de flush_interval.
+
+        Appelé à chaque mesure : un thread qui trouve une écriture en cours
+        passe son tour, et une erreur d'écriture est journalisée sans faire
+        échouer la requête mesurée.
+        """
+        if self.directory is None or time.monotonic() - self._last_flush < self.flush_interval:
+            return
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._write_snapshot()
+        except OSError:
+            logger.exception("Écriture de l'instantané des métriques impossible")
+        finally:
+            self._flush_lock.release()
+
+    def flush(self):
+        """Écrire l'instantané du processus (renommage atomique)."""
+        with self._flush_lock:
+            self._write_snapshot()
+
+    def _write_snapshot(self):
+        self._last_flush = time.monotonic()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{os.getpid()}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, self.directory / f"{os.getpid()}.json")
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def collect(self):
+        """Valeurs additionnées de tous les processus (ou du seul processus courant)."""
+        if self.directory is None:
+            snapshots = [self.snapshot()]
+        else:
+            try:
+                self.flush()
+            except OSError:
+                logger.exception("Écriture de l'instantané des métriques impossible")
+            snapshots = []
+            for path in self.directory.glob("*.json"):
+                try:
+                    snapshots.append(json.loads(path.read_text()))
+                except (OSError, ValueError):
+                    continue
+        merged = {name: {} for name in self.metrics}
+        for snapshot in snapshots:
+            for name, values in snapshot.items():
+                if name in self.metrics:
+                    self.metrics[name].merge(merged[name], values)
+        return merged
+
+    def render(self, extra=()):
+        """Exposer toutes les métriques au format texte Prometheus.
+
+        Args:
+            extra (list): Métriques calculées à la demande (jauges du
+                processus), tuples (nom, aide, type, échantillons) au format
+                de format_metric.
+
+        Returns:
+            str: Corps de la réponse /metrics.
+        """
+        merged = self.collect()
+        blocks = [
+            format_metric(name, metric.documentation, metric.kind, metric.samples(merged[name]))
+            for name, metric in self.metrics.items()
+        ]
+        blocks += [format_metric(*metric) for metric in extra]
+        return "".join(blocks)
@@ -0,0 +1,85 @@
+"""Profileur par échantillonnage des threads du serving.
+
+Un thread relève périodiquement la pile de chaque autre thread du processus
+(sys._current_frames) et compte les piles identiques. Le coût ne dépend que
+de la fréquence d'échantillonnage, pas du nombre de requêtes : il peut rester
+actif en production. Le résultat est au format « folded » (une pile par
+ligne, cadres séparés par des points-virgules, suivie de son nombre
+d'échantillons), lu par flamegraph.pl ou speedscope.
+"""
+import os
+import sys
+import threading
+from collections import Counter
+
+DEFAULT_INTERVAL = 0.01
+MAX_DEPTH = 64
+
+
+def _folded(frame):
+    names = []
+    while frame is not None and len(names) < MAX_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """Échantillonneur de piles démarré dans chaque worker après le fork.
+
+    Args:
+        interval (float): Délai entre deux échantillons, en secondes.
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def ensure_started(self):
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._stop.clear()
+                self._pid = os.getpid()
+                self.stacks.clear()
+                self.samples = 0
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def sample(self):
+        """Relever une fois la pile de chaque thread, sauf celui du profileur."""
+        current = threading.get_ident()
+        stacks = [_folded(frame) for ident, frame in sys._current_frames().items() if ident != current]
+        with self._lock:
+            self.stacks.update(stacks)
+            self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def folded(self, reset=False):
+        """Piles échantillonnées au format folded, les plus fréquentes d'abord.
+
+        Args:
+            reset (bool): Repartir de zéro après la lecture.
+
+        Returns:
+            str: Une ligne « cadre;cadre;... n » par pile distincte.
+        """
+        with self._lock:
+            lines = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+            if reset:
+                self.stacks.clear()
+                self.samples = 0
+        return "\n".join(lines) + "\n" if lines else ""
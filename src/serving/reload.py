@@ -0,0 +1,257 @@
+"""Rechargement à chaud des modèles publiés dans le registre.
+
+Un thread surveille le pointeur CURRENT du registre ; quand il change, la
+nouvelle version est chargée et préchauffée hors du chemin des requêtes,
+puis transmise à on_change qui la substitue d'une seule affectation.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 5.0
+DEFAULT_SHADOW_PENDING = 16
+
+
+class ServedModel:
+    """Modèle en service et objets qui en dépendent, remplacés d'un seul bloc.
+
+    Une requête lit une fois la référence vers l'objet servi puis n'utilise
+    que lui : un rechargement concurrent ne peut pas lui faire mélanger le
+    modèle d'une version et le pipeline d'une autre.
+
+    Args:
+        version (str): Identifiant de la version servie.
+        model (object): Modèle exposant predict, ou None.
+        pipeline (Pipeline): Pipeline lignes brutes -> prédictions, ou None.
+        batcher (MicroBatcher): Regroupement des petits lots, optionnel.
+        cache (PredictionCache): Cache des prédictions, optionnel.
+        pipeline_path (str | Path): Pipeline chargé à la première utilisation
+            quand pipeline n'est pas fourni (démarrage rapide).
+        schema (FeatureSchema): Schéma de validation des requêtes.
+    """
+
+    def __init__(self, version, model, pipeline=None, batcher=None, cache=None, pipeline_path=None, schema=None):
+        self.version = version
+        self.model = model
+        self.batcher = batcher
+        self.cache = cache
+        self.schema = schema
+        self.pipeline_path = pipeline_path
+        self._pipeline = pipeline
+        self._lock = threading.Lock()
+
+    @property
+    def pipeline(self):
+        """Pipeline d'inférence, chargé (avec sklearn) au premier accès si besoin."""
+        if self._pipeline is None and self.pipeline_path is not None:
+            with self._lock:
+                if self._pipeline is None and self.pipeline_path is not None:
+                    from src.models.pipeline import load_pipeline
+
+                    self._pipeline = load_pipeline(self.pipeline_path)
+                    self.pipeline_path = None
+        return self._pipeline
+
+    @property
+    def has_pipeline(self):
+        """Indiquer si un pipeline est disponible, sans déclencher son chargement."""
+        if self._pipeline is not None:
+            return True
+        return self.pipeline_path is not None and os.path.exists(self.pipeline_path)
+
+    def score(self, X):
+        """Prédire une matrice de features, via le micro-batcher pour les petits lots."""
+        if self.batcher is not None and len(X) < self.batcher.max_batch_size:
+            return self.batcher.predict(X)
+        return self.model.predict(X)
+
+    def predict(self, X):
+        """Prédire une matrice de features en passant par le cache s'il existe."""
+        if self.cache is not None:
+            return self.cache.predict(X)
+        return self.score(X)
+
+    def warm_up(self, n_features, pipeline=True):
+        """Exécuter une prédiction à blanc pour que la première requête ne paie pas l'initialisation.
+
+        Args:
+            n_features (int): Nombre de colonnes attendues par le modèle.
+            pipeline (bool): Charger aussi le pipeline d'inférence maintenant.
+
+        Returns:
+            bool: True si le modèle est chargé et répond.
+        """
+        if pipeline:
+            self.pipeline
+        if self.model is None:
+            return False
+        self.model.predict(np.zeros((1, n_features), dtype=np.float32))
+        return True
+
+    def close(self):
+        if self.batcher is not None:
+            self.batcher.close()
+
+
+class ShadowScorer:
+    """Évaluation d'une seconde version sur le trafic réel, hors du chemin des requêtes.
+
+    Les lots sont rejoués sur le modèle fantôme dans un thread dédié ; les
+    écarts avec les prédictions servies sont agrégés pour comparaison. Au-delà
+    de max_pending lots en attente, les nouveaux lots sont ignorés.
+
+    Le fantôme reçoit la matrice construite avec le schéma de la version
+    servie : si ses colonnes diffèrent, les comparaisons sont suspendues
+    jusqu'à ce qu'une version servie compatible soit mise en service.
+
+    Args:
+        served (ServedModel): Version évaluée en fantôme.
+        max_pending (int): Nombre maximal de lots en attente.
+        schema (FeatureSchema): Schéma de la version servie, optionnel.
+    """
+
+    def __init__(self, served, max_pending=DEFAULT_SHADOW_PENDING, schema=None):
+        self.served = served
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.compatible = True
+        self.n_rows = 0
+        self.n_dropped = 0
+        self.n_failed = 0
+        self.sum_abs_diff = 0.0
+        self.max_abs_diff = 0.0
+        if schema is not None:
+            self.check(schema)
+
+    def check(self, schema):
+        """Vérifier que le fantôme attend les colonnes du schéma servi.
+
+        Args:
+            schema (FeatureSchema): Schéma de la version servie.
+
+        Returns:
+            bool: True si les lots servis peuvent être rejoués sur le fantôme.
+        """
+        expected = self.served.schema
+        self.compatible = expected is None or schema is None or expected.feature_names == schema.feature_names
+        if not self.compatible:
+            logger.warning(
+                "Version fantôme %s ignorée : ses colonnes diffèrent de celles de la version servie",
+                self.served.version,
+            )
+        return self.compatible
+
+    def submit(self, X, predictions):
+        """Planifier la comparaison d'un lot déjà servi."""
+        if not self.compatible:
+            return
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.n_dropped += len(X)
+                return
+            self._pending += 1
+        self._executor.submit(self._compare, X, np.asarray(predictions))
+
+    def _compare(self, X, predictions):
+        try:
+            diff = np.abs(np.asarray(self.served.model.predict(X)) - predictions)
+        except Exception:
+            logger.exception("Échec de la prédiction fantôme (%s)", self.served.version)
+            diff = None
+        with self._lock:
+            self._pending -= 1
+            if diff is None:
+                self.n_failed += 1
+            if diff is not None and len(diff):
+                self.n_rows += len(diff)
+                self.sum_abs_diff += float(diff.sum())
+                self.max_abs_diff = max(self.max_abs_diff, float(diff.max()))
+
+    def stats(self):
+        """Écarts agrégés entre la version servie et la version fantôme."""
+        return {
+            "version": self.served.version,
+            "rows": self.n_rows,
+            "dropped": self.n_dropped,
+            "failed": self.n_failed,
+            "compatible": self.compatible,
+            "mean_abs_diff": self.sum_abs_diff / self.n_rows if self.n_rows else None,
+            "max_abs_diff": self.max_abs_diff,
+        }
+
+
+class RegistryWatcher:
+    """Surveillance périodique de la version active d'un registre.
+
+    Comme le micro-batcher, le thread est (re)démarré dans chaque processus
+    par ensure_started, ce qui le rend compatible avec les serveurs pre-fork.
+
+    Args:
+        registry (ModelRegistry): Registre surveillé.
+        load_fn (callable): version -> objet servi (chargé et préchauffé).
+        on_change (callable): Reçoit l'objet servi de la nouvelle version.
+        version (str): Version déjà servie au démarrage.
+        interval (float): Intervalle entre deux vérifications, en secondes.
+    """
+
+    def __init__(self, registry, load_fn, on_change, version=None, interval=DEFAULT_INTERVAL):
+        self.registry = registry
+        self.load_fn = load_fn
+        self.on_change = on_change
+        self.version = version
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def ensure_started(self):
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._stop.clear()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="registry-watcher", daemon=True)
+                self._thread.start()
+
+    def check(self):
+        """Charger et substituer la version active si elle a changé.
+
+        Returns:
+            bool: True si une nouvelle version a été mise en service.
+        """
+        version = self.registry.current()
+        if version is None or version == self.version:
+            return False
+        try:
+            served = self.load_fn(version)
+        except Exception:
+            # Version défectueuse : on continue de servir l'ancienne
+            logger.exception("Échec du chargement de la version %s", version)
+            self.version = version
+            return False
+        self.on_change(served)
+        self.version = version
+        logger.info("Version %s en service", version)
+        return True
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        # Vérification immédiate : un worker forké longtemps après le
+        # chargement initial peut déjà être en retard d'une version.
+        while True:
+            self.check()
+            if self._stop.wait(self.interval):
+                return
@@ -0,0 +1,199 @@
+"""Résultats des CSV importés dans l'interface, conservés côté serveur.
+
+Un import volumineux n'est plus rendu en entier dans la page : ses
+prédictions sont écrites une fois dans un répertoire de session (tableaux
+NumPy lus en projection mémoire) avec un résumé statistique calculé à la
+création. La page n'affiche que le résumé et une page de prédictions ; le
+reste se consulte page par page ou se télécharge en CSV compressé. Le coût
+d'une réponse dépend ainsi de la taille de la page et non de celle de l'import.
+
+Le répertoire peut être partagé par les workers : une session créée par
+l'un est lisible par tous.
+"""
+import gzip
+import json
+import math
+import os
+import re
+import secrets
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_RESULTS_DIR = Path(tempfile.gettempdir()) / "house-prices-results"
+DEFAULT_TTL = 3600.0
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Erreurs conservées par session (le nombre total de lignes rejetées est dans le résumé)
+MAX_STORED_ERRORS = 1000
+CSV_NAME = "predictions.csv.gz"
+CSV_CHUNK_ROWS = 100_000
+_TOKEN = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+
+def summarize(predictions):
+    """Statistiques des prédictions d'un import, lignes rejetées (NaN) exclues.
+
+    Args:
+        predictions (np.ndarray): Une prédiction par ligne, NaN si rejetée.
+
+    Returns:
+        dict: rows, scored, rejected, puis mean, std, min, p25, median, p75
+        et max des lignes scorées (None si aucune).
+    """
+    scored = predictions[~np.isnan(predictions)]
+    summary = {
+        "rows": int(len(predictions)),
+        "scored": int(len(scored)),
+        "rejected": int(len(predictions) - len(scored)),
+    }
+    if len(scored):
+        quartiles = np.percentile(scored, [25, 50, 75])
+        values = [scored.mean(), scored.std(), scored.min(), *quartiles, scored.max()]
+    else:
+        values = [None] * 7
+    keys = ("mean", "std", "min", "p25", "median", "p75", "max")
+    summary.update({key: None if value is None else float(value) for key, value in zip(keys, values)})
+    return summary
+
+
+class ResultSession:
+    """Résultats d'un import, lus à la demande depuis son répertoire.
+
+    Args:
+        token (str): Identifiant de la session.
+        path (Path): Répertoire de la session.
+        meta (dict): Résumé, première ligne d'entrée, erreurs et version du modèle.
+    """
+
+    def __init__(self, token, path, meta):
+        self.token = token
+        self.path = path
+        self.meta = meta
+
+    @property
+    def summary(self):
+        return self.meta["summary"]
+
+    @property
+    def n_rows(self):
+        return self.meta["summary"]["rows"]
+
+    def pages(self, page_size=DEFAULT_PAGE_SIZE):
+        return max(1, math.ceil(self.n_rows / page_size))
+
+    def page(self, number, page_size=DEFAULT_PAGE_SIZE):
+        """Lire une page de résultats.
+
+        Args:
+            number (int): Numéro de page, à partir de 1.
+            page_size (int): Lignes par page.
+
+        Returns:
+            tuple: (ids, predictions) de la page, None pour une ligne rejetée.
+
+        Raises:
+            ValueError: Si la page est hors limites.
+        """
+        if number < 1 or number > self.pages(page_size):
+            raise ValueError(f"Page hors limites : {number} (1 à {self.pages(page_size)}).")
+        start = (number - 1) * page_size
+        ids = np.load(self.path / "ids.npy", mmap_mode="r")[start:start + page_size]
+        predictions = np.load(self.path / "predictions.npy", mmap_mode="r")[start:start + page_size]
+        return ids.tolist(), [None if math.isnan(value) else value for value in predictions.tolist()]
+
+    def csv_path(self):
+        """Fichier CSV compressé de toutes les prédictions, écrit au premier appel."""
+        from src.models.predict_model import format_predictions
+
+        path = self.path / CSV_NAME
+        if not path.exists():
+            ids = np.load(self.path / "ids.npy", mmap_mode="r")
+            predictions = np.load(self.path / "predictions.npy", mmap_mode="r")
+            fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", compresslevel=6) as f:
+                for start in range(0, max(len(ids), 1), CSV_CHUNK_ROWS):
+                    stop = start + CSV_CHUNK_ROWS
+                    f.write(format_predictions(ids[start:stop], predictions[start:stop], header=start == 0))
+            os.replace(tmp_path, path)
+        return path
+
+
+class ResultStore:
+    """Sessions de résultats sur disque, expirées après ttl secondes.
+
+    Args:
+        directory (str | Path): Répertoire des sessions.
+        ttl (float): Durée de vie d'une session, en secondes.
+    """
+
+    def __init__(self, directory=DEFAULT_RESULTS_DIR, ttl=DEFAULT_TTL):
+        self.directory = Path(directory)
+        self.ttl = ttl
+
+    def create(self, predictions, ids=None, first_input=None, errors=(), model_version=None):
+        """Enregistrer les résultats d'un import.
+
+        Args:
+            predictions (array-like): Une prédiction par ligne, None ou NaN
+                si la ligne a été rejetée.
+            ids (array-like): Identifiants des lignes ; None pour 1..n.
+            first_input (list): Première ligne de features, affichée dans la page.
+            errors (list): Erreurs des lignes rejetées.
+            model_version (str): Version du modèle ayant scoré l'import.
+
+        Returns:
+            ResultSession: Session créée.
+        """
+        self.purge()
+        predictions = np.array(predictions, dtype=np.float64)
+        try:
+            ids = np.arange(1, len(predictions) + 1) if ids is None else np.asarray(ids, dtype=np.int64)
+        except (TypeError, ValueError):
+            ids = np.arange(1, len(predictions) + 1)
+        token = secrets.token_urlsafe(16)
+        path = self.directory / token
+        meta = {
+            "created": time.time(),
+            "model_version": model_version,
+            "summary": summarize(predictions),
+            "first_input": first_input,
+            "errors": list(errors)[:MAX_STORED_ERRORS],
+        }
+        # Écrit à côté puis renommé : une session visible est toujours complète
+        tmp_path = self.directory / f".{token}.tmp"
+        tmp_path.mkdir(parents=True)
+        np.save(tmp_path / "predictions.npy", predictions)
+        np.save(tmp_path / "ids.npy", ids)
+        (tmp_path / "meta.json").write_text(json.dumps(meta))
+        os.replace(tmp_path, path)
+        return ResultSession(token, path, meta)
+
+    def get(self, token):
+        """Retrouver une session ; None si inconnue ou expirée."""
+        if not isinstance(token, str) or not _TOKEN.match(token):
+            return None
+        path = self.directory / token
+        try:
+            meta = json.loads((path / "meta.json").read_text())
+        except (OSError, ValueError):
+            return None
+        if time.time() - meta["created"] > self.ttl:
+            return None
+        return ResultSession(token, path, meta)
+
+    def purge(self):
+        """Supprimer les sessions expirées (et les écritures interrompues)."""
+        if not self.directory.exists():
+            return
+        limit = time.time() - self.ttl
+        for path in self.directory.iterdir():
+            try:
+                expired = path.stat().st_mtime < limit
+            except OSError:
+                continue
+            if expired:
+                shutil.rmtree(path, ignore_errors=True)
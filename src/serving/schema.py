@@ -0,0 +1,281 @@
+"""Schéma des features du modèle et décodage validé des requêtes.
+
+Le schéma est construit à partir de column_types.json et de la liste
+ordonnée des colonnes du modèle : num__<col> pour les numériques
+standardisées, cat__<col>_<valeur> pour l'encodage one-hot, cat__<col> pour
+un code de modalité (encodage "ordinal"). Les requêtes
+sont décodées directement dans une matrice float32 préallouée ; chaque
+cellule invalide (type, valeur manquante, hors plage) est signalée avec sa
+ligne et sa colonne, et seule la ligne concernée est écartée du lot.
+"""
+import json
+
+import numpy as np
+
+# Élargissement des plages numériques, en multiples de leur largeur : les
+# features calculées hors du pipeline d'inférence peuvent déborder des bornes
+# IQR du train sans être aberrantes.
+DEFAULT_RANGE_TOLERANCE = 2.0
+
+
+class BatchErrors(list):
+    """Erreurs de décodage d'un lot : dictionnaires {"row", "column", "error"}."""
+
+    def add(self, row, column, message):
+        self.append({"row": int(row), "column": column, "error": message})
+
+    def rows(self):
+        return sorted({error["row"] for error in self})
+
+
+class DecodedBatch:
+    """Résultat du décodage d'un lot.
+
+    Args:
+        X (np.ndarray): Matrice float32 des seules lignes valides.
+        rows (np.ndarray): Position, dans la requête, de chaque ligne de X.
+        n_rows (int): Nombre de lignes de la requête.
+        errors (BatchErrors): Erreurs des lignes écartées.
+    """
+
+    def __init__(self, X, rows, n_rows, errors):
+        self.X = X
+        self.rows = rows
+        self.n_rows = n_rows
+        self.errors = errors
+
+    def scatter(self, predictions):
+        """Replacer les prédictions des lignes valides dans l'ordre de la requête.
+
+        Returns:
+            list: Une prédiction par ligne de la requête, None si écartée.
+        """
+        output = [None] * self.n_rows
+        for row, value in zip(self.rows.tolist(), np.asarray(predictions).tolist()):
+            output[row] = value
+        return output
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class FeatureSchema:
+    """Colonnes attendues par le modèle, avec leurs plages de valeurs.
+
+    Args:
+        feature_names (list): Colonnes du modèle, dans l'ordre.
+        lower (np.ndarray): Borne basse de chaque colonne (-inf si aucune).
+        upper (np.ndarray): Borne haute de chaque colonne (+inf si aucune).
+        groups (list): Indices des colonnes one-hot de chaque catégorique.
+        integer (np.ndarray): Colonnes n'acceptant que des entiers (codes).
+    """
+
+    def __init__(self, feature_names, lower=None, upper=None, groups=(), integer=None):
+        self.feature_names = list(feature_names)
+        n_features = len(self.feature_names)
+        self.lower = np.full(n_features, -np.inf) if lower is None else np.asarray(lower, dtype=float)
+        self.upper = np.full(n_features, np.inf) if upper is None else np.asarray(upper, dtype=float)
+        self.groups = [np.asarray(group) for group in groups]
+        self.integer = np.zeros(n_features, dtype=bool) if integer is None else np.asarray(integer, dtype=bool)
+
+    @classmethod
+    def from_column_types(cls, feature_names, column_types_path, preprocessor=None, tolerance=DEFAULT_RANGE_TOLERANCE):
+        """Construire le schéma et vérifier sa cohérence avec column_types.json.
+
+        Args:
+            feature_names (list): Colonnes du modèle, dans l'ordre.
+            column_types_path (str | Path): Chemin de column_types.json.
+            preprocessor (CompiledPreprocessor): Source des bornes des
+                numériques (bornes IQR standardisées) et du nombre de
+                modalités des codes ; sans lui, seule la finitude est vérifiée.
+            tolerance (float): Élargissement des plages numériques.
+
+        Returns:
+            FeatureSchema: Schéma du modèle.
+
+        Raises:
+            ValueError: Si une colonne ne correspond à aucun type déclaré.
+        """
+        with open(column_types_path) as f:
+            column_types = json.load(f)
+        numeric = {f"num__{col}": j for j, col in enumerate(column_types["numeric_cols"])}
+        categorical = column_types["categorical_cols"]
+        coded = {f"cat__{col}": col for col in categorical}
+
+        lower = np.full(len(feature_names), -np.inf)
+        upper = np.full(len(feature_names), np.inf)
+        integer = np.zeros(len(feature_names), dtype=bool)
+        groups = {col: [] for col in categorical}
+        for i, name in enumerate(feature_names):
+            if name in coded:
+                lower[i], integer[i] = 0.0, True
+                if preprocessor is not None:
+                    j = preprocessor.categorical_cols.index(coded[name])
+                    upper[i] = preprocessor.category_offsets[j + 1] - preprocessor.category_offsets[j] - 1
+                continue
+            if name in numeric:
+                if preprocessor is not None:
+                    j = preprocessor.numeric_cols.index(name[len("num__"):])
+                    low = (preprocessor.lower[j] - preprocessor.mean[j]) / preprocessor.scale[j]
+                    high = (preprocessor.upper[j] - preprocessor.mean[j]) / preprocessor.scale[j]
+                    margin = tolerance * (high - low)
+                    lower[i], upper[i] = low - margin, high + margin
+                continue
+            col = next((col for col in categorical if name.startswith(f"cat__{col}_")), None)
+            if col is None:
+                raise ValueError(f"Colonne absente de column_types.json : {name}")
+            lower[i], upper[i] = 0.0, 1.0
+            groups[col].append(i)
+        return cls(feature_names, lower, upper, [group for group in groups.values() if group], integer)
+
+    def decode(self, payload):
+        """Décoder un payload JSON en matrice float32 validée.
+
+        Trois formats sont acceptés :
+            - colonnaire : {"columns": {"num__Fireplaces": [...], ...}}
+            - orienté lignes : {"rows": [{"num__Fireplaces": 1.0, ...}, ...]}
+            - tableau brut : {"instances": [[...], ...]} dans l'ordre du schéma
+
+        Args:
+            payload (dict): Corps JSON de la requête.
+
+        Returns:
+            DecodedBatch: Lignes valides et erreurs des lignes écartées.
+
+        Raises:
+            ValueError: Si la structure du payload est invalide (le lot entier
+                est alors rejeté).
+        """
+        if not isinstance(payload, dict):
+            raise ValueError("Le corps de la requête doit être un objet JSON.")
+        if "columns" in payload:
+            return self._decode_columns(payload["columns"])
+        if "rows" in payload:
+            return self._decode_rows(payload["rows"])
+        if "instances" in payload:
+            return self._decode_instances(payload["instances"])
+        raise ValueError("Le payload doit contenir 'columns', 'rows' ou 'instances'.")
+
+    def decode_frame(self, df):
+        """Décoder un DataFrame (CSV chargé) dont les colonnes incluent celles du schéma.
+
+        Raises:
+            ValueError: Si des colonnes du schéma sont absentes.
+        """
+        missing = [name for name in self.feature_names if name not in df.columns]
+        if missing:
+            raise ValueError(f"Colonnes manquantes : {missing}")
+        X = np.empty((len(df), len(self.feature_names)), dtype=np.float32)
+        errors = BatchErrors()
+        for j, name in enumerate(self.feature_names):
+            values = df[name]
+            if values.dtype.kind in "iuf":
+                X[:, j] = values.to_numpy()
+            else:
+                self._fill_cells(X, j, name, values.tolist(), errors, numeric_strings=True)
+        return self._validate(X, errors)
+
+    def _decode_columns(self, columns):
+        if not isinstance(columns, dict):
+            raise ValueError("'columns' doit être un objet {nom: [valeurs]}.")
+        missing = [name for name in self.feature_names if name not in columns]
+        if missing:
+            raise ValueError(f"Colonnes manquantes : {missing}")
+        if not isinstance(columns[self.feature_names[0]], list):
+            raise ValueError("Chaque colonne doit être une liste de nombres.")
+        n_rows = len(columns[self.feature_names[0]])
+        X = np.empty((n_rows, len(self.feature_names)), dtype=np.float32)
+        errors = BatchErrors()
+        for j, name in enumerate(self.feature_names):
+            values = columns[name]
+            if not isinstance(values, list) or len(values) != n_rows:
+                raise ValueError(f"La colonne '{name}' n'a pas {n_rows} valeurs.")
+            self._fill_cells(X, j, name, values, errors)
+        return self._validate(X, errors)
+
+    def _decode_rows(self, rows):
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError("'rows' doit être une liste d'objets.")
+        return self._decode_matrix([[row.get(name) for name in self.feature_names] for row in rows])
+
+    def _decode_instances(self, instances):
+        n_features = len(self.feature_names)
+        if not isinstance(instances, list) or not all(
+            isinstance(row, list) and len(row) == n_features for row in instances
+        ):
+            raise ValueError(f"'instances' doit être de forme (n, {n_features}).")
+        return self._decode_matrix(instances)
+
+    def _decode_matrix(self, values):
+        """Décoder une liste de lignes déjà ordonnées selon le schéma."""
+        n_features = len(self.feature_names)
+        X = np.empty((len(values), n_features), dtype=np.float32)
+        errors = BatchErrors()
+        # Cas courant : uniquement des nombres, conversion en un seul appel
+        try:
+            matrix = np.array(values) if values else np.empty((0, n_features))
+        except ValueError:
+            # Cellule non scalaire (liste imbriquée, ...) : contrôle cellule par cellule
+            matrix = np.empty(0, dtype=object)
+        if matrix.dtype.kind in "iuf" and matrix.ndim == 2:
+            X[:] = matrix
+        else:
+            for j, name in enumerate(self.feature_names):
+                self._fill_cells(X, j, name, [row[j] for row in values], errors)
+        return self._validate(X, errors)
+
+    @staticmethod
+    def _fill_cells(X, j, name, values, errors, numeric_strings=False):
+        """Remplir la colonne j de X, cellule par cellule si le type l'impose."""
+        try:
+            column = np.array(values) if values else np.empty(0)
+        except ValueError:
+            column = np.empty(0, dtype=object)
+        if column.dtype.kind in "iuf" and column.ndim == 1:
+            X[:, j] = column
+            return
+        for i, value in enumerate(values):
+            if _is_number(value):
+                X[i, j] = value
+                continue
+            X[i, j] = np.nan
+            if value is None or (isinstance(value, float) and value != value):
+                errors.add(i, name, "valeur manquante")
+                continue
+            if numeric_strings and isinstance(value, str):
+                try:
+                    X[i, j] = float(value)
+                    continue
+                except ValueError:
+                    pass
+            errors.add(i, name, f"nombre attendu, reçu {type(value).__name__}")
+
+    def _validate(self, X, errors):
+        """Contrôler plages et one-hot, puis écarter les lignes en erreur."""
+        already = np.zeros(len(X), dtype=bool)
+        already[errors.rows()] = True
+        with np.errstate(invalid="ignore"):
+            fractional = self.integer & (X != np.floor(X))
+            bad = ~np.isfinite(X) | (X < self.lower) | (X > self.upper) | fractional
+        bad[already] = False
+        for i, j in zip(*np.nonzero(bad)):
+            if np.isnan(X[i, j]):
+                message = "valeur manquante"
+            elif fractional[i, j] and np.isfinite(X[i, j]):
+                message = f"code de modalité entier attendu, reçu {X[i, j]:g}"
+            else:
+                message = f"valeur hors plage : {X[i, j]:g}"
+            errors.add(i, self.feature_names[j], message)
+        for group in self.groups:
+            for i in np.nonzero(X[:, group].sum(axis=1) > 1)[0]:
+                if not already[i] and not bad[i].any():
+                    errors.add(i, self.feature_names[group[0]].rsplit("_", 1)[0], "plusieurs modalités actives")
+
+        if not errors:
+            return DecodedBatch(X, np.arange(len(X)), len(X), errors)
+        rejected = np.zeros(len(X), dtype=bool)
+        rejected[errors.rows()] = True
+        keep = np.nonzero(~rejected)[0]
+        errors.sort(key=lambda error: error["row"])
+        return DecodedBatch(np.ascontiguousarray(X[keep]), keep, len(X), errors)
@@ -0,0 +1,97 @@
+"""Mesure du temps de démarrage à froid du serving, composant par composant.
+
+Chaque mesure est faite dans un interpréteur neuf (comme un worker qui
+démarre) : le code de préparation est exécuté hors chronomètre, puis seule
+l'instruction mesurée est chronométrée.
+
+Lancement : python -m src.serving.startup --repeat 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from src.models.compiled import PROJECT_DIR
+
+# nom -> (préparation, instruction mesurée, variables d'environnement)
+COMPONENTS = {
+    "import numpy": ("", "import numpy", {}),
+    "import flask": ("", "import flask", {}),
+    "import pandas": ("", "import pandas", {}),
+    "import joblib": ("", "import joblib", {}),
+    "import sklearn": ("", "import sklearn.pipeline", {}),
+    "import xgboost": ("", "import xgboost", {}),
+    "load best_model.pkl": ("import joblib, xgboost", "joblib.load('models/best_model.pkl')", {}),
+    "load compiled": (
+        "from src.models.compiled import CompiledEnsemble",
+        "CompiledEnsemble.load('models/compiled')",
+        {},
+    ),
+    "load compiled (mmap)": (
+        "from src.models.compiled import CompiledEnsemble",
+        "CompiledEnsemble.load('models/compiled', mmap=True)",
+        {},
+    ),
+    "load inference_pipeline": (
+        "import joblib, pandas, sklearn.pipeline, xgboost",
+        "joblib.load('models/inference_pipeline.joblib')",
+        {},
+    ),
+    "import app": ("", "import app", {"FAST_START": "0"}),
+    "import app (FAST_START=1)": ("", "import app", {"FAST_START": "1"}),
+}
+
+TEMPLATE = """
+import time, warnings
+warnings.filterwarnings("ignore")
+{setup}
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+"""
+
+
+def measure(setup, statement, env=None, repeat=3):
+    """Chronométrer une instruction dans repeat interpréteurs neufs.
+
+    Args:
+        setup (str): Code exécuté avant le chronomètre.
+        statement (str): Code chronométré.
+        env (dict): Variables d'environnement supplémentaires.
+        repeat (int): Nombre d'interpréteurs lancés.
+
+    Returns:
+        list: Durées en secondes.
+    """
+    code = TEMPLATE.format(setup=setup, statement=statement)
+    timings = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=PROJECT_DIR,
+            env={**os.environ, "MODEL_RELOAD_INTERVAL": "0", **(env or {})},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesurer le temps de démarrage à froid du serving.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("components", nargs="*", help="Composants à mesurer (tous par défaut).")
+    args = parser.parse_args(argv)
+
+    names = args.components or list(COMPONENTS)
+    print(f"{'composant':<28}{'médiane (ms)':>14}{'min (ms)':>12}")
+    for name in names:
+        setup, statement, env = COMPONENTS[name]
+        timings = measure(setup, statement, env, args.repeat)
+        print(f"{name:<28}{statistics.median(timings) * 1000:>14.1f}{min(timings) * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import io
+import os
+import re
+import subprocess
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from app import FEATURE_NAMES, RESULTS_PAGE_SIZE, app, job_scorer, jobs, model, served
+from src.serving.jobs import JobWorker
+
+
+@unittest.skipIf(model is None, "Modèle non disponible")
+class TestPredictEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_predict_returns_one_value_per_row(self):
+        """L'endpoint /predict renvoie une prédiction par ligne"""
+        instances = np.zeros((4, len(FEATURE_NAMES))).tolist()
+        response = self.client.post("/predict", json={"instances": instances})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()["predictions"]), 4)
+
+    def test_predict_reports_invalid_rows(self):
+        """Une ligne invalide est signalée sans faire échouer le lot"""
+        instances = np.zeros((3, len(FEATURE_NAMES))).tolist()
+        instances[1][0] = "abc"
+        response = self.client.post("/predict", json={"instances": instances})
+
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertIsNone(body["predictions"][1])
+        self.assertIsNotNone(body["predictions"][2])
+        self.assertEqual(body["errors"][0]["row"], 1)
+
+    def test_predict_rejects_bad_payload(self):
+        """Un payload invalide renvoie une erreur 400"""
+        response = self.client.post("/predict", json={"instances": [[1, 2]]})
+        self.assertEqual(response.status_code, 400)
+
+    def test_metrics_count_scored_rows_and_stages(self):
+        """/metrics expose les étapes de /predict et les lignes scorées par version"""
+        instances = np.zeros((3, len(FEATURE_NAMES))).tolist()
+        instances[0][0] = "abc"
+        self.client.post("/predict", json={"instances": instances})
+
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        text = response.get_data(as_text=True)
+        labels = f'route="/predict",model_version="{served.version}"'
+        self.assertRegex(text, r'house_prices_rows_scored_total\{' + re.escape(labels) + r'\} \d+')
+        self.assertIn(f"house_prices_rows_rejected_total{{{labels}}}", text)
+        for stage in ("decode", "predict", "serialize"):
+            self.assertIn(f'house_prices_stage_duration_seconds_count{{route="/predict",stage="{stage}"}}', text)
+        self.assertIn('house_prices_request_duration_seconds_count{route="/predict",method="POST",status="200"}', text)
+        self.assertEqual(self.client.get("/debug/profile").status_code, 404)
+
+
+@unittest.skipIf(model is None, "Modèle non disponible")
+class TestResultSessions(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_upload_is_paginated_and_downloadable(self):
+        """Un CSV importé n'affiche qu'une page ; les autres et le CSV complet sont servis à part"""
+        n_rows = RESULTS_PAGE_SIZE + 5
+        frame = pd.DataFrame(np.zeros((n_rows, len(FEATURE_NAMES))), columns=FEATURE_NAMES)
+        frame.insert(0, "Id", range(n_rows))
+        data = {"action": "predict", "csv_file": (io.BytesIO(frame.to_csv(index=False).encode()), "houses.csv")}
+
+        page = self.client.post("/", data=data).get_data(as_text=True)
+
+        token = re.search(r"/results/([\w-]+)/predictions\.csv\.gz", page).group(1)
+        self.assertEqual(page.count("➡️"), RESULTS_PAGE_SIZE)
+        self.assertIn(f"Résumé des {n_rows} lignes", page)
+        body = self.client.get(f"/results/{token}/predictions?page=2").get_json()
+        self.assertEqual((body["ids"], body["pages"]), (list(range(RESULTS_PAGE_SIZE, n_rows)), 2))
+        download = self.client.get(f"/results/{token}/predictions.csv.gz")
+        self.assertEqual(len(pd.read_csv(io.BytesIO(download.data), compression="gzip")), n_rows)
+        self.assertEqual(self.client.get(f"/results/{token}?page=3").status_code, 400)
+
+    def test_unscorable_uploads_are_reported_in_the_page(self):
+        """Un CSV sans colonnes connues, vide ou avec une valeur brute invalide est signalé, sans erreur 500"""
+        raw = pd.read_csv("data/raw/test.csv", nrows=3)
+        raw["GrLivArea"] = raw["GrLivArea"].astype(object)
+        raw.loc[1, "GrLivArea"] = "abc"
+        uploads = {
+            "a,b\n1,2\n": "ni les colonnes du modèle ni les colonnes brutes",
+            "": "Fichier illisible",
+            raw.to_csv(index=False): "Fichier illisible",
+        }
+        for content, message in uploads.items():
+            data = {"action": "predict", "csv_file": (io.BytesIO(content.encode()), "houses.csv")}
+
+            response = self.client.post("/", data=data)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("Fichier rejeté", response.get_data(as_text=True))
+            self.assertIn(message, response.get_data(as_text=True))
+
+
+@unittest.skipIf(model is None, "Modèle non disponible")
+class TestJobEndpoints(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_job_is_queued_then_scored_by_a_worker(self):
+        """Un CSV en file est scoré par un worker et ses résultats sont servis par /results"""
+        frame = pd.DataFrame(np.zeros((30, len(FEATURE_NAMES))), columns=FEATURE_NAMES)
+        frame.insert(0, "Id", range(30))
+        data = {"csv_file": (io.BytesIO(frame.to_csv(index=False).encode()), "houses.csv")}
+
+        response = self.client.post("/jobs", data=data)
+
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()["id"]
+        self.assertEqual(self.client.get(f"/jobs/{job_id}").get_json()["status"], "queued")
+        while JobWorker(jobs, job_scorer, chunksize=7).run_once():
+            pass
+        status = self.client.get(f"/jobs/{job_id}").get_json()
+        self.assertEqual((status["status"], status["progress"]), ("done", 1.0))
+        body = self.client.get(status["results"]["predictions"]).get_json()
+        expected = model.predict(frame[FEATURE_NAMES].to_numpy(np.float32))
+        np.testing.assert_allclose(body["predictions"], expected, rtol=1e-5)
+        self.assertEqual(self.client.delete(f"/jobs/{job_id}").get_json()["status"], "done")
+
+
+@unittest.skipIf(model is None, "Modèle non disponible")
+class TestPredictStreamEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_stream_scores_every_row_in_order(self):
+        """L'endpoint /predict/stream renvoie les prédictions de chaque bloc"""
+        X = np.random.default_rng(0).normal(size=(25, len(FEATURE_NAMES)))
+        frame = pd.DataFrame(X, columns=FEATURE_NAMES)
+        frame.insert(0, "Id", range(25))
+        data = {"csv_file": (io.BytesIO(frame.to_csv(index=False).encode()), "houses.csv")}
+
+        response = self.client.post("/predict/stream?chunksize=10", data=data, buffered=True)
+        result = pd.read_csv(io.BytesIO(response.data))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(result["Id"].tolist(), list(range(25)))
+        np.testing.assert_allclose(
+            result["prediction"], model.predict(X.astype(np.float32)), rtol=1e-5
+        )
+
+
+@unittest.skipUnless(served.has_pipeline, "Pipeline d'inférence non disponible")
+class TestPredictRawEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_raw_rows_match_processed_features(self):
+        """Les lignes brutes donnent la même prédiction que les features prétraitées"""
+        raw = pd.read_csv("data/raw/test.csv", nrows=5)
+        processed = pd.read_csv("data/processed/X_test_processed.csv", nrows=5)
+        rows = raw.astype(object).where(raw.notna(), None).to_dict(orient="records")
+
+        response = self.client.post("/predict/raw", json={"rows": rows})
+
+        self.assertEqual(response.status_code, 200)
+        np.testing.assert_allclose(
+            response.get_json()["predictions"],
+            model.predict(processed[FEATURE_NAMES].to_numpy(np.float32)),
+            rtol=1e-5,
+        )
+
+    def test_missing_raw_column_is_rejected(self):
+        """Une ligne brute incomplète renvoie une erreur 400"""
+        response = self.client.post("/predict/raw", json={"rows": [{"YrSold": 2010}]})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestHealthEndpoints(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_liveness_and_readiness(self):
+        """/healthz répond toujours, /readyz reflète le chargement du modèle"""
+        self.assertEqual(self.client.get("/healthz").status_code, 200)
+
+        response = self.client.get("/readyz")
+        self.assertEqual(response.status_code, 200 if model is not None else 503)
+        self.assertEqual(response.get_json()["model"], model is not None)
+
+
+class TestFastStart(unittest.TestCase):
+
+    def test_fast_start_defers_heavy_imports(self):
+        """Avec FAST_START=1, importer l'application ne charge ni sklearn, ni xgboost, ni pandas"""
+        code = "import sys, app; print(sorted(m for m in ('sklearn', 'xgboost', 'pandas') if m in sys.modules))"
+        env = {**os.environ, "FAST_START": "1", "MODEL_RELOAD_INTERVAL": "0"}
+        result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "[]")
@@ -0,0 +1,61 @@
+import io
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from app import FEATURE_NAMES, model
+
+# Quart et hypercorn ne sont installés qu'avec requirements-flask.txt
+try:
+    from quart.datastructures import FileStorage
+
+    import app_async
+except ImportError:
+    app_async = None
+
+
+@unittest.skipIf(app_async is None, "Quart non installé")
+@unittest.skipIf(model is None, "Modèle non disponible")
+class TestAsyncApp(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.client = app_async.app.test_client()
+
+    async def test_predict_matches_sync_model(self):
+        """L'endpoint /predict asynchrone renvoie les prédictions du modèle"""
+        # Numériques standardisées aléatoires, aucune modalité active
+        X = np.zeros((4, len(FEATURE_NAMES)), dtype=np.float32)
+        X[:, :20] = np.random.default_rng(0).normal(size=(4, 20))
+        response = await self.client.post("/predict", json={"instances": X.tolist()})
+
+        self.assertEqual(response.status_code, 200)
+        predictions = (await response.get_json())["predictions"]
+        np.testing.assert_allclose(predictions, model.predict(X), rtol=1e-5)
+
+    async def test_stream_scores_every_row(self):
+        """L'endpoint /predict/stream asynchrone renvoie une ligne par maison"""
+        df = pd.DataFrame(np.zeros((7, len(FEATURE_NAMES))), columns=FEATURE_NAMES)
+        df.insert(0, "Id", range(7))
+        response = await self.client.post(
+            "/predict/stream",
+            files={"csv_file": FileStorage(io.BytesIO(df.to_csv(index=False).encode()), filename="houses.csv")},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        lines = (await response.get_data(as_text=True)).strip().splitlines()
+        self.assertEqual(len(lines), 8)
+
+    async def test_full_queue_returns_503(self):
+        """Au-delà de ASYNC_MAX_PENDING tâches en attente, la requête est rejetée"""
+        pending, app_async._pending = app_async._pending, app_async.MAX_PENDING
+        try:
+            response = await self.client.post("/predict", json={"instances": [[0.0] * len(FEATURE_NAMES)]})
+        finally:
+            app_async._pending = pending
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import sys
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from src.serving.batcher import MicroBatcher
+from src.serving.reload import ServedModel
+
+
+class RecordingModel:
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, X):
+        self.calls.append(len(X))
+        return X.sum(axis=1)
+
+
+class TestMicroBatcher(unittest.TestCase):
+
+    def test_concurrent_requests_are_coalesced(self):
+        """Des requêtes concurrentes d'une ligne sont prédites en un seul lot"""
+        model = RecordingModel()
+        batcher = MicroBatcher(model.predict, max_batch_size=8, max_wait_ms=200)
+        results = {}
+        start = threading.Barrier(8)
+
+        def request(i):
+            start.wait()
+            results[i] = batcher.predict(np.full(3, i, dtype=np.float32), timeout=5)
+
+        threads = [threading.Thread(target=request, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        batcher.close()
+
+        self.assertEqual({i: float(results[i][0]) for i in results}, {i: 3.0 * i for i in range(8)})
+        self.assertLess(len(model.calls), 8)
+        self.assertEqual(sum(model.calls), 8)
+
+    def test_errors_are_propagated_to_every_caller(self):
+        """Une erreur du modèle est renvoyée à chaque requête du lot"""
+
+        def failing(X):
+            raise ValueError("modèle indisponible")
+
+        batcher = MicroBatcher(failing, max_wait_ms=1)
+        with self.assertRaises(ValueError):
+            batcher.predict(np.zeros((2, 3)), timeout=5)
+        batcher.close()
+
+    def test_swap_during_requests_answers_every_caller(self):
+        """Les requêtes qui tiennent l'ancien modèle pendant un rechargement obtiennent toutes leur réponse"""
+        model = RecordingModel()
+        old = ServedModel("v1", model, batcher=MicroBatcher(model.predict, max_wait_ms=0.5))
+        results, stop = [], threading.Event()
+
+        def request(i):
+            X = np.full((1, 3), i, dtype=np.float32)
+            while not stop.is_set():
+                results.append(float(old.score(X)[0]) == 3.0 * i)
+
+        # Changements de thread très fréquents pour exposer la course avec close
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=request, args=(i,), daemon=True) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            time.sleep(0.05)
+            old.close()
+            time.sleep(0.05)
+            stop.set()
+            for thread in threads:
+                thread.join(timeout=5)
+        finally:
+            sys.setswitchinterval(interval)
+
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertTrue(all(results))
+        self.assertGreater(len(results), 8)
+
+    def test_submit_after_close_predicts_directly(self):
+        """Après close, un bloc est prédit sans redémarrer le thread de regroupement"""
+        model = RecordingModel()
+        batcher = MicroBatcher(model.predict)
+        batcher.predict(np.ones((1, 3)), timeout=5)
+        batcher.close()
+
+        np.testing.assert_array_equal(batcher.predict(np.ones((2, 3)), timeout=5), [3.0, 3.0])
+        self.assertIsNone(batcher._thread)
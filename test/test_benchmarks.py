@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.benchmarks.suite import Context, compare, repeat_for, run_suite
+from src.benchmarks.synthetic import RAW_TRAIN_PATH, make_raw
+
+
+@unittest.skipUnless(RAW_TRAIN_PATH.exists(), "Données brutes non disponibles")
+class TestSyntheticData(unittest.TestCase):
+
+    def test_schema_and_missing_rates_follow_train(self):
+        """Les lignes synthétiques reprennent colonnes, types et manquants du train"""
+        train = pd.read_csv(RAW_TRAIN_PATH)
+
+        raw = make_raw(5000, train, seed=1)
+
+        self.assertEqual(list(raw.columns), list(train.columns))
+        self.assertEqual(list(raw.dtypes), list(train.dtypes))
+        self.assertEqual(raw["Id"].tolist()[:3], [1, 2, 3])
+        np.testing.assert_allclose(raw.isna().mean(), train.isna().mean(), atol=0.03)
+        pd.testing.assert_frame_equal(raw, make_raw(5000, train, seed=1))
+
+
+class TestBaselineComparison(unittest.TestCase):
+
+    def test_regressions_beyond_tolerance_are_reported(self):
+        """Seuls les écarts au-delà de la tolérance relative et absolue sont signalés"""
+        baseline = [
+            {"stage": "predict", "rows": 1000, "p50_ms": 10.0, "peak_mb": 5.0},
+            {"stage": "predict", "rows": 1, "p50_ms": 0.1, "peak_mb": 0.0},
+        ]
+        results = [
+            {"stage": "predict", "rows": 1000, "p50_ms": 20.0, "peak_mb": 5.5},
+            {"stage": "predict", "rows": 1, "p50_ms": 0.5, "peak_mb": 0.0},
+            {"stage": "features", "rows": 1, "p50_ms": 100.0, "peak_mb": 0.0},
+        ]
+
+        regressions = compare(results, baseline, tolerance=0.25)
+
+        self.assertEqual([(r["stage"], r["rows"], r["metric"]) for r in regressions], [("predict", 1000, "p50_ms")])
+
+    def test_repeat_decreases_with_batch_size(self):
+        """Les petits lots sont mesurés plus souvent que les grands"""
+        self.assertEqual(repeat_for(1), 100)
+        self.assertEqual(repeat_for(1_000_000), 3)
+
+
+@unittest.skipUnless(RAW_TRAIN_PATH.exists(), "Données brutes non disponibles")
+class TestRunSuite(unittest.TestCase):
+
+    def test_stages_report_latency_throughput_and_memory(self):
+        """Chaque étape mesurée rapporte p50, p99, débit et pic mémoire"""
+        results = run_suite([10], ["features", "predict (compiled)"], context=Context(), log=None)
+
+        self.assertEqual([result["stage"] for result in results], ["features", "predict (compiled)"])
+        for result in results:
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+            self.assertGreater(result["rows_per_s"], 0)
+            self.assertGreaterEqual(result["peak_mb"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
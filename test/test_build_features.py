@@ -0,0 +1,68 @@
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.features.build_features import DERIVED_FEATURES, build_feature_pipeline, build_features, feature_types
+from src.models.predict_model import load_column_types
+
+RAW_TRAIN_PATH = Path("data/raw/train.csv")
+
+
+class TestBuildFeatures(unittest.TestCase):
+
+    def test_derived_features_in_one_pass(self):
+        """Les features dérivées suivent les formules déclarées"""
+        df = pd.DataFrame(
+            {
+                "YrSold": [2010, 2008],
+                "YearBuilt": [2000, 1950],
+                "YearRemodAdd": [2005, 1990],
+                "GarageYrBlt": [2000.0, np.nan],
+                "1stFlrSF": [800, 1000],
+                "2ndFlrSF": [600, 0],
+                "TotalBsmtSF": [np.nan, 1000.0],
+                "FullBath": [2, 1],
+                "HalfBath": [1, 0],
+                "BsmtFullBath": [1, 0],
+                "BsmtHalfBath": [0, 1],
+            }
+        )
+
+        result = build_features(df)
+
+        self.assertEqual(list(result.columns), list(df.columns) + list(DERIVED_FEATURES))
+        self.assertEqual(result["building_age"].tolist(), [10.0, 58.0])
+        self.assertEqual(result["garage_age"].tolist(), [10.0, 2008.0])
+        self.assertEqual(result["total_sf"].tolist(), [1400.0, 2000.0])
+        self.assertEqual(result["total_bathrooms"].tolist(), [3.5, 1.5])
+        self.assertNotIn("building_age", df.columns)
+
+    @unittest.skipUnless(RAW_TRAIN_PATH.exists(), "Données brutes non disponibles")
+    def test_feature_pipeline_outputs_model_columns(self):
+        """La chaîne complète produit les 75 colonnes attendues par le modèle"""
+        numeric_cols, categorical_cols = load_column_types()
+        train = pd.read_csv(RAW_TRAIN_PATH)
+
+        pipeline = build_feature_pipeline(numeric_cols, categorical_cols)
+        X = pipeline.fit_transform(train)
+
+        self.assertEqual(X.shape, (len(train), 75))
+        self.assertFalse(np.isnan(X).any())
+        self.assertEqual(pipeline[-1].get_feature_names_out()[0], "num__" + numeric_cols[0])
+
+    @unittest.skipUnless(RAW_TRAIN_PATH.exists(), "Données brutes non disponibles")
+    def test_ordinal_encoding_outputs_one_code_per_categorical(self):
+        """L'encodage ordinal produit une colonne de codes par catégorique"""
+        numeric_cols, categorical_cols = load_column_types()
+        train = pd.read_csv(RAW_TRAIN_PATH)
+
+        pipeline = build_feature_pipeline(numeric_cols, categorical_cols, encoding="ordinal")
+        X = pipeline.fit_transform(train)
+        columns = pipeline[-1].get_feature_names_out()
+
+        self.assertEqual(X.shape, (len(train), len(numeric_cols) + len(categorical_cols)))
+        codes = X[:, len(numeric_cols):]
+        np.testing.assert_array_equal(codes, np.round(codes))
+        self.assertEqual(feature_types(columns, categorical_cols).count("c"), len(categorical_cols))
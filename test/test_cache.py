@@ -0,0 +1,76 @@
+import json
+import tempfile
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.features.build_features import build_feature_pipeline
+from src.features.cache import StageCache, run_preprocessing
+from src.features.store import COLUMN_TYPES_PATH, RAW_DIR
+
+
+def double(values):
+    return values * 2
+
+
+class TestStageCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_same_inputs_are_not_recomputed(self):
+        """Une étape déjà calculée pour les mêmes entrées est relue"""
+        cache = StageCache(self.tmp.name)
+        values = np.arange(10)
+
+        first, key = cache.run("double", double, values, inputs=("raw-v1",))
+        second, same_key = cache.run("double", double, values, inputs=("raw-v1",))
+        _, other_key = cache.run("double", double, values, inputs=("raw-v2",))
+
+        np.testing.assert_array_equal(first, second)
+        self.assertEqual(key, same_key)
+        self.assertNotEqual(key, other_key)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        """Les entrées les plus anciennes sont supprimées au-delà de max_bytes"""
+        cache = StageCache(self.tmp.name, max_bytes=10**9)
+        values = np.zeros(10_000)
+        _, old_key = cache.run("double", double, values, inputs=("old",))
+        time.sleep(0.01)
+        _, new_key = cache.run("double", double, values, inputs=("new",))
+
+        cache.max_bytes = cache.path(new_key).stat().st_size
+        cache.evict()
+
+        self.assertFalse(cache.path(old_key).exists())
+        self.assertTrue(cache.path(new_key).exists())
+
+
+@unittest.skipUnless(
+    (RAW_DIR / "train.csv").exists() and (RAW_DIR / "test.csv").exists(), "Données brutes non disponibles"
+)
+class TestRunPreprocessing(unittest.TestCase):
+
+    def test_matches_feature_pipeline_fitted_on_train(self):
+        """Le test est transformé avec les statistiques du train, comme dans le store et le serving"""
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = StageCache(tmp)
+            X_train, X_test, y_train, pipeline = run_preprocessing(cache)
+            run_preprocessing(cache)
+
+            with open(COLUMN_TYPES_PATH) as f:
+                column_types = json.load(f)
+            expected = build_feature_pipeline(column_types["numeric_cols"], column_types["categorical_cols"])
+            expected.fit(pd.read_csv(RAW_DIR / "train.csv"))
+            test = pd.read_csv(RAW_DIR / "test.csv")
+
+            np.testing.assert_array_equal(X_test, expected.transform(test))
+            np.testing.assert_array_equal(pipeline.transform(test.iloc[:1]), X_test[:1])
+            self.assertEqual(len(y_train), len(X_train))
+            self.assertEqual((cache.hits, cache.misses), (6, 6))
@@ -0,0 +1,138 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from sklearn.pipeline import Pipeline
+from xgboost import XGBRegressor
+
+from src.features.build_features import build_feature_pipeline, feature_types
+from src.models.compiled import CompiledEnsemble, CompiledPipeline, CompiledPreprocessor
+from src.models.pipeline import load_pipeline
+from src.models.predict_model import MODEL_PATH, PIPELINE_PATH, load_column_types, load_model
+
+X_TEST_PATH = Path("data/processed/X_test_processed.csv")
+RAW_TEST_PATH = Path("data/raw/test.csv")
+RAW_TRAIN_PATH = Path("data/raw/train.csv")
+
+
+@unittest.skipUnless(MODEL_PATH.exists() and X_TEST_PATH.exists(), "Artefacts non disponibles")
+class TestCompiledEnsemble(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = load_model()
+        cls.compiled = CompiledEnsemble.from_xgboost(cls.model)
+        cls.X = pd.read_csv(X_TEST_PATH).to_numpy(dtype=np.float32)
+
+    def test_parity_with_xgboost(self):
+        """Le moteur compilé reproduit les prédictions XGBoost"""
+        np.testing.assert_allclose(self.compiled.predict(self.X), self.model.predict(self.X), atol=1e-4)
+
+    def test_parity_with_missing_values_and_small_batches(self):
+        """Les valeurs manquantes suivent la direction par défaut de chaque noeud"""
+        X = self.X[:300].copy()
+        X[np.random.default_rng(0).random(X.shape) < 0.2] = np.nan
+
+        np.testing.assert_allclose(
+            self.compiled.predict(X, batch_rows=7), self.model.predict(X), atol=1e-4
+        )
+        np.testing.assert_allclose(self.compiled.predict(X[0]), self.model.predict(X[:1]), atol=1e-4)
+
+    def test_save_and_load_roundtrip(self):
+        """L'ensemble sauvegardé se recharge à l'identique"""
+        with tempfile.TemporaryDirectory() as tmp:
+            self.compiled.save(tmp)
+            restored = CompiledEnsemble.load(tmp)
+
+        np.testing.assert_array_equal(restored.predict(self.X[:50]), self.compiled.predict(self.X[:50]))
+        self.assertEqual(list(restored.feature_names_in_), list(self.compiled.feature_names_in_))
+
+    def test_mmap_load_is_read_only_and_identical(self):
+        """Le chargement projeté en mémoire donne les mêmes prédictions sans copie"""
+        with tempfile.TemporaryDirectory() as tmp:
+            self.compiled.save(tmp)
+            restored = CompiledEnsemble.load(tmp, mmap=True)
+            self.assertIsInstance(restored.threshold, np.memmap)
+            self.assertFalse(restored.threshold.flags.writeable)
+            np.testing.assert_array_equal(restored.predict(self.X[:50]), self.compiled.predict(self.X[:50]))
+            del restored
+
+
+@unittest.skipUnless(PIPELINE_PATH.exists() and RAW_TEST_PATH.exists(), "Artefacts non disponibles")
+class TestCompiledPreprocessor(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pipeline = load_pipeline()
+        cls.raw = pd.read_csv(RAW_TEST_PATH)
+
+    def test_parity_with_sklearn_pipeline(self):
+        """Le prétraitement compilé reproduit pipeline[:-1], catégories inconnues comprises"""
+        raw = self.raw.copy()
+        raw.loc[0, "Neighborhood"] = "Inconnu"
+        raw.loc[1, "KitchenQual"] = None
+        compiled = CompiledPreprocessor.from_pipeline(self.pipeline)
+
+        np.testing.assert_allclose(compiled.transform(raw), self.pipeline[:-1].transform(raw))
+        self.assertEqual(list(compiled.get_feature_names_out()), list(self.pipeline[-2].get_feature_names_out()))
+
+    def test_mmap_pipeline_roundtrip(self):
+        """Le pipeline compilé sauvegardé se recharge projeté en mémoire"""
+        with tempfile.TemporaryDirectory() as tmp:
+            CompiledEnsemble.from_xgboost(self.pipeline[-1]).save(tmp)
+            CompiledPreprocessor.from_pipeline(self.pipeline).save(Path(tmp) / "preprocessor")
+            compiled = CompiledPipeline.load(tmp, mmap=True)
+            self.assertIsInstance(compiled[:-1].scale, np.memmap)
+            np.testing.assert_allclose(compiled.predict(self.raw), self.pipeline.predict(self.raw), atol=1e-4)
+            del compiled
+
+
+@unittest.skipUnless(RAW_TRAIN_PATH.exists() and RAW_TEST_PATH.exists(), "Données brutes non disponibles")
+class TestCompiledCategorical(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        numeric_cols, categorical_cols = load_column_types()
+        train = pd.read_csv(RAW_TRAIN_PATH)
+        features = build_feature_pipeline(numeric_cols, categorical_cols, encoding="ordinal")
+        X = features.fit_transform(train)
+        columns = features[-1].get_feature_names_out()
+        model = XGBRegressor(
+            n_estimators=20,
+            max_depth=4,
+            enable_categorical=True,
+            feature_types=feature_types(columns, categorical_cols),
+        )
+        model.fit(pd.DataFrame(X, columns=columns), np.log1p(train["SalePrice"]))
+        cls.pipeline = Pipeline(features.steps + [("model", model)])
+        cls.raw = pd.read_csv(RAW_TEST_PATH)
+
+    def test_ordinal_pipeline_parity(self):
+        """Codes de modalités et splits catégoriels reproduisent sklearn et XGBoost"""
+        raw = self.raw.copy()
+        raw.loc[0, "Neighborhood"] = "Inconnu"
+        compiled = CompiledPipeline(
+            CompiledPreprocessor.from_pipeline(self.pipeline), CompiledEnsemble.from_xgboost(self.pipeline[-1])
+        )
+
+        np.testing.assert_array_equal(compiled.transform(raw), self.pipeline[:-1].transform(raw))
+        self.assertTrue(compiled.model.categorical.any())
+        np.testing.assert_allclose(compiled.predict(raw), self.pipeline.predict(raw), atol=1e-4)
+
+    def test_categorical_splits_roundtrip(self):
+        """Les masques des splits catégoriels sont sauvegardés avec l'ensemble"""
+        compiled = CompiledEnsemble.from_xgboost(self.pipeline[-1])
+        X = CompiledPreprocessor.from_pipeline(self.pipeline).transform(self.raw)
+        with tempfile.TemporaryDirectory() as tmp:
+            compiled.save(tmp)
+            restored = CompiledEnsemble.load(tmp)
+
+        np.testing.assert_array_equal(restored.category_mask, compiled.category_mask)
+        np.testing.assert_array_equal(restored.predict(X), compiled.predict(X))
+
+
+if __name__ == "__main__":
+    unittest.main()
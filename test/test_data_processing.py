@@ -0,0 +1,97 @@
+import pickle
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.data_processing import (
+    IQRClipper,
+    MedianImputer,
+    fit_imputation_values,
+    fit_outlier_bounds,
+    impute_missing_values,
+    remove_outliers,
+)
+
+
+class TestFittedStatistics(unittest.TestCase):
+
+    def setUp(self):
+        self.train = pd.DataFrame(
+            {
+                "GrLivArea": [1000.0, 1200.0, 1400.0, 1600.0, 9000.0],
+                "LotArea": [8000.0, np.nan, 9000.0, 10000.0, 11000.0],
+                "Neighborhood": ["NAmes", None, "OldTown", "NAmes", "Edwards"],
+            }
+        )
+        self.numeric_cols = ["GrLivArea", "LotArea"]
+
+    def test_bounds_match_pandas_quantiles(self):
+        """Les bornes IQR vectorisées correspondent aux quantiles pandas"""
+        lower, upper = fit_outlier_bounds(self.train, self.numeric_cols)
+        q1 = self.train["GrLivArea"].quantile(0.25)
+        q3 = self.train["GrLivArea"].quantile(0.75)
+
+        self.assertAlmostEqual(lower["GrLivArea"], q1 - 1.5 * (q3 - q1))
+        self.assertAlmostEqual(upper["GrLivArea"], q3 + 1.5 * (q3 - q1))
+
+    def test_fitted_statistics_are_reapplied_to_a_single_row(self):
+        """Une ligne isolée est imputée et capée avec les statistiques du train"""
+        medians = fit_imputation_values(self.train, self.numeric_cols)
+        bounds = fit_outlier_bounds(self.train, self.numeric_cols)
+        row = pd.DataFrame({"GrLivArea": [50000.0], "LotArea": [np.nan], "Neighborhood": [None]})
+
+        row = impute_missing_values(row, ["Neighborhood"], self.numeric_cols, medians=medians)
+        row = remove_outliers(row, self.numeric_cols, bounds=bounds)
+
+        self.assertEqual(row.loc[0, "LotArea"], medians["LotArea"])
+        self.assertEqual(row.loc[0, "GrLivArea"], bounds[1]["GrLivArea"])
+        self.assertEqual(row.loc[0, "Neighborhood"], "None")
+
+
+class TestFittedTransformers(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.train = pd.DataFrame(rng.normal(size=(200, 3)), columns=["a", "b", "c"])
+        self.train.iloc[::7, 1] = np.nan
+
+    def test_transformers_match_pandas_formulas(self):
+        """MedianImputer et IQRClipper reproduisent le remplissage par la médiane et le capage IQR"""
+        cols = ["a", "b", "c"]
+        imputed = self.train.fillna(self.train.median())
+        q1, q3 = imputed.quantile(0.25), imputed.quantile(0.75)
+        lower, upper = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+        expected = imputed.clip(lower, upper, axis=1)
+
+        imputer = MedianImputer(cols).fit(self.train)
+        clipper = IQRClipper(cols).fit(imputer.transform(self.train))
+
+        pd.testing.assert_frame_equal(clipper.transform(imputer.transform(self.train)), expected)
+
+        # Une ligne isolée est transformée avec les statistiques du train, pas les siennes
+        row = pd.DataFrame({"a": [100.0], "b": [np.nan], "c": [-100.0]})
+        result = clipper.transform(imputer.transform(row))
+        self.assertEqual(result.loc[0, "a"], upper["a"])
+        self.assertEqual(result.loc[0, "b"], self.train["b"].median())
+        self.assertEqual(result.loc[0, "c"], lower["c"])
+
+    def test_input_frame_is_not_modified(self):
+        """L'imputation et le capage renvoient un nouveau DataFrame sans toucher à l'entrée"""
+        frame = self.train.assign(name="x")
+        before = frame.copy()
+        imputer = MedianImputer(["a", "b", "c"]).fit(frame)
+        clipper = IQRClipper(["a", "b", "c"]).fit(frame)
+
+        result = clipper.transform(imputer.transform(frame))
+
+        pd.testing.assert_frame_equal(frame, before)
+        self.assertFalse(result["b"].isna().any())
+
+    def test_fitted_state_survives_serialization(self):
+        """Les statistiques apprises sont des tableaux NumPy sérialisables"""
+        clipper = IQRClipper(["a", "b", "c"]).fit(self.train)
+        restored = pickle.loads(pickle.dumps(clipper))
+
+        self.assertIsInstance(restored.lower_, np.ndarray)
+        np.testing.assert_array_equal(restored.upper_, clipper.upper_)
@@ -0,0 +1,81 @@
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.neighbors import KNeighborsRegressor
+
+from src.benchmarks.synthetic import make_raw
+from src.models.incremental import adapt_booster, adapt_thresholds, incremental_update, update_preprocessor
+from src.models.pipeline import load_pipeline
+from src.models.predict_model import PIPELINE_PATH
+
+RAW_TRAIN_PATH = Path("data/raw/train.csv")
+RAW_TEST_PATH = Path("data/raw/test.csv")
+
+
+class TestAdaptThresholds(unittest.TestCase):
+
+    def test_raw_value_on_threshold_keeps_its_branch(self):
+        """Une valeur brute égale au seuil reste à droite après changement d'échelle"""
+        old_mean, old_scale, mean, scale = np.array([100.0]), np.array([30.0]), np.array([104.0]), np.array([29.0])
+        threshold = np.array([(120.0 - 100.0) / 30.0], dtype=np.float32).astype(np.float64)
+
+        adapted = adapt_thresholds(threshold, old_mean, old_scale, mean, scale)
+
+        z = ((np.array([119.5, 120.0]) - mean) / scale).astype(np.float32)
+        self.assertEqual((z < adapted.astype(np.float32)).tolist(), [True, False])
+
+
+@unittest.skipUnless(
+    PIPELINE_PATH.exists() and RAW_TRAIN_PATH.exists() and RAW_TEST_PATH.exists(), "Artefacts non disponibles"
+)
+class TestIncrementalUpdate(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pipeline = load_pipeline()
+        cls.train = pd.read_csv(RAW_TRAIN_PATH)
+        cls.test = pd.read_csv(RAW_TEST_PATH)
+        cls.new_sales = make_raw(300, cls.train, seed=1)
+        cls.new_sales.loc[:4, "Neighborhood"] = "Nouveau"
+
+    def test_updated_encoding_grows_vocabulary_and_scaler(self):
+        """Les nouvelles modalités ajoutent des colonnes et le scaler compte les nouvelles lignes"""
+        preprocessing, old_scaler, _ = update_preprocessor(self.pipeline, self.new_sales)
+        names = list(preprocessing[-1].get_feature_names_out())
+
+        self.assertIn("cat__Neighborhood_Nouveau", names)
+        self.assertEqual(len(names), len(self.pipeline[-2].get_feature_names_out()) + 1)
+        scaler = dict((name, t) for name, t, _ in preprocessing[-1].transformers_)["num"]
+        self.assertEqual(scaler.n_samples_seen_, old_scaler.n_samples_seen_ + len(self.new_sales))
+
+    def test_adapted_booster_keeps_predictions(self):
+        """Le booster ré-exprimé dans le nouvel encodage prédit exactement comme l'ancien"""
+        model = self.pipeline[-1]
+        old_names = [str(name) for name in self.pipeline[-2].get_feature_names_out()]
+        preprocessing, old_scaler, old_vocabularies = update_preprocessor(self.pipeline, self.new_sales)
+        adapted = adapt_booster(model.get_booster(), old_names, preprocessing[-1], old_scaler, old_vocabularies)
+
+        X = pd.DataFrame(np.asarray(preprocessing.transform(self.test), dtype=float), columns=adapted.feature_names)
+        np.testing.assert_array_equal(adapted.predict(xgb.DMatrix(X)), self.pipeline.predict(self.test))
+
+    def test_gate_rejects_update_worse_than_previous(self):
+        """Le modèle mis à jour n'est accepté que s'il fait au moins aussi bien sur la validation"""
+        rows = make_raw(200, self.train, seed=2)
+        result = incremental_update(rows, self.pipeline[-1], self.pipeline, rounds=5)
+        strict = incremental_update(rows, self.pipeline[-1], self.pipeline, rounds=5, tolerance=-1.0)
+
+        self.assertEqual(result["accepted"], result["metrics"]["rmse"] <= result["metrics"]["previous_rmse"])
+        self.assertEqual(result["model"].get_booster().num_boosted_rounds(), result["metrics"]["rounds"])
+        self.assertFalse(strict["accepted"])
+
+    def test_non_xgboost_model_is_rejected(self):
+        """Un modèle sans booster (KNN, SVR, RandomForest) ne peut pas être prolongé"""
+        with self.assertRaisesRegex(ValueError, "KNeighborsRegressor"):
+            incremental_update(self.new_sales, KNeighborsRegressor(), self.pipeline)
+
+
+if __name__ == "__main__":
+    unittest.main()
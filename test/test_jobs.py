@@ -0,0 +1,123 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.serving.jobs import JobCancelled, JobQueue, JobWorker, count_rows
+
+
+def write_csv(frame):
+    return lambda path: frame.to_csv(path, index=False)
+
+
+class TestJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.queue = JobQueue(self.tmp.name)
+        self.frame = pd.DataFrame({"Id": range(10, 35), "x": np.arange(25.0)})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def scorer(self):
+        def score_frame(df):
+            predictions = df["x"].to_numpy() * 2
+            predictions[df["x"].to_numpy() == 3] = np.nan
+            rejected = np.nonzero(df["x"].to_numpy() == 3)[0]
+            errors = [{"row": int(i), "column": "x", "error": "rejetée"} for i in rejected]
+            return predictions, [float(df["x"].iloc[0])], errors
+
+        def store(predictions, ids, first_input, errors, version):
+            self.stored = (predictions, ids, first_input, errors, version)
+            return "token"
+
+        return "v1", score_frame, store
+
+    def test_worker_scores_job_by_chunks(self):
+        """Un worker score la tâche bloc par bloc et publie son avancement et son résultat"""
+        job_id = self.queue.submit(write_csv(self.frame))
+        self.assertEqual(self.queue.get(job_id)["status"], "queued")
+
+        self.assertTrue(JobWorker(self.queue, self.scorer, chunksize=10).run_once())
+
+        job = self.queue.get(job_id)
+        self.assertEqual((job["status"], job["rows_done"], job["rows_total"]), ("done", 25, 25))
+        self.assertEqual((job["result_token"], job["model_version"]), ("token", "v1"))
+        predictions, ids, first_input, errors, _ = self.stored
+        np.testing.assert_array_equal(ids, np.arange(10, 35))
+        self.assertEqual(first_input, [0.0])
+        self.assertEqual(errors[0]["row"], 3)
+        self.assertTrue(np.isnan(predictions[3]))
+        self.assertFalse(os.path.exists(job["input_path"]))
+        self.assertFalse(JobWorker(self.queue, self.scorer).run_once())
+
+    def test_cancellation(self):
+        """Une tâche en attente est annulée aussitôt, une tâche en cours au bloc suivant"""
+        queued = self.queue.submit(write_csv(self.frame))
+        running = self.queue.submit(write_csv(self.frame))
+        self.assertEqual(self.queue.claim()["id"], queued)
+
+        self.queue.cancel(queued)
+        self.assertEqual(self.queue.cancel(running)["status"], "cancelled")
+        with self.assertRaises(JobCancelled):
+            self.queue.progress(queued, 10)
+        self.assertIsNone(self.queue.claim())
+
+    def test_failed_job_reports_error(self):
+        """Un fichier non scorable fait échouer la tâche avec un message"""
+        job_id = self.queue.submit(write_csv(self.frame))
+
+        JobWorker(self.queue, lambda: ("v1", lambda df: None, None)).run_once()
+
+        job = self.queue.get(job_id)
+        self.assertEqual(job["status"], "failed")
+        self.assertIn("colonnes", job["error"])
+
+    def test_jobs_of_dead_workers_are_requeued(self):
+        """Une tâche réservée par un processus disparu est remise en file"""
+        job_id = self.queue.submit(write_csv(self.frame))
+        self.queue.claim()
+        self.queue._connection().execute("UPDATE jobs SET worker_pid = 2147483647")
+
+        self.assertEqual(self.queue.recover(), 1)
+        self.assertEqual(self.queue.get(job_id)["status"], "queued")
+
+    def test_idle_worker_recovers_orphaned_jobs(self):
+        """Un worker inactif reprend la tâche d'un worker disparu sans attendre son redémarrage"""
+        stop = threading.Event()
+        worker = JobWorker(self.queue, self.scorer, poll_interval=0.01, recover_interval=0.05)
+        thread = threading.Thread(target=worker.run, args=(stop,))
+        thread.start()
+        try:
+            time.sleep(0.1)
+            # Tâche réservée par un autre processus, arrêté depuis le démarrage du worker
+            job_id, path = "orphan", os.path.join(self.tmp.name, "orphan.csv")
+            write_csv(self.frame)(path)
+            self.queue._connection().execute(
+                "INSERT INTO jobs (id, status, input_path, created, worker_pid) VALUES (?, 'running', ?, ?, ?)",
+                (job_id, path, time.time(), 2147483647),
+            )
+            deadline = time.monotonic() + 5
+            while self.queue.get(job_id)["status"] != "done" and time.monotonic() < deadline:
+                time.sleep(0.02)
+        finally:
+            stop.set()
+            thread.join()
+
+        self.assertEqual(self.queue.get(job_id)["status"], "done")
+
+    def test_count_rows_without_trailing_newline(self):
+        """Le nombre de lignes ne dépend pas du saut de ligne final"""
+        path = os.path.join(self.tmp.name, "rows.csv")
+        with open(path, "w") as f:
+            f.write("a\n1\n2")
+        self.assertEqual(count_rows(path), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,18 @@
+import os
+import unittest
+
+from src.serving.memory import memory_usage
+
+
+@unittest.skipUnless(os.path.exists("/proc/self/smaps_rollup"), "smaps_rollup indisponible")
+class TestMemoryUsage(unittest.TestCase):
+
+    def test_unique_memory_is_part_of_rss(self):
+        """La mémoire unique (USS) est positive et inférieure à la RSS"""
+        usage = memory_usage()
+        self.assertGreater(usage["uss_kb"], 0)
+        self.assertLessEqual(usage["uss_kb"], usage["rss_kb"])
+
+
+if __name__ == "__main__":
+    unittest.main()
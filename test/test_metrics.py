@@ -0,0 +1,118 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from src.serving.metrics import MetricsRegistry
+from src.serving.profiler import SamplingProfiler
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Chaque seuil compte les observations inférieures ou égales, +Inf les compte toutes"""
+        metrics = MetricsRegistry()
+        latency = metrics.histogram("latency_seconds", "Durée.", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 3.0):
+            latency.observe(value, route="/predict")
+
+        text = metrics.render()
+
+        self.assertIn("# TYPE latency_seconds histogram", text)
+        self.assertIn('latency_seconds_bucket{route="/predict",le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{route="/predict",le="1"} 3', text)
+        self.assertIn('latency_seconds_bucket{route="/predict",le="+Inf"} 4', text)
+        self.assertIn('latency_seconds_sum{route="/predict"} 4.05', text)
+        self.assertIn('latency_seconds_count{route="/predict"} 4', text)
+
+    def test_label_values_are_escaped(self):
+        """Guillemets et antislashs des valeurs de labels sont échappés"""
+        metrics = MetricsRegistry()
+        metrics.counter("rows_total", "Lignes.", ("version",)).inc(3, version='a"b\\c')
+
+        self.assertIn('rows_total{version="a\\"b\\\\c"} 3', metrics.render())
+
+    def test_worker_snapshots_are_summed(self):
+        """Avec un répertoire partagé, /metrics additionne les instantanés de tous les workers"""
+        with tempfile.TemporaryDirectory() as directory:
+            metrics = MetricsRegistry(directory)
+            metrics.counter("rows_total", "Lignes.", ("route",)).inc(2, route="/predict")
+            # Instantané écrit par un autre worker
+            other = {"rows_total": [[[["route", "/predict"]], 5]]}
+            (Path(directory) / "12345.json").write_text(json.dumps(other))
+
+            self.assertIn('rows_total{route="/predict"} 7', metrics.render())
+
+    def test_concurrent_increments_are_not_lost(self):
+        """Les incréments de plusieurs threads sont tous comptés"""
+        metrics = MetricsRegistry()
+        counter = metrics.counter("hits_total", "Appels.")
+
+        def work():
+            for _ in range(1000):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertIn("hits_total 4000", metrics.render())
+
+    def test_concurrent_flushes_do_not_raise(self):
+        """Des threads qui écrivent l'instantané en même temps ne font pas échouer leurs mesures"""
+        with tempfile.TemporaryDirectory() as directory:
+            metrics = MetricsRegistry(directory, flush_interval=0)
+            counter = metrics.counter("hits_total", "Appels.")
+            errors = []
+
+            def work():
+                try:
+                    for _ in range(200):
+                        counter.inc()
+                except Exception as exc:
+                    errors.append(exc)
+
+            threads = [threading.Thread(target=work) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(errors, [])
+            self.assertIn("hits_total 1600", metrics.render())
+            self.assertEqual([path.name for path in Path(directory).iterdir()], [f"{os.getpid()}.json"])
+
+
+class TestSamplingProfiler(unittest.TestCase):
+
+    def test_busy_thread_appears_in_folded_stacks(self):
+        """La fonction qui occupe un thread apparaît dans les piles échantillonnées"""
+        stop = threading.Event()
+
+        def busy_loop():
+            while not stop.is_set():
+                sum(range(1000))
+
+        thread = threading.Thread(target=busy_loop)
+        thread.start()
+        profiler = SamplingProfiler(interval=0.001)
+        try:
+            profiler.ensure_started()
+            time.sleep(0.2)
+        finally:
+            profiler.stop()
+            stop.set()
+            thread.join()
+
+        folded = profiler.folded(reset=True)
+        self.assertIn("busy_loop (test_metrics.py:", folded)
+        self.assertEqual(profiler.folded(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
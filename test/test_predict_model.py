@@ -0,0 +1,53 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.models.pipeline import load_pipeline
+from src.models.predict_model import PIPELINE_PATH, batch_predict, shard_file
+
+RAW_TEST_PATH = Path("data/raw/test.csv")
+
+
+@unittest.skipUnless(PIPELINE_PATH.exists() and RAW_TEST_PATH.exists(), "Artefacts non disponibles")
+class TestBatchPredict(unittest.TestCase):
+
+    def test_shards_cover_every_row_once(self):
+        """Les shards couvrent toutes les lignes du fichier, sans recouvrement"""
+        shards = shard_file(RAW_TEST_PATH, shard_bytes=50_000)
+        n_rows = 0
+        with open(RAW_TEST_PATH, "rb") as f:
+            f.readline()
+            for _, start, end, _ in shards:
+                self.assertEqual(f.tell(), start)
+                n_rows += f.read(end - start).count(b"\n")
+        self.assertGreater(len(shards), 1)
+        self.assertEqual(n_rows, len(pd.read_csv(RAW_TEST_PATH)))
+
+    def test_header_with_bom_and_quoted_names(self):
+        """L'en-tête est lu comme par pandas : BOM retiré, noms entre guillemets conservés"""
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "raw.csv"
+            source.write_bytes('\ufeffId,"Surface, m²",Quartier\n1,50,A\n2,60,B\n'.encode("utf-8"))
+
+            shards = shard_file(source, shard_bytes=4)
+
+        self.assertEqual(shards[0][3], ["Id", "Surface, m²", "Quartier"])
+        self.assertEqual(len(shards), 2)
+
+    def test_batch_predict_matches_sequential_scoring(self):
+        """Le scoring multi-processus renvoie les prédictions dans l'ordre"""
+        raw = pd.read_csv(RAW_TEST_PATH, nrows=200)
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "raw.csv"
+            output = Path(tmp) / "predictions.csv"
+            raw.to_csv(source, index=False)
+
+            n_rows = batch_predict([source], output, n_jobs=2, shard_bytes=20_000)
+            result = pd.read_csv(output)
+
+        self.assertEqual(n_rows, len(raw))
+        self.assertEqual(result["Id"].tolist(), raw["Id"].tolist())
+        np.testing.assert_allclose(result["prediction"], load_pipeline().predict(raw), rtol=1e-5)
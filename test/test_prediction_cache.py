@@ -0,0 +1,105 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from src.serving.cache import PredictionCache, SQLiteBackend, row_keys
+
+
+class CountingModel:
+
+    def __init__(self):
+        self.rows = []
+
+    def predict(self, X):
+        self.rows.append(len(X))
+        return X.sum(axis=1)
+
+
+class TestRowKeys(unittest.TestCase):
+
+    def test_keys_are_canonical_and_versioned(self):
+        """-0.0 et 0.0 donnent la même clé ; la version du modèle change la clé"""
+        X = np.array([[0.0, 1.0], [-0.0, 1.0], [np.nan, 1.0]])
+        keys = row_keys(X, "v1")
+
+        self.assertEqual(keys[0], keys[1])
+        self.assertNotEqual(keys[0], keys[2])
+        self.assertNotEqual(keys[0], row_keys(X[:1], "v2")[0])
+
+
+class TestPredictionCache(unittest.TestCase):
+
+    def test_only_misses_are_scored(self):
+        """Un lot ne transmet au modèle que les lignes absentes du cache"""
+        model = CountingModel()
+        cache = PredictionCache(model.predict, "v1")
+        X = np.arange(12, dtype=np.float32).reshape(6, 2)
+
+        np.testing.assert_allclose(cache.predict(X[:4]), X[:4].sum(axis=1))
+        np.testing.assert_allclose(cache.predict(X), X.sum(axis=1))
+
+        self.assertEqual(model.rows, [4, 2])
+        self.assertEqual(cache.stats()["hits"], 4)
+        self.assertAlmostEqual(cache.hit_rate, 0.4)
+
+    def test_size_and_ttl_eviction(self):
+        """Les entrées les plus anciennes ou expirées sont recalculées"""
+        model = CountingModel()
+        cache = PredictionCache(model.predict, "v1", max_entries=2)
+        X = np.eye(3, dtype=np.float32)
+        cache.predict(X)
+        self.assertEqual(cache.stats()["entries"], 2)
+        cache.predict(X[:1])
+        self.assertEqual(model.rows, [3, 1])
+
+        expired = PredictionCache(model.predict, "v1", ttl=0)
+        expired.predict(X[:1])
+        expired.predict(X[:1])
+        self.assertEqual(expired.misses, 2)
+
+    def test_shared_backend_across_instances(self):
+        """Deux caches (deux workers) partagent leurs résultats via SQLite"""
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = SQLiteBackend(Path(tmp) / "predictions.sqlite")
+            first, second = CountingModel(), CountingModel()
+            X = np.ones((3, 2), dtype=np.float32) * np.arange(3)[:, None]
+
+            PredictionCache(first.predict, "v1", backend=backend).predict(X)
+            cache = PredictionCache(second.predict, "v1", backend=SQLiteBackend(backend.path))
+            np.testing.assert_allclose(cache.predict(X), X.sum(axis=1))
+
+        self.assertEqual(second.rows, [])
+        self.assertEqual(cache.shared_hits, 3)
+
+    def test_shared_backend_is_bounded(self):
+        """La purge supprime les entrées expirées puis les plus anciennes au-delà de max_rows"""
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = SQLiteBackend(Path(tmp) / "predictions.sqlite", max_rows=3, purge_interval=0)
+            for i in range(5):
+                backend.set_many([(f"k{i}", float(i))])
+
+            self.assertEqual(backend.get_many([f"k{i}" for i in range(5)]), {"k2": 2.0, "k3": 3.0, "k4": 4.0})
+
+    def test_unavailable_backend_falls_back_to_model(self):
+        """Une base partagée verrouillée ne fait pas échouer la prédiction"""
+
+        class LockedBackend:
+            def get_many(self, keys):
+                raise sqlite3.OperationalError("database is locked")
+
+            set_many = get_many
+
+        model = CountingModel()
+        cache = PredictionCache(model.predict, "v1", backend=LockedBackend())
+        X = np.ones((2, 2), dtype=np.float32)
+
+        with self.assertLogs("src.serving.cache", "ERROR"):
+            np.testing.assert_allclose(cache.predict(X), [2.0, 2.0])
+        self.assertEqual(model.rows, [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
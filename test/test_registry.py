@@ -0,0 +1,105 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from src.features.store import RAW_DIR
+from src.models import train_model
+from src.models.predict_model import MODEL_PATH, load_model
+from src.models.registry import ModelRegistry, main
+from src.serving.reload import RegistryWatcher, ServedModel, ShadowScorer
+from src.serving.schema import FeatureSchema
+
+
+@unittest.skipUnless(MODEL_PATH.exists(), "Modèle non disponible")
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = ModelRegistry(Path(self.tmp.name) / "registry")
+        self.model = load_model()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_publish_and_load_roundtrip(self):
+        """Une version publiée est active et rechargeable avec ses artefacts"""
+        version = self.registry.publish(self.model, metrics={"rmse": np.float64(0.1)}, version="v1")
+        loaded = self.registry.load()
+
+        self.assertEqual(self.registry.current(), version)
+        self.assertEqual(loaded.metrics, {"rmse": 0.1})
+        self.assertEqual(len(loaded.feature_names), 75)
+        X = np.zeros((2, 75), dtype=np.float32)
+        np.testing.assert_allclose(
+            self.registry.load(engine="compiled").model.predict(X), self.model.predict(X), atol=1e-4
+        )
+
+    def test_watcher_swaps_on_new_version(self):
+        """Le watcher charge la nouvelle version active et la met en service"""
+        self.registry.publish(self.model, version="v1")
+        served = []
+        watcher = RegistryWatcher(
+            self.registry,
+            lambda version: ServedModel(version, self.registry.load(version).model),
+            served.append,
+            version="v1",
+        )
+        self.assertFalse(watcher.check())
+
+        self.registry.publish(self.model, version="v2")
+        self.assertTrue(watcher.check())
+        self.assertEqual([s.version for s in served], ["v2"])
+
+        self.registry.activate("v1")
+        self.assertTrue(watcher.check())
+        self.assertEqual(watcher.version, "v1")
+
+    def test_shadow_scorer_compares_versions(self):
+        """Le scorer fantôme agrège les écarts avec les prédictions servies"""
+        shadow = ShadowScorer(ServedModel("v2", self.model))
+        X = np.zeros((3, 75), dtype=np.float32)
+        shadow.submit(X, self.model.predict(X) + 1)
+        shadow._executor.shutdown(wait=True)
+
+        stats = shadow.stats()
+        self.assertEqual(stats["rows"], 3)
+        self.assertAlmostEqual(stats["mean_abs_diff"], 1.0, places=5)
+        self.assertEqual(stats["failed"], 0)
+
+    def test_shadow_scorer_skips_incompatible_schema(self):
+        """Un fantôme aux colonnes différentes n'est pas comparé, et ses échecs sont comptés"""
+        names = [f"f{i}" for i in range(75)]
+        shadow = ShadowScorer(ServedModel("v2", self.model, schema=FeatureSchema(names)))
+        X = np.zeros((3, 75), dtype=np.float32)
+
+        self.assertFalse(shadow.check(FeatureSchema(names[::-1])))
+        shadow.submit(X, self.model.predict(X))
+        self.assertTrue(shadow.check(FeatureSchema(names)))
+        shadow.submit(X[:, :10], np.zeros(3))
+        shadow._executor.shutdown(wait=True)
+
+        stats = shadow.stats()
+        self.assertEqual((stats["rows"], stats["failed"], stats["compatible"]), (0, 1, True))
+
+
+@unittest.skipUnless((RAW_DIR / "train.csv").exists(), "Données brutes non disponibles")
+class TestPublishTrainedModel(unittest.TestCase):
+
+    def test_publish_uses_metrics_of_trained_model(self):
+        """make train puis make publish enregistre les métriques du modèle qui vient d'être entraîné"""
+        candidates = {"KNN": (train_model.KNeighborsRegressor, {"n_neighbors": [5, 10]})}
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.dict(train_model.CANDIDATES, candidates, clear=True):
+            output_dir = Path(tmp) / "models"
+            result = train_model.train(Path(tmp) / "store", n_jobs=1, output_dir=output_dir)
+            main(["--registry", str(Path(tmp) / "registry"), "publish", "--artifacts-dir", str(output_dir)])
+
+            loaded = ModelRegistry(Path(tmp) / "registry").load()
+            self.assertEqual(loaded.metrics, result["metrics"])
+            self.assertEqual(type(loaded.model).__name__, "KNeighborsRegressor")
+
+
+if __name__ == "__main__":
+    unittest.main()
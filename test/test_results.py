@@ -0,0 +1,63 @@
+import gzip
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.serving.results import ResultStore, summarize
+
+
+class TestResultStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ResultStore(self.tmp.name, ttl=60)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_summary_excludes_rejected_rows(self):
+        """Le résumé est calculé sur les seules lignes scorées"""
+        summary = summarize(np.array([1.0, np.nan, 3.0]))
+
+        self.assertEqual((summary["rows"], summary["scored"], summary["rejected"]), (3, 2, 1))
+        self.assertEqual((summary["mean"], summary["median"], summary["max"]), (2.0, 2.0, 3.0))
+        self.assertIsNone(summarize(np.array([np.nan]))["mean"])
+
+    def test_pages_and_download_cover_every_row(self):
+        """Les pages et le CSV compressé restituent toutes les lignes dans l'ordre"""
+        predictions = [float(i) for i in range(25)]
+        predictions[7] = None
+        result = self.store.create(predictions, ids=range(100, 125))
+
+        session = self.store.get(result.token)
+        self.assertEqual(session.pages(10), 3)
+        ids, page = session.page(1, 10)
+        self.assertEqual(ids[7], 107)
+        self.assertIsNone(page[7])
+        self.assertEqual(session.page(3, 10)[0], [120, 121, 122, 123, 124])
+        with self.assertRaises(ValueError):
+            session.page(4, 10)
+
+        with gzip.open(session.csv_path()) as f:
+            frame = pd.read_csv(f)
+        self.assertEqual(frame["Id"].tolist(), list(range(100, 125)))
+        self.assertTrue(np.isnan(frame["prediction"][7]))
+
+    def test_expired_and_unknown_sessions(self):
+        """Une session expirée ou un identifiant invalide ne renvoient rien ; la purge supprime les expirées"""
+        result = self.store.create([1.0])
+        old = time.time() - 120
+        os.utime(result.path, (old, old))
+
+        self.assertIsNone(ResultStore(self.tmp.name, ttl=0).get(result.token))
+        self.assertIsNone(self.store.get("../" + result.token))
+        self.store.create([2.0])
+        self.assertFalse(result.path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from app import COLUMN_TYPES_PATH, COMPILED_MODEL_DIR, FEATURE_NAMES, load_schema
+from src.serving.schema import FeatureSchema
+
+
+class TestFeatureSchema(unittest.TestCase):
+
+    def setUp(self):
+        self.schema = FeatureSchema.from_column_types(FEATURE_NAMES, COLUMN_TYPES_PATH)
+        self.row = [0.0] * len(FEATURE_NAMES)
+
+    def test_groups_follow_column_types(self):
+        """Chaque catégorique de column_types.json forme un groupe one-hot"""
+        self.assertEqual(len(self.schema.groups), 7)
+        self.assertEqual(sum(len(group) for group in self.schema.groups), 55)
+
+    def test_unknown_column_is_rejected(self):
+        """Une colonne du modèle absente de column_types.json lève une ValueError"""
+        with self.assertRaises(ValueError):
+            FeatureSchema.from_column_types(FEATURE_NAMES + ["cat__Unknown_x"], COLUMN_TYPES_PATH)
+
+    def test_columnar_and_rows_formats(self):
+        """Les formats colonnaire et lignes donnent la même matrice"""
+        rows = [{name: float(i + j) for j, name in enumerate(FEATURE_NAMES)} for i in range(3)]
+        columns = {name: [row[name] for row in rows] for name in FEATURE_NAMES}
+        schema = FeatureSchema(FEATURE_NAMES)
+
+        X_rows = schema.decode({"rows": rows}).X
+        X_cols = schema.decode({"columns": columns}).X
+
+        self.assertEqual(X_rows.dtype, np.float32)
+        self.assertEqual(X_rows.shape, (3, len(FEATURE_NAMES)))
+        self.assertTrue(X_cols.flags["C_CONTIGUOUS"])
+        np.testing.assert_array_equal(X_rows, X_cols)
+
+    def test_missing_column_is_rejected(self):
+        """Une colonne manquante lève une ValueError"""
+        columns = {name: [0.0] for name in FEATURE_NAMES[1:]}
+        with self.assertRaises(ValueError):
+            self.schema.decode({"columns": columns})
+
+    def test_bad_rows_are_rejected_without_failing_the_batch(self):
+        """Seules les lignes invalides sont écartées, avec leur ligne et colonne"""
+        rows = [dict(zip(FEATURE_NAMES, self.row)) for _ in range(4)]
+        rows[1]["num__GarageArea"] = "grand"
+        rows[2]["cat__KitchenQual_Ex"] = 2.0
+        rows[3]["num__Fireplaces"] = None
+
+        decoded = self.schema.decode({"rows": rows})
+
+        self.assertEqual(decoded.X.shape, (1, len(FEATURE_NAMES)))
+        self.assertEqual(decoded.X.dtype, np.float32)
+        self.assertEqual(
+            [(error["row"], error["column"]) for error in decoded.errors],
+            [(1, "num__GarageArea"), (2, "cat__KitchenQual_Ex"), (3, "num__Fireplaces")],
+        )
+        self.assertEqual(decoded.scatter([12.0]), [12.0, None, None, None])
+
+    def test_several_active_categories_are_rejected(self):
+        """Deux modalités actives d'une même catégorique invalident la ligne"""
+        row = list(self.row)
+        row[FEATURE_NAMES.index("cat__KitchenQual_Ex")] = 1.0
+        row[FEATURE_NAMES.index("cat__KitchenQual_Gd")] = 1.0
+
+        decoded = self.schema.decode({"instances": [row, self.row]})
+
+        self.assertEqual(decoded.rows.tolist(), [1])
+        self.assertEqual(decoded.errors[0]["column"], "cat__KitchenQual")
+
+    def test_numeric_ranges_come_from_preprocessor(self):
+        """Les plages des numériques viennent du prétraitement compilé"""
+        schema = load_schema(COMPILED_MODEL_DIR)
+        X = pd.read_csv("data/processed/X_test_processed.csv")[FEATURE_NAMES]
+
+        self.assertTrue(np.isfinite(schema.lower[:20]).all())
+        self.assertEqual(len(schema.decode_frame(X).errors), 0)
+
+        row = list(self.row)
+        row[0] = 1e6
+        self.assertEqual(len(schema.decode({"instances": [row]}).X), 0)
+
+    def test_category_code_columns(self):
+        """Un code de modalité doit être un entier du vocabulaire"""
+        names = FEATURE_NAMES[:20] + ["cat__KitchenQual"]
+        schema = FeatureSchema.from_column_types(names, COLUMN_TYPES_PATH)
+        rows = [[0.0] * 20 + [code] for code in (2, 1.5, -1)]
+
+        decoded = schema.decode({"instances": rows})
+
+        self.assertEqual(decoded.rows.tolist(), [0])
+        self.assertEqual([error["row"] for error in decoded.errors], [1, 2])
+
+    def test_frame_with_string_column(self):
+        """Un CSV dont une colonne est lue comme texte est décodé cellule par cellule"""
+        df = pd.DataFrame([self.row, self.row], columns=FEATURE_NAMES)
+        df["num__LotArea"] = ["1.5", "n/a"]
+
+        decoded = self.schema.decode_frame(df)
+
+        self.assertEqual(decoded.rows.tolist(), [0])
+        self.assertEqual(decoded.X[0, FEATURE_NAMES.index("num__LotArea")], 1.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
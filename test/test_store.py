@@ -0,0 +1,41 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from src.features.store import FeatureStore, fingerprint, read_matrix, write_matrix
+
+
+class TestFeatureStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.X = np.random.default_rng(0).normal(size=(100, 4)).astype(np.float32)
+        self.columns = ["num__a", "num__b", "cat__c_x", "cat__c_y"]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip_is_memory_mapped_and_columnar(self):
+        """La matrice relue est projetée en mémoire, en ordre colonne"""
+        path = self.root / "X.hpf"
+        write_matrix(path, self.X, self.columns, {"fingerprint": "abc"})
+
+        X, header = read_matrix(path)
+
+        self.assertIsInstance(X, np.memmap)
+        self.assertTrue(X.flags["F_CONTIGUOUS"])
+        self.assertEqual(header["columns"], self.columns)
+        np.testing.assert_array_equal(X, self.X)
+
+    def test_freshness_follows_fingerprint(self):
+        """Le store n'est à jour que pour l'empreinte qui l'a produit"""
+        store = FeatureStore(self.root)
+        fp = fingerprint("train.csv", ["GrLivArea"])
+        store.save("X_train", self.X, self.columns, fp)
+
+        self.assertTrue(store.is_fresh("X_train", fp))
+        self.assertFalse(store.is_fresh("X_train", fingerprint("train.csv", ["LotArea"])))
+        self.assertFalse(store.is_fresh("X_test", fp))
@@ -0,0 +1,45 @@
+import unittest
+
+import numpy as np
+
+from src.models.train_model import candidates, make_folds, successive_halving
+
+
+class ScoreByParams:
+    """Exécuteur factice : le score d'une configuration est son paramètre 'loss'."""
+
+    def __init__(self):
+        self.calls = []
+
+    def map(self, fn, tasks):
+        tasks = list(tasks)
+        self.calls.append(tasks)
+        return [params["loss"] / fraction for _, params, fraction in tasks]
+
+
+class TestSuccessiveHalving(unittest.TestCase):
+
+    def test_bad_configurations_stop_early(self):
+        """Seul le meilleur tiers passe au palier suivant, avec plus de lignes"""
+        configs = [("XGBoost", {"loss": loss}) for loss in np.linspace(1.0, 0.1, 9)]
+        executor = ScoreByParams()
+
+        (name, params, score), history = successive_halving(configs, executor, eta=3, min_fraction=1 / 9)
+
+        self.assertEqual(params["loss"], 0.1)
+        self.assertEqual([len(call) for call in executor.calls], [9, 3, 1])
+        self.assertEqual([rung["fraction"] for rung in history], [1 / 9, 1 / 3, 1.0])
+
+    def test_folds_are_computed_once_and_partition_rows(self):
+        """Les folds couvrent chaque ligne exactement une fois en validation"""
+        folds = make_folds(100, n_splits=4)
+        val = np.sort(np.concatenate([val_idx for _, val_idx in folds]))
+
+        np.testing.assert_array_equal(val, np.arange(100))
+        for train_idx, val_idx in folds:
+            self.assertEqual(len(np.intersect1d(train_idx, val_idx)), 0)
+
+    def test_ordinal_encoding_only_trains_xgboost(self):
+        """Avec des codes de modalités, seuls les candidats XGBoost sont évalués"""
+        self.assertEqual(list(candidates("ordinal")), ["XGBoost"])
+        self.assertIn("KNN", candidates("onehot"))